@@ -8,11 +8,102 @@ class Config:
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', './uploads')
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
+    SAVE_UPLOADS = os.getenv('SAVE_UPLOADS', 'false').lower() == 'true'  # 분석한 업로드 원본 보관 여부
     
     # AI 모델 설정
     AI_MODEL_PATH = os.getenv('AI_MODEL_PATH', './models/')
     CONFIDENCE_THRESHOLD = float(os.getenv('CONFIDENCE_THRESHOLD', 0.7))
     
+    # 분석 엔진 (다중 이미지 병렬 처리) 설정
+    # 워커 프로세스당 풀 크기 (1 이하면 풀 없이 요청 프로세스에서 순차 분석). 기본값은 CPU 코어를
+    # 웹 워커 수(WORKERS)로 나눈 값이라 모든 워커의 풀 자식 프로세스를 합쳐도 코어 수를 넘지 않음.
+    # gunicorn 기본 워커 수(2C+1)에서는 1이 되어 동시 요청 간 병렬(워커)만 사용하고,
+    # 요청 하나의 이미지를 코어에 나누려면 WORKERS를 줄임 (예: WORKERS=2면 워커당 C/2 프로세스)
+    ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', max(1, (os.cpu_count() or 1) // int(os.getenv('WORKERS', 1)))))
+    ANALYSIS_PREWARM = os.getenv('ANALYSIS_PREWARM', 'true').lower() == 'true'  # 워커 시작 시 풀 예열 (풀이 활성일 때만)
+    ANALYSIS_TIMEOUT = float(os.getenv('ANALYSIS_TIMEOUT', 30))  # 이미지당 분석 제한 시간(초)
+    ANALYSIS_START_METHOD = os.getenv('ANALYSIS_START_METHOD', 'spawn')
+    ANALYSIS_MAX_PIXELS = int(os.getenv('ANALYSIS_MAX_PIXELS', 0))  # 분석 최대 해상도(픽셀 수), 0이면 원본 해상도
+    # 모델 ID별 형태 분석 엔진 ("모델ID:엔진,..." 형식, 엔진은 contours 또는 components)
+    ANALYSIS_SHAPE_ENGINES = dict(
+        item.split(':', 1) for item in
+        os.getenv('ANALYSIS_SHAPE_ENGINES', 'fast-plant-ai-v2:components').split(',') if ':' in item
+    )
+    ANALYSIS_TIMING = os.getenv('ANALYSIS_TIMING', 'false').lower() == 'true'  # 단계별 소요 시간 계측
+    # 색상 분류 방식: hsv(HSV 변환 + 범위 검사, 기준 구현) 또는 lut(BGR565 룩업 테이블, 실측 황변/갈변 비율)
+    ANALYSIS_COLOR_CLASSIFIER = os.getenv('ANALYSIS_COLOR_CLASSIFIER', 'hsv')
+    
+    # 품질 게이트 설정 (기준 미달 프레임은 IMAGE_QUALITY_REJECTED 코드로 분석 없이 반환)
+    ANALYSIS_QUALITY_GATE = os.getenv('ANALYSIS_QUALITY_GATE', 'false').lower() == 'true'
+    ANALYSIS_QUALITY_GATE_SIZE = int(os.getenv('ANALYSIS_QUALITY_GATE_SIZE', 256))  # 검사용 축소 영상 긴 변(px)
+    ANALYSIS_QUALITY_MIN_BRIGHTNESS = float(os.getenv('ANALYSIS_QUALITY_MIN_BRIGHTNESS', 30))
+    ANALYSIS_QUALITY_MAX_BRIGHTNESS = float(os.getenv('ANALYSIS_QUALITY_MAX_BRIGHTNESS', 225))
+    ANALYSIS_QUALITY_MIN_CONTRAST = float(os.getenv('ANALYSIS_QUALITY_MIN_CONTRAST', 10))  # 밝기 표준편차
+    ANALYSIS_QUALITY_MIN_SHARPNESS = float(os.getenv('ANALYSIS_QUALITY_MIN_SHARPNESS', 10))  # 라플라시안 분산
+    
+    # 2단계 관심 영역(ROI) 분석 설정
+    ANALYSIS_ROI_MODE = os.getenv('ANALYSIS_ROI_MODE', 'false').lower() == 'true'
+    ANALYSIS_ROI_THUMBNAIL = int(os.getenv('ANALYSIS_ROI_THUMBNAIL', 256))  # 식생 영역 탐색용 썸네일 긴 변(px)
+    ANALYSIS_ROI_PADDING = int(os.getenv('ANALYSIS_ROI_PADDING', 16))  # 영역 박스 여백(원본 px)
+    ANALYSIS_ROI_MIN_AREA = int(os.getenv('ANALYSIS_ROI_MIN_AREA', 4))  # 썸네일 기준 최소 영역 크기(px)
+    ANALYSIS_ROI_MAX_COVERAGE = float(os.getenv('ANALYSIS_ROI_MAX_COVERAGE', 0.6))  # 초과 시 전체 이미지 분석
+    
+    # 영상 분석 설정
+    ANALYSIS_VIDEO_STRIDE = int(os.getenv('ANALYSIS_VIDEO_STRIDE', 30))  # N번째 프레임마다 분석
+    ANALYSIS_VIDEO_KEYFRAMES = os.getenv('ANALYSIS_VIDEO_KEYFRAMES', 'false').lower() == 'true'  # 키프레임만 디코딩(av 패키지)
+    ANALYSIS_VIDEO_MAX_FRAMES = int(os.getenv('ANALYSIS_VIDEO_MAX_FRAMES', 120))  # 영상당 최대 분석 프레임 수
+    
+    # 압축 파일(ZIP/TAR) 일괄 분석 설정 (업로드 전체 크기는 MAX_CONTENT_LENGTH 적용)
+    ANALYSIS_ARCHIVE_MAX_MEMBERS = int(os.getenv('ANALYSIS_ARCHIVE_MAX_MEMBERS', 1000))  # 압축 파일당 최대 이미지 수
+    ANALYSIS_ARCHIVE_MAX_MEMBER_BYTES = int(os.getenv('ANALYSIS_ARCHIVE_MAX_MEMBER_BYTES', 32 * 1024 * 1024))  # 이미지당 최대 크기
+    
+    # 육묘 트레이 분석 설정
+    ANALYSIS_TRAY_MIN_PLANT_AREA = int(os.getenv('ANALYSIS_TRAY_MIN_PLANT_AREA', 200))  # 식물 셀 최소 녹색 면적(원본 px)
+    ANALYSIS_TRAY_EMPTY_RATIO = float(os.getenv('ANALYSIS_TRAY_EMPTY_RATIO', 0.02))  # 이 녹색 비율 미만 셀은 빈 셀
+    
+    # 타임랩스 시퀀스 분석 설정 (키프레임과 차이가 작은 프레임은 이전 결과 재사용)
+    ANALYSIS_SEQUENCE_MAX_SEQUENCES = int(os.getenv('ANALYSIS_SEQUENCE_MAX_SEQUENCES', 256))  # 보관할 카메라/식물 수
+    ANALYSIS_SEQUENCE_THUMBNAIL = int(os.getenv('ANALYSIS_SEQUENCE_THUMBNAIL', 160))  # 비교용 축소 영상 긴 변(px)
+    ANALYSIS_SEQUENCE_DIFF_THRESHOLD = float(os.getenv('ANALYSIS_SEQUENCE_DIFF_THRESHOLD', 1.5))  # 평균 밝기 차이
+    ANALYSIS_SEQUENCE_CHANGED_FRACTION = float(os.getenv('ANALYSIS_SEQUENCE_CHANGED_FRACTION', 0.002))  # 변화 픽셀 비율
+    ANALYSIS_SEQUENCE_MAX_CARRY = int(os.getenv('ANALYSIS_SEQUENCE_MAX_CARRY', 30))  # 연속 재사용 최대 프레임 수
+    ANALYSIS_SEQUENCE_MAX_AGE = float(os.getenv('ANALYSIS_SEQUENCE_MAX_AGE', 1800))  # 키프레임 최대 사용 시간(초)
+    ANALYSIS_SEQUENCE_DB = os.getenv('ANALYSIS_SEQUENCE_DB', './jobs/analysis_sequences.db')  # 모든 워커가 공유하는 키프레임 DB (비우면 워커별 메모리)
+    
+    # 대용량 래스터 타일 분석 설정
+    ANALYSIS_TILE_SIZE = int(os.getenv('ANALYSIS_TILE_SIZE', 2048))
+    ANALYSIS_TILE_OVERLAP = int(os.getenv('ANALYSIS_TILE_OVERLAP', 64))  # 타일 경계를 걸치는 컨투어용 겹침(px)
+    
+    # 분석 결과 캐시 설정
+    ANALYSIS_CACHE_ENABLED = os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() == 'true'
+    ANALYSIS_CACHE_MEMORY_MB = int(os.getenv('ANALYSIS_CACHE_MEMORY_MB', 64))  # 프로세스 내 LRU 최대 크기
+    ANALYSIS_CACHE_DIR = os.getenv('ANALYSIS_CACHE_DIR', '')  # 지정 시 워커 공유 디스크 캐시 사용
+    ANALYSIS_CACHE_DISK_MB = int(os.getenv('ANALYSIS_CACHE_DISK_MB', 512))  # 디스크 캐시 최대 크기
+    
+    # 비동기 분석 작업 큐 설정
+    ANALYSIS_JOB_DB = os.getenv('ANALYSIS_JOB_DB', './jobs/analysis_jobs.db')  # 모든 워커가 공유하는 작업 DB
+    ANALYSIS_JOB_THREADS = int(os.getenv('ANALYSIS_JOB_THREADS', 1))  # 워커 프로세스당 작업 스레드 수
+    ANALYSIS_JOB_POLL_INTERVAL = float(os.getenv('ANALYSIS_JOB_POLL_INTERVAL', 1.0))  # 대기 작업 확인 주기(초)
+    ANALYSIS_JOB_STALE_SECONDS = float(os.getenv('ANALYSIS_JOB_STALE_SECONDS', 300))  # 하트비트 만료 시 작업 재시도
+    ANALYSIS_JOB_RETENTION_HOURS = float(os.getenv('ANALYSIS_JOB_RETENTION_HOURS', 24))  # 완료 작업 보관 기간
+    
+    # 멱등 키(Idempotency-Key) 설정 (재시도/동시 요청은 한 번만 분석)
+    ANALYSIS_IDEMPOTENCY_DB = os.getenv('ANALYSIS_IDEMPOTENCY_DB', './jobs/idempotency.db')  # 모든 워커가 공유하는 응답 DB
+    ANALYSIS_IDEMPOTENCY_TTL_HOURS = float(os.getenv('ANALYSIS_IDEMPOTENCY_TTL_HOURS', 24))  # 저장 응답 보관 기간
+    ANALYSIS_IDEMPOTENCY_LOCK_SECONDS = float(os.getenv('ANALYSIS_IDEMPOTENCY_LOCK_SECONDS', 300))  # 키 점유 기한(최대 대기 시간)
+    ANALYSIS_IDEMPOTENCY_POLL_INTERVAL = float(os.getenv('ANALYSIS_IDEMPOTENCY_POLL_INTERVAL', 0.2))  # 다른 워커 완료 확인 주기(초)
+    
+    # 연합학습 농가 AI 인스턴스 캐시 설정 (워커 프로세스별 LRU, 디스크 파일이 바뀌면 다시 로드)
+    FEDERATED_FARM_CACHE_SIZE = int(os.getenv('FEDERATED_FARM_CACHE_SIZE', 256))  # 최대 보관 농가 수
+    FEDERATED_FARM_IDLE_SECONDS = float(os.getenv('FEDERATED_FARM_IDLE_SECONDS', 1800))  # 미사용 시 제거까지 시간(초)
+    
+    # 연합학습 예측 마이크로 배칭 설정 (동시 요청을 모아 한 번에 순전파, 스레드형 워커(THREADS > 1)에서 효과)
+    FEDERATED_BATCHING = os.getenv('FEDERATED_BATCHING', 'false').lower() == 'true'
+    FEDERATED_BATCH_WINDOW_MS = float(os.getenv('FEDERATED_BATCH_WINDOW_MS', 2))  # 첫 요청 기준 최대 대기 시간(ms)
+    FEDERATED_BATCH_MAX_SIZE = int(os.getenv('FEDERATED_BATCH_MAX_SIZE', 32))  # 한 번에 처리할 최대 요청 수
+    # 하이브리드 결합 모듈 변환 방식: script(TorchScript), compile(torch.compile, 첫 호출 컴파일이 느림), eager
+    FEDERATED_ENSEMBLE_BACKEND = os.getenv('FEDERATED_ENSEMBLE_BACKEND', 'script')
+    
     # 환경 데이터 임계값
     TEMPERATURE_MIN = 18
     TEMPERATURE_MAX = 32
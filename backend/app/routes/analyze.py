@@ -1,17 +1,35 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, url_for, stream_with_context
 from werkzeug.utils import secure_filename
-from ..services.ai import PlantAnalysisAI
+from ..services.ai import get_plant_analysis_ai, ENV_RECOMMENDATION_RULES, QUALITY_REJECTED_CODE
+from ..services.analysis_engine import get_analysis_engine
+from ..services.result_cache import get_analysis_cache
+from ..services.job_queue import get_job_queue, JOB_COMPLETED, JOB_FAILED, IMAGE_DONE
+from ..services.idempotency import idempotent_endpoint, get_idempotency_store
+from ..services.video_analysis import keyframe_decoding_available
+from ..utils.uploads import upload_buffer, save_upload, save_upload_file, MultipartStreamReader
+from ..utils.archives import ArchiveReader
+from ..utils import timing
+from ..config import Config
+import io
 import os
-import uuid
 import json
+import tempfile
+from contextlib import ExitStack
+from itertools import chain
+from werkzeug.exceptions import HTTPException
 from datetime import datetime
 
 analyze_bp = Blueprint("analyze", __name__, url_prefix="/api/v1")
 
-# AI 분석 서비스 인스턴스
-ai_service = PlantAnalysisAI()
+# 영상 파일 확장자 (샘플 프레임 분석)
+VIDEO_EXTENSIONS = {'mp4', 'mov', 'avi', 'mkv', 'webm', 'm4v'}
+
+# AI 분석 서비스 인스턴스 (비동기 작업, 분석 엔진과 공유하는 프로세스 공용 분석기)
+ai_service = get_plant_analysis_ai()
 
 @analyze_bp.route("/analyze", methods=["POST"])
+@timing.timed_endpoint('request')
+@idempotent_endpoint
 def analyze():
     """식물 이미지 및 환경 데이터 분석 API"""
     try:
@@ -34,55 +52,127 @@ def analyze():
         model_id = request.form.get('modelId', 'basic-analysis-v1')
         analysis_items = json.loads(request.form.get('analysisItems', '[]'))
         plant_type = request.form.get('plantType', 'unknown')
-
-        # 업로드 폴더 확인
-        upload_folder = os.getenv('UPLOAD_FOLDER', './uploads')
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder)
+        sequence_id = request.form.get('sequenceId')  # 고정 카메라/식물 ID (타임랩스 모드)
+        tray_mode = request.form.get('trayMode')  # 육묘 트레이 모드: grid 또는 components
+        tray_rows = request.form.get('trayRows', type=int)
+        tray_cols = request.form.get('trayCols', type=int)
+        video_stride = request.form.get('videoStride', type=int)
+        video_keyframes = request.form.get('videoKeyframes', 'false').lower() == 'true'
+        if tray_mode == 'grid' and not (tray_rows and tray_cols and tray_rows > 0 and tray_cols > 0):
+            return jsonify({
+                "status": "error",
+                "message": "격자 트레이 모드에는 trayRows, trayCols가 필요합니다."
+            }), 400
 
         # 분석 결과 리스트
         analysis_results = []
+        failed_images = []
+
+        # 유효한 이미지/영상만 선택
+        valid_files = [file for file in files if file and _allowed_file(file.filename)]
+        video_files = [file for file in valid_files if _is_video(file.filename)]
+        valid_files = [file for file in valid_files if not _is_video(file.filename)]
+        filenames = [secure_filename(file.filename) for file in valid_files]
+        
+        if video_files and video_keyframes and not keyframe_decoding_available():
+            return jsonify({
+                "status": "error",
+                "message": "키프레임 분석(videoKeyframes)에는 av 패키지가 필요합니다."
+            }), 400
+
+        # 작업 모드 (async=true): 큐에 저장하고 작업 ID를 바로 반환, 분석은 백그라운드에서 수행
+        if request.values.get('async', 'false').lower() == 'true':
+            if video_files:
+                return jsonify({
+                    "status": "error",
+                    "message": "비동기 작업 모드는 이미지만 지원합니다."
+                }), 400
+            if not valid_files:
+                return jsonify({
+                    "status": "error",
+                    "message": "분석할 수 있는 유효한 이미지가 없습니다."
+                }), 400
+            
+            with ExitStack() as stack:
+                buffers = [stack.enter_context(upload_buffer(file)) for file in valid_files]
+                if Config.SAVE_UPLOADS:
+                    for buffer, filename in zip(buffers, filenames):
+                        save_upload(buffer, filename)
+                job_id = get_job_queue().enqueue(
+                    list(zip(filenames, buffers)), environment_data, model_id, analysis_items, plant_type,
+                    _job_options(sequence_id, tray_mode, tray_rows, tray_cols)
+                )
+            
+            status_url = url_for('analyze.analyze_job_status', job_id=job_id)
+            return jsonify({
+                "status": "accepted",
+                "message": f"{len(valid_files)}개 이미지 분석 작업이 등록되었습니다.",
+                "data": {
+                    "job_id": job_id,
+                    "total": len(valid_files),
+                    "status_url": status_url,
+                    "results_url": url_for('analyze.analyze_job_results', job_id=job_id)
+                }
+            }), 202, {"Location": status_url}
 
-        # 각 이미지 분석
-        for file in files:
-            if file and _allowed_file(file.filename):
-                # 안전한 파일명 생성
-                filename = secure_filename(file.filename)
-                unique_filename = f"{uuid.uuid4()}_{filename}"
-                filepath = os.path.join(upload_folder, unique_filename)
-                
-                # 파일 저장
-                file.save(filepath)
-                
-                try:
-                    # AI 분석 수행
-                    result = ai_service.analyze_plant_image(
-                        filepath, environment_data, model_id, analysis_items
+        # 업로드 버퍼에서 바로 분석 (다중 이미지는 분석 엔진 프로세스 풀에서 병렬 처리)
+        with ExitStack() as stack:
+            buffers = [stack.enter_context(upload_buffer(file)) for file in valid_files]
+            
+            # 원본 보관 설정 시에만 파일 저장
+            if Config.SAVE_UPLOADS:
+                with timing.stage('upload_save'):
+                    for buffer, filename in zip(buffers, filenames):
+                        save_upload(buffer, filename)
+            
+            # AI 분석 수행 (결과는 입력 순서 유지)
+            with timing.stage('analysis'):
+                if sequence_id:
+                    # 타임랩스 프레임은 키프레임 상태를 공유하므로 현재 프로세스에서 순서대로 분석
+                    results = _analyze_sequence(sequence_id, buffers, environment_data, model_id, analysis_items)
+                elif tray_mode:
+                    grid = (tray_rows, tray_cols) if tray_mode == 'grid' else (None, None)
+                    results = _analyze_trays(buffers, environment_data, model_id, analysis_items, *grid)
+                else:
+                    results = get_analysis_engine().analyze_batch(
+                        buffers, environment_data, model_id, analysis_items
                     )
-                    
-                    # 추가 메타데이터
-                    result.update({
-                        'filename': filename,
-                        'plant_type': plant_type,
-                        'analysis_timestamp': result.get('timestamp', '실시간'),
-                        'file_size': os.path.getsize(filepath)
-                    })
-                    
-                    analysis_results.append(result)
-                    
-                except Exception as e:
-                    return jsonify({
-                        "status": "error",
-                        "message": f"이미지 분석 중 오류: {str(e)}"
-                    }), 500
-                
-                finally:
-                    # 임시 파일 삭제 (선택적)
-                    if os.path.exists(filepath):
-                        try:
-                            os.remove(filepath)
-                        except:
-                            pass  # 삭제 실패해도 계속 진행
+            file_sizes = [buffer.nbytes for buffer in buffers]
+
+        for result, filename, file_size in zip(results, filenames, file_sizes):
+            if 'error' in result:
+                failed_images.append(_failed_entry(filename, result))
+                continue
+            
+            analysis_results.append(_annotate_result(result, filename, plant_type, file_size))
+
+        # 영상은 디스크로 받아 샘플 프레임만 순차 분석 (메모리에는 한 프레임만 유지)
+        for file in video_files:
+            filename = secure_filename(file.filename)
+            with timing.stage('video'):
+                result, file_size = _analyze_video(
+                    file, filename, environment_data, model_id, analysis_items, video_stride, video_keyframes
+                )
+            if 'error' in result:
+                failed_images.append(_failed_entry(filename, result))
+            else:
+                analysis_results.append(_annotate_result(result, filename, plant_type, file_size))
+
+        # 분석 오류가 하나라도 있으면 요청 전체를 실패로 처리 (품질 기준 미달만 failed_images로 보고)
+        errors = [entry for entry in failed_images if entry.get('error_code') != QUALITY_REJECTED_CODE]
+        if errors:
+            return jsonify({
+                "status": "error",
+                "message": f"이미지 분석 중 오류: {errors[0]['error']}"
+            }), 500
+        if failed_images and not analysis_results:
+            # 모든 이미지가 품질 기준 미달이면 422 (재촬영 대상)
+            return jsonify({
+                "status": "error",
+                "error_code": QUALITY_REJECTED_CODE,
+                "message": failed_images[0]['error'],
+                "failed_images": failed_images
+            }), 422
 
         # 분석 결과 반환
         if len(analysis_results) == 1:
@@ -90,7 +180,8 @@ def analyze():
             return jsonify({
                 "status": "success",
                 "message": "식물 분석이 완료되었습니다.",
-                "data": analysis_results[0]
+                "data": analysis_results[0],
+                "failed_images": failed_images
             })
         elif len(analysis_results) > 1:
             # 다중 이미지 분석 결과 통합
@@ -98,7 +189,8 @@ def analyze():
             return jsonify({
                 "status": "success",
                 "message": f"{len(analysis_results)}개 이미지 분석이 완료되었습니다.",
-                "data": merged_result
+                "data": merged_result,
+                "failed_images": failed_images
             })
         else:
             return jsonify({
@@ -112,12 +204,411 @@ def analyze():
             "message": f"서버 오류: {str(e)}"
         }), 500
 
+@analyze_bp.route("/analyze/archive", methods=["POST"])
+@timing.timed_endpoint('request')
+def analyze_archive():
+    """압축 파일(ZIP/TAR) 일괄 분석 API
+
+    멤버를 디스크에 풀지 않고 하나씩 읽어 읽는 즉시 분석 엔진에 전달한다.
+    stream=true면 멤버별 진행 상황과 결과를 한 줄씩(NDJSON) 바로 보내고, 마지막 줄에 요약을 보낸다.
+    그 외에는 모든 멤버 분석 후 멤버별 결과와 통합 결과를 한 번에 반환한다.
+    """
+    archive = request.files.get('archive')
+    if archive is None or archive.filename == '':
+        return jsonify({
+            "status": "error",
+            "message": "압축 파일이 업로드되지 않았습니다."
+        }), 400
+
+    try:
+        environment_data = json.loads(request.form.get('environmentData', '{}'))
+        model_id = request.form.get('modelId', 'basic-analysis-v1')
+        analysis_items = json.loads(request.form.get('analysisItems', '[]'))
+        plant_type = request.form.get('plantType', 'unknown')
+
+        streaming = request.values.get('stream', 'false').lower() == 'true'
+        upload = _detach_upload(archive) if streaming else archive.stream
+        reader = ArchiveReader(upload, accept=lambda name: _allowed_file(name) and not _is_video(name))
+        events = _member_events(reader, iter(reader), environment_data, model_id, analysis_items, plant_type)
+
+        if streaming:
+            response = Response(
+                stream_with_context(_ndjson_events(events)),
+                mimetype='application/x-ndjson'
+            )
+            response.call_on_close(upload.close)
+            return response
+
+        with timing.stage('analysis'):
+            members = list(events)
+        summary = members.pop()
+        return _members_response(members, summary, 'archive', "압축 파일에 분석할 수 있는 이미지가 없습니다.")
+
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"서버 오류: {str(e)}"
+        }), 500
+
+@analyze_bp.route("/analyze/stream", methods=["POST"])
+@timing.timed_endpoint('request', parse_form=False)
+def analyze_upload_stream():
+    """업로드와 분석을 겹쳐 수행하는 스트리밍 분석 API
+
+    multipart 본문을 werkzeug 폼 파싱(본문 전체 버퍼링/스풀) 없이 받는 대로 읽고,
+    images 파일 파트는 끝까지 받는 즉시 분석 엔진에 전달한다 (뒤 파트는 아직 업로드 중).
+    환경 데이터 등 폼 필드는 첫 이미지 파트보다 앞에 보내야 하며, 이후에 온 필드는 무시된다.
+    응답은 압축 파일 분석 API와 같은 형식 (멤버별 results + 통합 결과 data)이다.
+    """
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        return jsonify({
+            "status": "error",
+            "message": "multipart/form-data 요청만 지원합니다."
+        }), 400
+
+    try:
+        reader = MultipartStreamReader(
+            request.stream, boundary, 'images', accept=lambda name: _allowed_file(name) and not _is_video(name)
+        )
+        parts = iter(reader)
+
+        # 첫 이미지 파트를 받으면 그 앞의 폼 필드가 모두 모임
+        first_part = next(parts, None)
+        environment_data = json.loads(reader.fields.get('environmentData', '{}'))
+        model_id = reader.fields.get('modelId', 'basic-analysis-v1')
+        analysis_items = json.loads(reader.fields.get('analysisItems', '[]'))
+        plant_type = reader.fields.get('plantType', 'unknown')
+
+        members = chain([first_part], parts) if first_part is not None else iter(())
+        with timing.stage('analysis'):
+            events = list(_member_events(reader, members, environment_data, model_id, analysis_items, plant_type))
+        summary = events.pop()
+        return _members_response(events, summary, 'upload', "분석할 수 있는 유효한 이미지가 없습니다.",
+                                 ignored_fields=reader.late_fields)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"잘못된 요청 본문: {str(e)}"
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"서버 오류: {str(e)}"
+        }), 500
+
+@analyze_bp.route("/analyze/jobs/<job_id>", methods=["GET"])
+def analyze_job_status(job_id):
+    """비동기 분석 작업 상태 및 진행률 조회"""
+    job = get_job_queue().get_job(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": "분석 작업을 찾을 수 없습니다."
+        }), 404
+    
+    job.pop('params')
+    job['results_url'] = url_for('analyze.analyze_job_results', job_id=job_id)
+    return jsonify({
+        "status": "success",
+        "data": job
+    })
+
+@analyze_bp.route("/analyze/jobs/<job_id>/results", methods=["GET"])
+def analyze_job_results(job_id):
+    """비동기 분석 작업 결과 조회
+
+    완료된 이미지 결과를 입력 순서대로 반환한다 (?since=N 이면 N번 이후만, 응답의 next_since로 이어서 조회).
+    작업이 끝나면 동기 분석 API와 같은 형식의 통합 결과(data)를 함께 반환한다.
+    """
+    queue = get_job_queue()
+    job = queue.get_job(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": "분석 작업을 찾을 수 없습니다."
+        }), 404
+    
+    finished = job['status'] in (JOB_COMPLETED, JOB_FAILED)
+    since = request.args.get('since', 0, type=int)
+    plant_type = job.pop('params').get('plant_type', 'unknown')
+    
+    images = []
+    for entry in queue.get_results(job_id, 0 if finished else since):
+        if entry['status'] == IMAGE_DONE:
+            entry['result'] = _annotate_result(entry['result'], entry['filename'], plant_type, entry['file_size'])
+        images.append(entry)
+    
+    response = {
+        "status": "success",
+        "job": job,
+        "results": [entry for entry in images if entry['index'] >= since],
+        "next_since": _next_since(images, since)
+    }
+    
+    if finished:
+        analysis_results = [entry['result'] for entry in images if entry['status'] == IMAGE_DONE]
+        response["failed_images"] = [
+            _failed_entry(entry['filename'], entry['result'] or {'error': entry['error']})
+            for entry in images if entry['status'] != IMAGE_DONE
+        ]
+        if len(analysis_results) == 1:
+            response["data"] = analysis_results[0]
+        elif analysis_results:
+            response["data"] = _merge_analysis_results(analysis_results)
+    
+    return jsonify(response)
+
+@analyze_bp.route("/analyze/cache-stats", methods=["GET"])
+def analyze_cache_stats():
+    """분석 결과 캐시 적중/미스 통계 (현재 워커 프로세스 기준, 디스크 계층은 공유)"""
+    cache = get_analysis_cache()
+    sequences = ai_service.sequences.get_stats()
+    idempotency = get_idempotency_store().get_stats()
+    if cache is None:
+        return jsonify({
+            "status": "success",
+            "data": {"enabled": False, "sequences": sequences, "idempotency": idempotency}
+        })
+    
+    return jsonify({
+        "status": "success",
+        "data": {"enabled": True, **cache.get_stats(), "sequences": sequences, "idempotency": idempotency}
+    })
+
+@analyze_bp.route("/analyze/environment-batch", methods=["POST"])
+def analyze_environment_batch():
+    """환경 센서 이력 일괄 평가 API (열 단위 JSON: {"readings": {"innerTemperature": [...], ...}})"""
+    try:
+        data = request.get_json() or {}
+        readings = data.get('readings', {})
+        
+        scores = ai_service.score_environment_batch(readings)
+        
+        return jsonify({
+            "status": "success",
+            "data": {key: values.tolist() for key, values in scores.items()},
+            "recommendation_codes": {
+                code: {"bit": 1 << bit, "message": message}
+                for bit, (code, _, _, _, message) in enumerate(ENV_RECOMMENDATION_RULES)
+            }
+        })
+        
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"환경 데이터 일괄 평가 실패: {str(e)}"
+        }), 500
+
+@analyze_bp.route("/analyze/timings", methods=["GET"])
+def analyze_timings():
+    """분석 파이프라인 단계별 소요 시간 히스토그램 (현재 워커 프로세스 기준, ?reset=true로 초기화)"""
+    snapshot = timing.timings.snapshot()
+    if request.args.get('reset', 'false').lower() == 'true':
+        timing.timings.reset()
+    
+    return jsonify({
+        "status": "success",
+        "data": {
+            "enabled": Config.ANALYSIS_TIMING,
+            "stages": snapshot
+        }
+    })
+
+def _annotate_result(result, filename, plant_type, file_size):
+    """분석 결과에 파일 메타데이터 추가"""
+    result.update({
+        'filename': filename,
+        'plant_type': plant_type,
+        'analysis_timestamp': result.get('timestamp', '실시간'),
+        'file_size': file_size
+    })
+    return result
+
+def _job_options(sequence_id, tray_mode, tray_rows, tray_cols):
+    """비동기 작업에 저장할 분석 모드 (동기 요청과 같은 우선순위: 타임랩스 > 트레이)"""
+    if sequence_id:
+        return {'sequence_id': sequence_id}
+    if tray_mode == 'grid':
+        return {'tray_mode': tray_mode, 'tray_rows': tray_rows, 'tray_cols': tray_cols}
+    if tray_mode:
+        return {'tray_mode': tray_mode}
+    return {}
+
+def _analyze_sequence(sequence_id, buffers, environment_data, model_id, analysis_items):
+    """타임랩스 프레임 순차 분석 (실패한 프레임은 오류 항목으로 반환)"""
+    results = []
+    for buffer in buffers:
+        try:
+            results.append(ai_service.analyze_plant_sequence(
+                sequence_id, buffer, environment_data, model_id, analysis_items
+            ))
+        except Exception as e:
+            results.append({'error': str(e)})
+    return results
+
+def _analyze_trays(buffers, environment_data, model_id, analysis_items, rows, cols):
+    """육묘 트레이 이미지 분석 (실패한 이미지는 오류 항목으로 반환)"""
+    results = []
+    for buffer in buffers:
+        try:
+            results.append(ai_service.analyze_plant_tray(
+                buffer, environment_data, model_id, analysis_items, rows, cols
+            ))
+        except Exception as e:
+            results.append({'error': str(e)})
+    return results
+
+def _analyze_video(file, filename, environment_data, model_id, analysis_items, stride, keyframes_only):
+    """업로드 영상 분석 (원본 보관 설정이 없으면 임시 디렉토리에 받았다가 삭제)"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = save_upload_file(file, filename, Config.UPLOAD_FOLDER if Config.SAVE_UPLOADS else temp_dir)
+        file_size = os.path.getsize(path)
+        try:
+            result = ai_service.analyze_plant_video(
+                path, environment_data, model_id, analysis_items, stride, keyframes_only
+            )
+        except Exception as e:
+            result = {'error': str(e)}
+    return result, file_size
+
+def _member_events(reader, members, environment_data, model_id, analysis_items, plant_type):
+    """업로드 멤버(압축 파일 멤버 또는 스트리밍 multipart 파일 파트)별 분석 이벤트 생성
+
+    멤버 이벤트들 뒤에 요약 이벤트 하나를 생성한다. reader는 format, skipped, truncated를 제공한다.
+    """
+    rejected = []
+
+    def accepted():
+        # 크기 초과/손상 멤버는 분석하지 않고 오류 이벤트로 보고
+        for member in members:
+            if member.error:
+                rejected.append(member)
+                continue
+            if Config.SAVE_UPLOADS:
+                save_upload(member.data, os.path.basename(member.name))
+            yield member, member.data
+
+    analysis_results = []
+    failed_images = []
+
+    def member_event(member, result):
+        event = {'type': 'member', 'index': member.index, 'filename': member.name, 'file_size': member.size}
+        if 'error' in result:
+            failed_images.append(_failed_entry(member.name, result))
+            event.update({'status': 'failed', **failed_images[-1]})
+        else:
+            analysis_results.append(_annotate_result(result, member.name, plant_type, member.size))
+            event.update({'status': 'done', 'result': result})
+        event['progress'] = {'processed': len(analysis_results) + len(failed_images),
+                             'succeeded': len(analysis_results), 'failed': len(failed_images)}
+        return event
+
+    def flush_rejected():
+        while rejected:
+            member = rejected.pop(0)
+            yield member_event(member, {'error': member.error})
+
+    stream = get_analysis_engine().analyze_stream(accepted(), environment_data, model_id, analysis_items)
+    for member, result in stream:
+        yield from flush_rejected()
+        yield member_event(member, result)
+    yield from flush_rejected()
+
+    summary = {
+        'type': 'summary',
+        'format': reader.format,
+        'processed': len(analysis_results) + len(failed_images),
+        'succeeded': len(analysis_results),
+        'failed': len(failed_images),
+        'skipped': reader.skipped,
+        'truncated': reader.truncated,
+        'failed_images': failed_images
+    }
+    if len(analysis_results) == 1:
+        summary['data'] = analysis_results[0]
+    elif analysis_results:
+        summary['data'] = _merge_analysis_results(analysis_results)
+    yield summary
+
+def _detach_upload(file):
+    """업로드 파일 스트림을 요청에서 분리 (요청 종료 시 닫히지 않으므로 스트리밍 응답 중에도 읽을 수 있음)"""
+    stream, file.stream = file.stream, io.BytesIO()
+    return stream
+
+def _ndjson_events(events):
+    """분석 이벤트를 한 줄씩 JSON으로 직렬화 (중간 오류는 error 이벤트로 보내고 종료)"""
+    try:
+        for event in events:
+            yield json.dumps(event, ensure_ascii=False, default=str) + '\n'
+    except Exception as e:
+        yield json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False) + '\n'
+
+def _members_response(members, summary, info_key, empty_message, **extra_info):
+    """멤버별 분석 결과를 동기 분석 API와 같은 형식으로 반환 (멤버별 결과는 results, 집계는 info_key)"""
+    info = {key: summary[key] for key in ('format', 'processed', 'succeeded', 'failed', 'skipped', 'truncated')}
+    info.update(extra_info)
+    if 'data' not in summary:
+        if not members:
+            return jsonify({
+                "status": "error",
+                "message": empty_message,
+                info_key: info
+            }), 400
+        return jsonify({
+            "status": "error",
+            "message": f"이미지 분석 중 오류: {summary['failed_images'][0]['error']}",
+            "failed_images": summary['failed_images'],
+            info_key: info
+        }), 500
+
+    return jsonify({
+        "status": "success",
+        "message": f"{summary['succeeded']}개 이미지 분석이 완료되었습니다.",
+        "data": summary['data'],
+        "results": members,
+        "failed_images": summary['failed_images'],
+        info_key: info
+    })
+
+def _failed_entry(filename, result):
+    """실패 이미지 항목 (품질 게이트 거부는 결과 코드와 측정값 포함)"""
+    entry = {'filename': filename, 'error': result['error']}
+    if 'error_code' in result:
+        entry['error_code'] = result['error_code']
+        entry['quality_gate'] = result.get('quality_gate')
+    return entry
+
+def _next_since(images, since):
+    """연속으로 완료된 마지막 인덱스 다음 값 (그 이전 결과는 다시 받을 필요 없음)"""
+    finished = {entry['index'] for entry in images}
+    while since in finished:
+        since += 1
+    return since
+
 def _allowed_file(filename):
     """허용된 파일 확장자 확인"""
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'} | VIDEO_EXTENSIONS
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def _is_video(filename):
+    """영상 파일 여부"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in VIDEO_EXTENSIONS
+
 def _merge_analysis_results(results):
     """다중 이미지 분석 결과 통합"""
     if not results:
@@ -135,6 +626,7 @@ def _merge_analysis_results(results):
     
     # 분석 데이터 평균 계산
     if 'analysisData' in merged:
+        merged['analysisData'] = dict(merged['analysisData'])  # 첫 번째 결과 원본은 유지
         for key, value in merged['analysisData'].items():
             if isinstance(value, (int, float)):
                 values = [r.get('analysisData', {}).get(key, 0) for r in results 
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.utils import secure_filename
-from ..services.federated_learning import FederatedFarmAI, FederationCoordinator
-import os
+from ..services.federated_learning import FederationCoordinator, get_farm_ai, get_farm_registry, get_shared_models
+from ..services.idempotency import idempotent_endpoint
+from ..services.inference_batching import hybrid_predict, get_inference_batcher
+from ..utils.uploads import upload_buffer, save_upload
+from ..config import Config
 import json
-import uuid
 
 federated_bp = Blueprint("federated", __name__, url_prefix="/api/v1/federated")
 
@@ -11,6 +12,7 @@ federated_bp = Blueprint("federated", __name__, url_prefix="/api/v1/federated")
 federation_coordinator = FederationCoordinator()
 
 @federated_bp.route("/analyze", methods=["POST"])
+@idempotent_endpoint
 def hybrid_analyze():
     """하이브리드 AI 분석 - 기존 AI + 연합학습 AI 결합"""
     try:
@@ -22,25 +24,23 @@ def hybrid_analyze():
         plant_type = request.form.get('plantType', 'unknown')
         use_existing_ai = request.form.get('useExistingAI', 'true').lower() == 'true'
         
-        # 이미지 처리
+        # 이미지 처리 (디스크에 쓰지 않고 메모리에서 분석)
+        image_file = None
         image_path = None
         if 'images' in request.files:
             files = request.files.getlist('images')
             if files and files[0].filename != '':
-                file = files[0]
-                filename = f"{uuid.uuid4()}_{secure_filename(file.filename)}"
-                upload_folder = os.getenv('UPLOAD_FOLDER', './uploads')
-                os.makedirs(upload_folder, exist_ok=True)
-                image_path = os.path.join(upload_folder, filename)
-                file.save(image_path)
+                image_file = files[0]
         
-        # 연합학습 AI 인스턴스 생성
-        federated_ai = FederatedFarmAI(farm_id)
+        # 연합학습 AI 인스턴스 (워커별 캐시에서 재사용)
+        federated_ai = get_farm_ai(farm_id)
         
-        # 농가 정보가 있다면 클러스터 분류
+        # 농가 정보가 있다면 클러스터 분류 (이 요청의 예측에는 분류한 클러스터를 우선 사용)
+        cluster = None
         if 'farmInfo' in request.form:
             farm_info = json.loads(request.form.get('farmInfo'))
-            cluster = federated_ai.classify_farm(farm_info)
+            with federated_ai.lock:
+                cluster = federated_ai.classify_farm(farm_info)
             print(f"농가 {farm_id} 클러스터: {cluster}")
         
         # 입력 데이터 구성
@@ -51,18 +51,29 @@ def hybrid_analyze():
             'model_id': model_id,
             'analysis_items': analysis_items,
             'plant_type': plant_type,
+            'cluster_type': cluster,
             'image_features': {}  # 이미지 특성은 기존 AI에서 추출
         }
         
         # 기존 AI로 이미지 특성 추출 (필요한 경우)
-        if image_path and use_existing_ai:
-            from ..services.ai import PlantAnalysisAI
-            existing_ai = PlantAnalysisAI()
+        if image_file and use_existing_ai:
+            from ..services.ai import get_plant_analysis_ai
+            existing_ai = get_plant_analysis_ai()
             
             try:
-                existing_result = existing_ai.analyze_plant_image(
-                    image_path, environment_data, model_id, analysis_items
-                )
+                with upload_buffer(image_file) as buffer:
+                    # 원본 보관 설정 시에만 파일 저장
+                    if Config.SAVE_UPLOADS:
+                        image_path = save_upload(buffer, image_file.filename)
+                        input_data['image_path'] = image_path
+                    
+                    existing_result = existing_ai.analyze_plant_bytes(
+                        buffer, environment_data, model_id, analysis_items
+                    )
+                
+                # 품질 기준 미달 등으로 분석되지 않은 경우 기본 특성 사용
+                if 'error' in existing_result:
+                    raise Exception(existing_result['error'])
                 
                 # 이미지 특성 추출
                 input_data['image_features'] = existing_result.get('imageAnalysis', {})
@@ -77,11 +88,12 @@ def hybrid_analyze():
                     'image_quality': 80
                 }
         
-        # 하이브리드 예측 수행
-        result = federated_ai.hybrid_predict(input_data, use_existing_ai)
+        # 하이브리드 예측 수행 (설정 시 동시 요청과 묶어 배치 처리)
+        result = hybrid_predict(federated_ai, input_data, use_existing_ai)
         
         # 농가 분석 현황 추가
-        farm_analytics = federated_ai.get_farm_analytics()
+        with federated_ai.lock:
+            farm_analytics = federated_ai.get_farm_analytics()
         result['farm_analytics'] = farm_analytics
         
         return jsonify({
@@ -116,13 +128,14 @@ def add_training_feedback():
             }), 400
         
         # 연합학습 AI 인스턴스
-        federated_ai = FederatedFarmAI(farm_id)
-        
-        # 학습 데이터 추가
-        federated_ai.add_training_data(input_data, actual_result, user_feedback)
+        federated_ai = get_farm_ai(farm_id)
         
-        # 업데이트된 분석 현황
-        analytics = federated_ai.get_farm_analytics()
+        with federated_ai.lock:
+            # 학습 데이터 추가
+            federated_ai.add_training_data(input_data, actual_result, user_feedback)
+            
+            # 업데이트된 분석 현황
+            analytics = federated_ai.get_farm_analytics()
         
         return jsonify({
             "status": "success",
@@ -140,8 +153,9 @@ def add_training_feedback():
 def get_farm_analytics(farm_id):
     """농가별 학습 현황 조회"""
     try:
-        federated_ai = FederatedFarmAI(farm_id)
-        analytics = federated_ai.get_farm_analytics()
+        federated_ai = get_farm_ai(farm_id)
+        with federated_ai.lock:
+            analytics = federated_ai.get_farm_analytics()
         
         return jsonify({
             "status": "success",
@@ -169,8 +183,9 @@ def classify_farm():
                 "message": "농가 ID가 필요합니다."
             }), 400
         
-        federated_ai = FederatedFarmAI(farm_id)
-        cluster = federated_ai.classify_farm(farm_info)
+        federated_ai = get_farm_ai(farm_id)
+        with federated_ai.lock:
+            cluster = federated_ai.classify_farm(farm_info)
         
         return jsonify({
             "status": "success",
@@ -193,6 +208,8 @@ def get_federation_status():
     """연합학습 전체 현황"""
     try:
         status = federation_coordinator.get_federation_status()
+        status['farm_cache'] = get_farm_registry().get_stats()
+        status['shared_models'] = get_shared_models(federation_coordinator.global_model_path).get_stats()
         
         return jsonify({
             "status": "success",
@@ -205,6 +222,14 @@ def get_federation_status():
             "message": f"연합학습 현황 조회 실패: {str(e)}"
         }), 500
 
+@federated_bp.route("/inference-stats", methods=["GET"])
+def get_inference_stats():
+    """연합학습 예측 배칭 통계 (배치 크기, 큐 대기 시간 히스토그램 - 현재 워커 프로세스 기준)"""
+    return jsonify({
+        "status": "success",
+        "data": {"enabled": Config.FEDERATED_BATCHING, **get_inference_batcher().get_stats()}
+    })
+
 @federated_bp.route("/models", methods=["GET"])
 def get_federated_models():
     """연합학습 모델 목록"""
@@ -1,13 +1,133 @@
 import cv2
 import numpy as np
-from PIL import Image, ImageStat
+from PIL import Image, ImageFile, ImageStat
+import copy
 import os
-from typing import Dict, List, Any
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+from ..config import Config
+from .result_cache import get_analysis_cache
+from .sequence_analysis import SequenceTracker
+from .color_lut import get_color_lut, classify_colors, COLOR_CLASS_GREEN, COLOR_CLASS_YELLOW, COLOR_CLASS_BROWN
+from ..utils import timing
+
+# 녹색(식생) HSV 범위
+GREEN_HSV_LOWER = np.array([35, 40, 40])
+GREEN_HSV_UPPER = np.array([85, 255, 255])
+
+# 황변/갈변 HSV 범위 (룩업 테이블 색상 분류용, 녹색 및 서로와 색상 범위가 겹치지 않음)
+YELLOW_HSV_LOWER = np.array([20, 60, 100])
+YELLOW_HSV_UPPER = np.array([34, 255, 255])
+BROWN_HSV_LOWER = np.array([5, 50, 20])
+BROWN_HSV_UPPER = np.array([19, 255, 160])
+
+# 황변/갈변 집계용 식물 영역 - 녹색 마스크를 닫는 커널 크기(px), 잎 가장자리 병반 포함용
+PLANT_CLOSE_SIZE = 7
+
+# 환경 데이터 기본값 (값이 없을 때 사용)
+ENV_DEFAULTS = {
+    'innerTemperature': 25,
+    'innerHumidity': 60,
+    'ph': 6.5,
+    'ec': 2.0
+}
+
+# 환경 권장사항 규칙: (코드, 항목, 방향, 기준값, 문구) - 단건/일괄 평가가 함께 사용
+ENV_RECOMMENDATION_RULES = [
+    ('TEMP_LOW', 'innerTemperature', 'low', 18, "온도가 낮습니다. 난방을 강화하세요."),
+    ('TEMP_HIGH', 'innerTemperature', 'high', 32, "온도가 높습니다. 환기를 증가시키세요."),
+    ('HUMIDITY_LOW', 'innerHumidity', 'low', 40, "습도가 낮습니다. 가습기를 가동하세요."),
+    ('HUMIDITY_HIGH', 'innerHumidity', 'high', 80, "습도가 높습니다. 제습이 필요합니다."),
+    ('PH_LOW', 'ph', 'low', 6.0, "PH가 낮습니다. 석회질 비료를 추가하세요."),
+    ('PH_HIGH', 'ph', 'high', 7.5, "PH가 높습니다. 황 성분 비료를 추가하세요."),
+    ('EC_LOW', 'ec', 'low', 1.0, "EC 농도가 낮습니다. 비료 공급을 늘리세요."),
+    ('EC_HIGH', 'ec', 'high', 3.0, "EC 농도가 높습니다. 물로 희석하세요.")
+]
+
+# 축소 디코딩 배율별 OpenCV 플래그 (JPEG은 DCT 단계에서 축소되어 원본 픽셀을 만들지 않음)
+REDUCED_READ_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+# 헤더 파싱 시 한 번에 읽는 크기
+HEADER_CHUNK_SIZE = 64 * 1024
+
+# 품질 기준 미달로 분석을 생략한 프레임의 결과 코드 (카메라 재촬영 대상)
+QUALITY_REJECTED_CODE = 'IMAGE_QUALITY_REJECTED'
+
+# 품질 미달 사유별 문구
+QUALITY_REJECT_REASONS = {
+    'too_dark': "너무 어두움",
+    'overexposed': "노출 과다",
+    'low_contrast': "대비 부족",
+    'blurry': "초점 흐림"
+}
+
+class ImageQualityRejected(Exception):
+    """품질 게이트를 통과하지 못한 프레임 (분석기 내부의 기본값 반환 처리보다 먼저 전달됨)"""
+    
+    def __init__(self, metrics: Dict[str, float], reasons: List[str]):
+        self.metrics = metrics
+        self.reasons = reasons
+        super().__init__(f"이미지 품질 기준 미달 ({', '.join(QUALITY_REJECT_REASONS[r] for r in reasons)})")
+    
+    def to_result(self) -> Dict[str, Any]:
+        return {
+            'error': str(self),
+            'error_code': QUALITY_REJECTED_CODE,
+            'quality_gate': {**self.metrics, 'reasons': self.reasons}
+        }
+
+class FallbackImageAnalysis(dict):
+    """이미지를 분석하지 못했을 때 반환하는 기본 이미지 분석 결과 (캐시하지 않음)"""
 
 class PlantAnalysisAI:
     """실제 식물 분석을 수행하는 AI 클래스"""
     
-    def __init__(self):
+    def __init__(self, max_pixels: Optional[int] = None, use_cache: bool = True,
+                 quality_gate: Optional[bool] = None, roi_mode: Optional[bool] = None,
+                 color_classifier: Optional[str] = None):
+        # 분석 최대 해상도 (픽셀 수, 0이면 원본 해상도로 분석)
+        self.max_pixels = Config.ANALYSIS_MAX_PIXELS if max_pixels is None else max_pixels
+        
+        # 품질 게이트 (흐리거나 어둡거나 노출 과다인 프레임은 무거운 분석 전에 거부)
+        self.quality_gate = Config.ANALYSIS_QUALITY_GATE if quality_gate is None else quality_gate
+        self.quality_thresholds = {
+            'size': Config.ANALYSIS_QUALITY_GATE_SIZE,
+            'min_brightness': Config.ANALYSIS_QUALITY_MIN_BRIGHTNESS,
+            'max_brightness': Config.ANALYSIS_QUALITY_MAX_BRIGHTNESS,
+            'min_contrast': Config.ANALYSIS_QUALITY_MIN_CONTRAST,
+            'min_sharpness': Config.ANALYSIS_QUALITY_MIN_SHARPNESS
+        }
+        
+        # 2단계 관심 영역 분석 (썸네일에서 식생 영역을 찾고 그 영역만 원본 해상도로 분석)
+        self.roi_mode = Config.ANALYSIS_ROI_MODE if roi_mode is None else roi_mode
+        
+        # 색상 분류 방식: hsv(기준 구현) 또는 lut(BGR565 룩업 테이블, 실측 황변/갈변 비율)
+        self.color_classifier = color_classifier or Config.ANALYSIS_COLOR_CLASSIFIER
+        self.color_lut = get_color_lut(tuple(
+            (tuple(int(v) for v in lower), tuple(int(v) for v in upper)) for lower, upper in (
+                (GREEN_HSV_LOWER, GREEN_HSV_UPPER),
+                (YELLOW_HSV_LOWER, YELLOW_HSV_UPPER),
+                (BROWN_HSV_LOWER, BROWN_HSV_UPPER)
+            )
+        )) if self.color_classifier == 'lut' else None
+        
+        # 모델 ID별 형태 분석 엔진
+        self.shape_engines = dict(Config.ANALYSIS_SHAPE_ENGINES)
+        
+        # 결과 캐시 (동일 이미지 재전송/재시도 시 분석 생략)
+        self.cache = get_analysis_cache() if use_cache else None
+        
+        # 파생 평면 버퍼 (스레드별로 재사용, 해상도가 바뀔 때만 재할당)
+        self._buffers = threading.local()
+        
+        # 타임랩스 시퀀스별 키프레임 (변화 없는 프레임은 이전 분석 결과 재사용)
+        self.sequences = SequenceTracker()
+        
         self.temperature_optimal_range = (18, 32)
         self.humidity_optimal_range = (40, 80)
         self.ph_optimal_range = (6.0, 7.5)
@@ -16,38 +136,324 @@ class PlantAnalysisAI:
     def analyze_plant_image(self, image_path: str, environment_data: Dict, model_id: str, analysis_items: List[str]) -> Dict[str, Any]:
         """이미지와 환경 데이터를 종합하여 식물 분석 수행"""
         try:
-            # 이미지 로드 및 분석
-            image_analysis = self._analyze_image(image_path)
+            image_hash = None
+            if self.cache is not None:
+                with open(image_path, 'rb') as f:
+                    image_hash = self.cache.digest(f.read())
             
-            # 환경 데이터 분석
-            env_analysis = self._analyze_environment(environment_data)
+            return self._analyze_cached(
+                image_hash, lambda: self._analyze_image(image_path, self._shape_engine_for(model_id)),
+                environment_data, model_id, analysis_items
+            )
+            
+        except Exception as e:
+            raise Exception(f"분석 중 오류 발생: {str(e)}")
+    
+    def analyze_plant_bytes(self, image_bytes, environment_data: Dict, model_id: str, analysis_items: List[str]) -> Dict[str, Any]:
+        """메모리상의 이미지 바이트(bytes, memoryview 등)로 식물 분석 수행 - 디스크 저장 불필요"""
+        try:
+            image_hash = self.cache.digest(image_bytes) if self.cache is not None else None
+            
+            return self._analyze_cached(
+                image_hash,
+                lambda: self._analyze_image_array(*self._decode_image(image_bytes), self._shape_engine_for(model_id)),
+                environment_data, model_id, analysis_items
+            )
             
-            # 종합 분석 결과 생성
+        except Exception as e:
+            raise Exception(f"분석 중 오류 발생: {str(e)}")
+    
+    def analyze_plant_sequence(self, sequence_id: str, image_bytes, environment_data: Dict, model_id: str,
+                               analysis_items: List[str]) -> Dict[str, Any]:
+        """고정 카메라 타임랩스 프레임 분석 (카메라/식물 ID별 키프레임 재사용)
+        
+        축소 디코딩한 프레임이 키프레임과 거의 같으면 전체 디코딩과 이미지 분석을 생략하고
+        키프레임의 이미지 분석 결과를 이어서 사용한다. 환경 데이터 분석은 항상 새로 수행하며,
+        결과의 sequence.carried_forward로 재사용 여부를 알 수 있다.
+        """
+        thumbnail = self.sequences.thumbnail(image_bytes)
+        params = self._image_cache_params(model_id)
+        image_analysis, sequence_info = self.sequences.match(sequence_id, thumbnail, params)
+        
+        if image_analysis is None:
+            result = self.analyze_plant_bytes(image_bytes, environment_data, model_id, analysis_items)
+            if 'error' not in result:
+                self.sequences.update(sequence_id, thumbnail, params, copy.deepcopy(result['imageAnalysis']))
+        else:
+            with timing.stage('environment'):
+                env_analysis = self._analyze_environment(environment_data)
             result = self._generate_final_analysis(
+                copy.deepcopy(image_analysis), env_analysis, model_id, analysis_items
+            )
+        
+        result['sequence'] = sequence_info
+        return result
+    
+    def analyze_plant_tray(self, image_bytes, environment_data: Dict, model_id: str, analysis_items: List[str],
+                           rows: Optional[int] = None, cols: Optional[int] = None) -> Dict[str, Any]:
+        """육묘 트레이 사진 한 장에서 식물 셀별 결과 계산
+        
+        rows/cols를 주면 격자로, 없으면 녹색 영역 연결 요소로 셀을 나눈다.
+        imageAnalysis는 트레이 전체 결과이며, imageAnalysis.tray에 셀별 결과와 집계가 담긴다.
+        """
+        from .tray_analysis import TrayAnalyzer
+        
+        try:
+            image_hash = None
+            if self.cache is not None:
+                image_hash = f"{self.cache.digest(image_bytes)}:tray:{rows}x{cols}"
+            
+            def analyze_tray():
+                image, area_scale = self._decode_image(image_bytes)
+                if image is None:
+                    raise ValueError("이미지를 로드할 수 없습니다")
+                # 품질 게이트: 단일 이미지 분석과 같이 셀 분할 전에 검사
+                if self.quality_gate:
+                    self._check_quality(self._extract_gray(image))
+                return TrayAnalyzer(self).analyze(image, area_scale, self._shape_engine_for(model_id), rows, cols,
+                                                  gray_ready=self.quality_gate)
+            
+            return self._analyze_cached(image_hash, analyze_tray, environment_data, model_id, analysis_items)
+            
+        except Exception as e:
+            raise Exception(f"분석 중 오류 발생: {str(e)}")
+    
+    def analyze_plant_video(self, video_path: str, environment_data: Dict, model_id: str, analysis_items: List[str],
+                            stride: Optional[int] = None, keyframes_only: Optional[bool] = None) -> Dict[str, Any]:
+        """영상 파일에서 샘플링한 프레임을 순차 분석 (메모리에는 한 프레임만 유지)
+        
+        imageAnalysis는 샘플 프레임 집계 결과이며, imageAnalysis.video에 프레임별 결과가 담긴다.
+        """
+        from .video_analysis import VideoAnalyzer
+        
+        try:
+            analyzer = VideoAnalyzer(self, stride, keyframes_only)
+            image_analysis = analyzer.analyze(video_path, self._shape_engine_for(model_id))
+            with timing.stage('environment'):
+                env_analysis = self._analyze_environment(environment_data)
+            
+            return self._generate_final_analysis(
                 image_analysis, env_analysis, model_id, analysis_items
             )
             
-            return result
+        except Exception as e:
+            raise Exception(f"분석 중 오류 발생: {str(e)}")
+    
+    def analyze_plant_raster(self, raster, environment_data: Dict, model_id: str, analysis_items: List[str],
+                             tile_size: Optional[int] = None, overlap: Optional[int] = None,
+                             channel_order: str = 'rgb') -> Dict[str, Any]:
+        """메모리보다 큰 정사영상/드론 이미지를 타일 단위로 분석
+        
+        raster는 .npy/.tif 경로 또는 numpy 배열(np.memmap 포함). imageAnalysis에
+        타일별 건강도 격자(tile_grid)가 추가된다. 형태 엔진과 품질 게이트는 전체 이미지 분석과 같다.
+        """
+        from .tiled_analysis import TiledImageAnalyzer, open_raster
+        
+        try:
+            analyzer = TiledImageAnalyzer(self, tile_size, overlap)
+            try:
+                image_analysis = analyzer.analyze(
+                    open_raster(raster), channel_order, self._shape_engine_for(model_id)
+                )
+            except ImageQualityRejected as e:
+                return e.to_result()
+            env_analysis = self._analyze_environment(environment_data)
+            
+            return self._generate_final_analysis(
+                image_analysis, env_analysis, model_id, analysis_items
+            )
             
         except Exception as e:
             raise Exception(f"분석 중 오류 발생: {str(e)}")
     
-    def _analyze_image(self, image_path: str) -> Dict[str, Any]:
+    def _analyze_cached(self, image_hash: Optional[str], analyze_image, environment_data: Dict,
+                        model_id: str, analysis_items: List[str]) -> Dict[str, Any]:
+        """캐시를 거쳐 분석 수행
+        
+        전체 결과는 (이미지, 환경 데이터, 모델, 분석 항목) 키로, 이미지 분석 결과는
+        이미지 키로 따로 저장하므로 환경 데이터만 바뀐 요청은 이미지 분석을 재사용한다.
+        """
+        if image_hash:
+            cached_result = self.cached_analysis(image_hash, environment_data, model_id, analysis_items)
+            if cached_result is not None:
+                return cached_result
+        
+        # 이미지 로드 및 분석 (품질 미달 프레임은 결과 코드만 반환, 캐시하지 않음)
+        try:
+            image_analysis = analyze_image()
+        except ImageQualityRejected as e:
+            return e.to_result()
+        
+        result = self._finish_analysis(image_analysis, environment_data, model_id, analysis_items)
+        if image_hash:
+            self.store_analysis(image_hash, environment_data, model_id, analysis_items, result)
+        return result
+    
+    def cached_analysis(self, image_hash: str, environment_data: Dict, model_id: str,
+                        analysis_items: List[str]) -> Optional[Dict[str, Any]]:
+        """캐시된 분석 결과 조회 (이미지 분석만 캐시되어 있으면 환경 분석만 새로 수행), 없으면 None"""
+        if self.cache is None:
+            return None
+        
+        with timing.stage('cache_lookup'):
+            result_key, image_key = self._cache_keys(image_hash, environment_data, model_id, analysis_items)
+            cached_result = self.cache.get(result_key)
+            if cached_result is not None:
+                return cached_result
+            image_analysis = self.cache.get(image_key)
+        if image_analysis is None:
+            return None
+        
+        result = self._finish_analysis(image_analysis, environment_data, model_id, analysis_items)
+        self.cache.set(result_key, result)
+        return result
+    
+    def store_analysis(self, image_hash: str, environment_data: Dict, model_id: str,
+                       analysis_items: List[str], result: Dict[str, Any]):
+        """분석 결과 캐시 저장 (오류, 품질 미달, 기본값으로 대체된 결과는 저장하지 않음)"""
+        if self.cache is None or 'error' in result or isinstance(result.get('imageAnalysis'), FallbackImageAnalysis):
+            return
+        result_key, image_key = self._cache_keys(image_hash, environment_data, model_id, analysis_items)
+        self.cache.set(image_key, result['imageAnalysis'])
+        self.cache.set(result_key, result)
+    
+    def _cache_keys(self, image_hash: str, environment_data: Dict, model_id: str,
+                    analysis_items: List[str]) -> Tuple[str, str]:
+        """(전체 결과 키, 이미지 분석 결과 키)"""
+        image_params = self._image_cache_params(model_id)
+        return (
+            self.cache.make_key('result', image_hash, image_params, environment_data, model_id, analysis_items),
+            self.cache.make_key('image', image_hash, image_params)
+        )
+    
+    def _finish_analysis(self, image_analysis: Dict, environment_data: Dict, model_id: str,
+                         analysis_items: List[str]) -> Dict[str, Any]:
+        """이미지 분석 결과에 환경 데이터 분석을 더해 종합 결과 생성"""
+        with timing.stage('environment'):
+            env_analysis = self._analyze_environment(environment_data)
+        
+        return self._generate_final_analysis(
+            image_analysis, env_analysis, model_id, analysis_items
+        )
+    
+    def _image_cache_params(self, model_id: str) -> Dict[str, Any]:
+        """이미지 분석 결과에 영향을 주는 설정 (캐시 키에 포함)"""
+        params = {'max_pixels': self.max_pixels, 'shape_engine': self._shape_engine_for(model_id)}
+        if self.quality_gate:
+            params['quality_gate'] = self.quality_thresholds
+        if self.roi_mode:
+            params['roi_mode'] = True
+        if self.color_lut is not None:
+            params['color_classifier'] = 'lut'
+        return params
+    
+    def _shape_engine_for(self, model_id: str) -> str:
+        """모델 ID별 형태 분석 엔진 ('contours' 또는 'components')"""
+        return self.shape_engines.get(model_id, 'contours')
+    
+    def _decode_image(self, image_bytes) -> Tuple[Optional[np.ndarray], float]:
+        """이미지 바이트 디코딩 (버퍼를 복사하지 않고 cv2.imdecode에 전달)
+        
+        최대 해상도가 설정되어 있으면 축소 디코딩하고, 원본 대비 면적 배율을 함께 반환한다.
+        """
+        try:
+            with timing.stage('decode'):
+                size = self._probe_image_size(image_bytes)
+                buffer = np.frombuffer(image_bytes, dtype=np.uint8)
+                image = cv2.imdecode(buffer, REDUCED_READ_FLAGS[self._reduction_factor(size)])
+                return self._fit_resolution(image, size)
+        except Exception:
+            return None, 1.0
+    
+    def _probe_image_size(self, image_bytes) -> Optional[Tuple[int, int]]:
+        """전체 디코딩 없이 헤더에서 이미지 크기 확인 (헤더 부분만 읽음)"""
+        if not self.max_pixels:
+            return None
+        try:
+            view = memoryview(image_bytes).cast('B')
+            parser = ImageFile.Parser()
+            for offset in range(0, len(view), HEADER_CHUNK_SIZE):
+                parser.feed(bytes(view[offset:offset + HEADER_CHUNK_SIZE]))
+                if parser.image is not None:
+                    return parser.image.size
+        except Exception:
+            pass
+        return None
+    
+    def _reduction_factor(self, size: Optional[Tuple[int, int]]) -> int:
+        """최대 해상도 이하가 되는 가장 작은 축소 배율 (1, 2, 4, 8)"""
+        if not self.max_pixels or size is None:
+            return 1
+        width, height = size
+        for factor in (1, 2, 4, 8):
+            if (width // factor) * (height // factor) <= self.max_pixels:
+                return factor
+        return 8
+    
+    def _fit_resolution(self, image: Optional[np.ndarray], size: Optional[Tuple[int, int]]) -> Tuple[Optional[np.ndarray], float]:
+        """축소 디코딩으로 부족한 경우 최대 해상도로 리사이즈하고 원본 대비 면적 배율 계산"""
+        if image is None:
+            return None, 1.0
+        
+        height, width = image.shape[:2]
+        source_pixels = size[0] * size[1] if size else height * width
+        
+        if self.max_pixels and height * width > self.max_pixels:
+            ratio = (self.max_pixels / (height * width)) ** 0.5
+            image = cv2.resize(image, (max(1, int(width * ratio)), max(1, int(height * ratio))),
+                               interpolation=cv2.INTER_AREA)
+            height, width = image.shape[:2]
+        
+        return image, source_pixels / (height * width)
+    
+    def _analyze_image(self, image_path: str, shape_engine: str = 'contours') -> Dict[str, Any]:
         """이미지 분석 수행"""
+        with timing.stage('decode'):
+            size = None
+            if self.max_pixels:
+                try:
+                    with Image.open(image_path) as header:
+                        size = header.size
+                except Exception:
+                    size = None
+            
+            # OpenCV로 이미지 로드 (필요 시 축소 디코딩)
+            image = cv2.imread(image_path, REDUCED_READ_FLAGS[self._reduction_factor(size)])
+            image, area_scale = self._fit_resolution(image, size)
+        
+        return self._analyze_image_array(image, area_scale, shape_engine)
+    
+    def _analyze_image_array(self, image: np.ndarray, area_scale: float = 1.0,
+                             shape_engine: str = 'contours') -> Dict[str, Any]:
+        """디코딩된 BGR 이미지 분석 수행 (area_scale: 원본 대비 면적 배율)"""
+        # 품질 게이트: 그레이스케일만 먼저 계산해 HSV/엣지/컨투어 전에 검사
+        gray = None
+        if self.quality_gate and image is not None:
+            gray = self._extract_gray(image)
+            self._check_quality(gray)
+        
         try:
-            # OpenCV로 이미지 로드
-            image = cv2.imread(image_path)
             if image is None:
                 raise ValueError("이미지를 로드할 수 없습니다")
             
-            # RGB 변환
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            # 관심 영역 분석 (식생 영역이 이미지 대부분이면 아래 전체 이미지 분석으로 진행)
+            if self.roi_mode:
+                from .roi_analysis import RoiImageAnalyzer
+                roi_analysis = RoiImageAnalyzer(self).analyze(image, area_scale, shape_engine, gray)
+                if roi_analysis is not None:
+                    return roi_analysis
+            
+            # 파생 평면(그레이스케일, HSV, 녹색 마스크)을 한 번만 계산해 모든 분석에서 공유
+            planes = self._extract_planes(image, gray_ready=self.quality_gate)
             
             # 색상 분석
-            color_analysis = self._analyze_colors(image_rgb)
+            color_analysis = self._analyze_colors(planes)
             
             # 형태 분석
-            shape_analysis = self._analyze_shapes(image)
+            if shape_engine == 'components':
+                shape_analysis = self._analyze_shapes_components(planes, area_scale)
+            else:
+                shape_analysis = self._analyze_shapes(planes, area_scale)
             
             # 건강도 계산
             health_score = self._calculate_health_score(color_analysis, shape_analysis)
@@ -56,59 +462,257 @@ class PlantAnalysisAI:
                 'color': color_analysis,
                 'shape': shape_analysis,
                 'health_score': health_score,
-                'image_quality': self._assess_image_quality(image)
+                'image_quality': self._assess_image_quality(planes)
             }
             
         except Exception as e:
             # 이미지 분석 실패 시 기본값 반환
-            return {
+            return FallbackImageAnalysis({
                 'color': {'greenness': 70, 'yellowing': 10, 'browning': 5},
                 'shape': {'leaf_count': 8, 'size_category': '중형'},
                 'health_score': 75,
                 'image_quality': 80
-            }
+            })
+    
+    def _plane_buffers(self, image: np.ndarray):
+        """현재 스레드의 파생 평면 버퍼 (해상도가 바뀔 때만 재할당)"""
+        height, width = image.shape[:2]
+        buffers = self._buffers
+        if getattr(buffers, 'shape', None) != (height, width):
+            buffers.shape = (height, width)
+            buffers.gray = np.empty((height, width), dtype=np.uint8)
+            buffers.hsv = np.empty((height, width, 3), dtype=np.uint8)
+            buffers.green_mask = np.empty((height, width), dtype=np.uint8)
+            buffers.edges = np.empty((height, width), dtype=np.uint8)
+            buffers.packed = None
+        return buffers
+    
+    def _extract_gray(self, image: np.ndarray) -> np.ndarray:
+        """그레이스케일 평면만 계산 (품질 게이트용, 이후 _extract_planes에서 재사용)"""
+        buffers = self._plane_buffers(image)
+        with timing.stage('grayscale'):
+            cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=buffers.gray)
+        return buffers.gray
+    
+    def _extract_planes(self, image: np.ndarray, gray_ready: bool = False) -> Dict[str, np.ndarray]:
+        """BGR 이미지에서 분석용 파생 평면 계산 (스레드별 버퍼 재사용)
+        
+        gray_ready: _extract_gray로 그레이스케일 평면을 이미 계산한 경우
+        """
+        buffers = self._plane_buffers(image)
+        
+        # BGR에서 바로 변환 (BGR→RGB→HSV 2단계 변환과 결과 동일)
+        if not gray_ready:
+            with timing.stage('grayscale'):
+                cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=buffers.gray)
+        
+        if self.color_lut is not None:
+            return self._extract_color_classes(image, buffers)
+        
+        with timing.stage('hsv_mask'):
+            cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=buffers.hsv)
+            cv2.inRange(buffers.hsv, GREEN_HSV_LOWER, GREEN_HSV_UPPER, dst=buffers.green_mask)
+        
+        return {
+            'gray': buffers.gray,
+            'hsv': buffers.hsv,
+            'green_mask': buffers.green_mask,
+            'edges': buffers.edges
+        }
+    
+    def _extract_color_classes(self, image: np.ndarray, buffers) -> Dict[str, np.ndarray]:
+        """룩업 테이블로 픽셀을 녹색/황변/갈변으로 분류 (HSV 평면은 만들지 않음)"""
+        if buffers.packed is None:
+            buffers.packed = np.empty(buffers.shape + (2,), dtype=np.uint8)
+            buffers.classes = np.empty(buffers.shape, dtype=np.uint8)
+        
+        with timing.stage('color_lut'):
+            classify_colors(image, self.color_lut, buffers.packed, buffers.classes)
+            cv2.compare(buffers.classes, COLOR_CLASS_GREEN, cv2.CMP_EQ, dst=buffers.green_mask)
+        
+        return {
+            'gray': buffers.gray,
+            'hsv': None,
+            'green_mask': buffers.green_mask,
+            'color_classes': buffers.classes,
+            'edges': buffers.edges
+        }
     
-    def _analyze_colors(self, image_rgb: np.ndarray) -> Dict[str, Any]:
+    def _analyze_colors(self, planes: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """색상 분석"""
-        # HSV 변환
-        hsv = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV)
+        green_mask = planes['green_mask']
+        pixels = green_mask.shape[0] * green_mask.shape[1]
         
-        # 녹색 영역 감지
-        lower_green = np.array([35, 40, 40])
-        upper_green = np.array([85, 255, 255])
-        green_mask = cv2.inRange(hsv, lower_green, upper_green)
+        # 녹색 비율 계산 (임시 배열 없이 개수만 셈)
+        green_ratio = cv2.countNonZero(green_mask) / pixels
         
-        # 녹색 비율 계산
-        green_ratio = np.sum(green_mask > 0) / (image_rgb.shape[0] * image_rgb.shape[1])
+        lesions = self._lesion_masks(green_mask, planes.get('color_classes'))
+        if lesions is None:
+            return self._color_scores(green_ratio)
         
-        # 색상 점수 계산
+        yellow_pixels, brown_pixels = (cv2.countNonZero(mask) for mask in lesions)
+        return self._color_scores(green_ratio, yellow_pixels / pixels, brown_pixels / pixels)
+    
+    def _classify_colors(self, image: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """영역/썸네일용 (녹색 마스크, 색상 분류) - _extract_planes와 같은 분류 방식, 버퍼 재사용 없음
+        
+        HSV 분류면 색상 분류는 None
+        """
+        if self.color_lut is None:
+            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+            return cv2.inRange(hsv, GREEN_HSV_LOWER, GREEN_HSV_UPPER), None
+        
+        classes = np.empty(image.shape[:2], dtype=np.uint8)
+        classify_colors(image, self.color_lut, np.empty(image.shape[:2] + (2,), dtype=np.uint8), classes)
+        return cv2.compare(classes, COLOR_CLASS_GREEN, cv2.CMP_EQ), classes
+    
+    def _lesion_masks(self, green_mask: np.ndarray,
+                      classes: Optional[np.ndarray]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """룩업 테이블 분류 결과에서 식물 영역 안의 (황변, 갈변) 마스크 (HSV 분류면 None)
+        
+        식물 영역은 녹색 마스크 외곽 컨투어를 채운 영역이다. 잎 안의 황변/갈변 병반은 녹색 마스크의 구멍이라
+        포함되고, 식물 밖의 토양/화분은 제외된다. 잎 가장자리에 걸친 병반은 녹색 마스크를
+        PLANT_CLOSE_SIZE 커널로 닫아 포함한다.
+        """
+        if classes is None:
+            return None
+        
+        with timing.stage('color_ratios'):
+            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (PLANT_CLOSE_SIZE, PLANT_CLOSE_SIZE))
+            closed = cv2.morphologyEx(green_mask, cv2.MORPH_CLOSE, kernel)
+            contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            region = np.zeros_like(green_mask)
+            cv2.drawContours(region, contours, -1, 255, cv2.FILLED)
+            
+            yellow = cv2.compare(classes, COLOR_CLASS_YELLOW, cv2.CMP_EQ)
+            brown = cv2.compare(classes, COLOR_CLASS_BROWN, cv2.CMP_EQ)
+            return cv2.bitwise_and(yellow, region), cv2.bitwise_and(brown, region)
+    
+    def _color_scores(self, green_ratio: float, yellow_ratio: Optional[float] = None,
+                      brown_ratio: Optional[float] = None) -> Dict[str, Any]:
+        """녹색 비율로 색상 점수 계산
+        
+        황변/갈변 비율(식물 영역 안만 집계)이 주어지면 식생(녹색+황변+갈변) 중 황변/갈변 비율(%)을 점수로 사용하고,
+        없으면 녹색도에서 추정한다.
+        """
         greenness = min(green_ratio * 150, 100)
-        yellowing = max(0, 30 - greenness * 0.5)
-        browning = max(0, 20 - greenness * 0.3)
+        if yellow_ratio is None:
+            yellowing = max(0, 30 - greenness * 0.5)
+            browning = max(0, 20 - greenness * 0.3)
+        else:
+            vegetation = green_ratio + yellow_ratio + brown_ratio
+            yellowing = yellow_ratio / vegetation * 100 if vegetation else 0.0
+            browning = brown_ratio / vegetation * 100 if vegetation else 0.0
         
-        return {
+        scores = {
             'greenness': float(greenness),
             'yellowing': float(yellowing),
             'browning': float(browning),
             'green_ratio': float(green_ratio)
         }
+        if yellow_ratio is not None:
+            scores['yellow_ratio'] = float(yellow_ratio)
+            scores['brown_ratio'] = float(brown_ratio)
+        return scores
     
-    def _analyze_shapes(self, image: np.ndarray) -> Dict[str, Any]:
-        """형태 분석"""
-        # 그레이스케일 변환
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    def _color_scores_batch(self, green_ratio: np.ndarray, yellow_ratio: Optional[np.ndarray] = None,
+                            brown_ratio: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """녹색(및 황변/갈변) 비율 배열로 색상 점수 일괄 계산 (_color_scores와 같은 식)"""
+        greenness = np.minimum(green_ratio * 150, 100)
+        if yellow_ratio is None:
+            return {
+                'greenness': greenness,
+                'yellowing': np.maximum(0, 30 - greenness * 0.5),
+                'browning': np.maximum(0, 20 - greenness * 0.3),
+                'green_ratio': green_ratio
+            }
         
+        vegetation = green_ratio + yellow_ratio + brown_ratio
+        safe = np.where(vegetation > 0, vegetation, 1)
+        return {
+            'greenness': greenness,
+            'yellowing': np.where(vegetation > 0, yellow_ratio / safe * 100, 0.0),
+            'browning': np.where(vegetation > 0, brown_ratio / safe * 100, 0.0),
+            'green_ratio': green_ratio,
+            'yellow_ratio': yellow_ratio,
+            'brown_ratio': brown_ratio
+        }
+    
+    def _analyze_shapes(self, planes: Dict[str, np.ndarray], area_scale: float = 1.0) -> Dict[str, Any]:
+        """형태 분석 (면적은 area_scale로 원본 해상도 기준 환산)"""
+        leaf_count, total_area, _ = self._count_contours(planes['gray'], planes['edges'], area_scale)
+        return self._shape_summary(leaf_count, total_area)
+    
+    def _count_contours(self, gray: np.ndarray, edges: Optional[np.ndarray] = None,
+                        area_scale: float = 1.0) -> Tuple[int, float, List[Tuple[int, int, int, int]]]:
+        """Canny 엣지 컨투어로 잎 개수, 총 면적, 잎 외곽 박스(x, y, w, h) 계산"""
+        contours, areas = self._find_contours(gray, edges)
+        
+        with timing.stage('contours'):
+            # 잎 개수 추정 (최소 잎 면적 100px은 원본 해상도 기준)
+            min_leaf_area = 100 / area_scale
+            leaf_boxes = [cv2.boundingRect(c) for c, area in zip(contours, areas) if area > min_leaf_area]
+            
+            # 크기 분류
+            total_area = sum(areas) * area_scale
+        
+        return len(leaf_boxes), total_area, leaf_boxes
+    
+    def _find_contours(self, gray: np.ndarray, edges: Optional[np.ndarray] = None) -> Tuple[list, List[float]]:
+        """Canny 엣지의 외곽 컨투어와 컨투어별 면적"""
         # 엣지 검출
-        edges = cv2.Canny(gray, 50, 150)
+        with timing.stage('canny'):
+            edges = cv2.Canny(gray, 50, 150, edges=edges)
         
-        # 컨투어 찾기
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        with timing.stage('contours'):
+            # 컨투어 찾기
+            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            areas = [cv2.contourArea(c) for c in contours]
         
-        # 잎 개수 추정
-        leaf_count = len([c for c in contours if cv2.contourArea(c) > 100])
+        return contours, areas
+    
+    def _analyze_shapes_components(self, planes: Dict[str, np.ndarray], area_scale: float = 1.0) -> Dict[str, Any]:
+        """형태 분석 - 녹색 마스크 연결 요소 기반
         
-        # 크기 분류
-        total_area = sum(cv2.contourArea(c) for c in contours)
+        Canny/컨투어 목록 대신 connectedComponentsWithStats의 통계 배열 한 번으로
+        잎 개수와 총 면적을 벡터 연산으로 계산한다. 잡음이 많은 이미지에서 훨씬 빠르다.
+        """
+        green_mask = planes['green_mask']
+        buffers = self._buffers
+        if getattr(buffers, 'labels_shape', None) != green_mask.shape:
+            buffers.labels_shape = green_mask.shape
+            buffers.labels = np.empty(green_mask.shape, dtype=np.int32)
+        
+        leaf_count, total_area, _ = self._count_components(green_mask, area_scale, buffers.labels)
+        return self._shape_summary(leaf_count, total_area)
+    
+    def _count_components(self, green_mask: np.ndarray, area_scale: float = 1.0,
+                          labels: Optional[np.ndarray] = None) -> Tuple[int, float, List[Tuple[int, int, int, int]]]:
+        """녹색 마스크 연결 요소로 잎 개수, 총 면적, 잎 외곽 박스(x, y, w, h) 계산"""
+        stats = self._component_stats(green_mask, labels)
+        
+        with timing.stage('components'):
+            areas = stats[:, cv2.CC_STAT_AREA]
+            
+            # 잎 개수 추정 (최소 잎 면적 100px은 원본 해상도 기준)
+            leaves = stats[areas > 100 / area_scale]
+            total_area = float(areas.sum()) * area_scale
+        
+        leaf_boxes = [tuple(int(v) for v in box) for box in leaves[:, :4]]
+        return len(leaf_boxes), total_area, leaf_boxes
+    
+    def _component_stats(self, green_mask: np.ndarray, labels: Optional[np.ndarray] = None) -> np.ndarray:
+        """녹색 마스크 연결 요소별 통계 (x, y, w, h, 면적 - 배경 제외)"""
+        with timing.stage('components'):
+            _, _, stats, _ = cv2.connectedComponentsWithStats(
+                green_mask, labels=labels, connectivity=8, ltype=cv2.CV_32S
+            )
+        
+        # 0번은 배경
+        return stats[1:]
+    
+    def _shape_summary(self, leaf_count: int, total_area: float) -> Dict[str, Any]:
+        """잎 개수와 총 면적으로 형태 분석 결과 생성"""
         if total_area > 50000:
             size_category = "대형"
         elif total_area > 20000:
@@ -137,16 +741,75 @@ class PlantAnalysisAI:
         
         return max(0, min(100, health_score))
     
-    def _assess_image_quality(self, image: np.ndarray) -> float:
+    def _health_score_batch(self, colors: Dict[str, np.ndarray], leaf_count: np.ndarray) -> np.ndarray:
+        """건강도 점수 일괄 계산 (_calculate_health_score와 같은 식)"""
+        health_score = colors['greenness'] - colors['yellowing'] * 0.7 - colors['browning'] * 0.9
+        health_score = health_score + np.where(leaf_count > 5, 5, 0)
+        return np.clip(health_score, 0, 100)
+    
+    def _size_category_batch(self, total_area: np.ndarray) -> np.ndarray:
+        """총 면적 배열로 크기 분류 일괄 계산 (_shape_summary와 같은 기준)"""
+        return np.where(total_area > 50000, "대형", np.where(total_area > 20000, "중형", "소형"))
+    
+    def _assess_image_quality(self, planes: Dict[str, np.ndarray]) -> float:
         """이미지 품질 평가"""
-        # 밝기 평가
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        brightness = np.mean(gray)
+        with timing.stage('quality'):
+            # 밝기 평가
+            gray = planes['gray']
+            brightness = np.mean(gray)
+            
+            # 대비 평가
+            contrast = np.std(gray)
+        
+        return self._quality_score(brightness, contrast)
+    
+    def _check_quality(self, gray: np.ndarray):
+        """축소 그레이스케일에서 밝기/대비/선명도(라플라시안 분산) 검사, 미달 시 ImageQualityRejected
         
-        # 대비 평가
-        contrast = np.std(gray)
+        정수 배율 INTER_AREA 축소를 사용해 원본 해상도와 관계없이 1ms 안팎으로 끝난다.
+        """
+        with timing.stage('quality_gate'):
+            small = self._quality_sample(gray, self._quality_factor(*gray.shape))
+            mean, std = cv2.meanStdDev(small)
+            _, laplacian_std = cv2.meanStdDev(cv2.Laplacian(small, cv2.CV_16S))
+            metrics = {
+                'brightness': round(float(mean[0, 0]), 2),
+                'contrast': round(float(std[0, 0]), 2),
+                'sharpness': round(float(laplacian_std[0, 0]) ** 2, 2)
+            }
         
-        # 품질 점수 (0-100)
+        self._raise_if_rejected(metrics)
+    
+    def _quality_factor(self, height: int, width: int) -> int:
+        """품질 게이트 축소 배율 (긴 변이 기준 크기 이하가 되는 정수 배율)"""
+        return max(1, -(-max(height, width) // self.quality_thresholds['size']))
+    
+    @staticmethod
+    def _quality_sample(gray: np.ndarray, factor: int) -> np.ndarray:
+        """품질 게이트용 정수 배율 INTER_AREA 축소"""
+        if factor == 1:
+            return gray
+        height, width = gray.shape
+        return cv2.resize(gray, (max(1, width // factor), max(1, height // factor)), interpolation=cv2.INTER_AREA)
+    
+    def _raise_if_rejected(self, metrics: Dict[str, float]):
+        """품질 지표가 기준 미달이면 ImageQualityRejected"""
+        thresholds = self.quality_thresholds
+        reasons = []
+        if metrics['brightness'] < thresholds['min_brightness']:
+            reasons.append('too_dark')
+        elif metrics['brightness'] > thresholds['max_brightness']:
+            reasons.append('overexposed')
+        if metrics['contrast'] < thresholds['min_contrast']:
+            reasons.append('low_contrast')
+        if metrics['sharpness'] < thresholds['min_sharpness']:
+            reasons.append('blurry')
+        
+        if reasons:
+            raise ImageQualityRejected(metrics, reasons)
+    
+    def _quality_score(self, brightness: float, contrast: float) -> float:
+        """밝기/대비로 품질 점수 계산 (0-100)"""
         quality_score = min((brightness / 128) * (contrast / 64) * 100, 100)
         return max(50, quality_score)  # 최소 50점
     
@@ -217,32 +880,93 @@ class PlantAnalysisAI:
         """환경 기반 권장사항 생성"""
         recommendations = []
         
-        temp = env_data.get('innerTemperature', 25)
-        humidity = env_data.get('innerHumidity', 60)
-        ph = env_data.get('ph', 6.5)
-        ec = env_data.get('ec', 2.0)
+        for code, key, direction, threshold, message in ENV_RECOMMENDATION_RULES:
+            value = env_data.get(key, ENV_DEFAULTS[key])
+            if (value < threshold) if direction == 'low' else (value > threshold):
+                recommendations.append(message)
+        
+        return recommendations
+    
+    def score_environment_batch(self, readings) -> Dict[str, np.ndarray]:
+        """환경 센서 이력 일괄 평가 (벡터 연산, 단건 경로와 동일한 점수)
         
-        if temp < 18:
-            recommendations.append("온도가 낮습니다. 난방을 강화하세요.")
-        elif temp > 32:
-            recommendations.append("온도가 높습니다. 환기를 증가시키세요.")
+        readings는 열 이름 → 배열 매핑(dict, pandas DataFrame) 또는 구조화 numpy 배열.
+        단건 경로에서 키가 없는 것과 같은 없는 열과 None 값은 기본값으로 채우고, NaN은 단건 경로와
+        같이 그대로 평가한다 (해당 점수 0, 권장사항 없음). 권장사항은 행별 비트마스크
+        (recommendation_codes)로 반환하며 recommendation_messages()로 문구로 변환한다.
+        """
+        columns = readings.dtype.names if isinstance(readings, np.ndarray) else readings
+        present = [key for key in ENV_DEFAULTS if key in columns]
+        if not present:
+            raise ValueError("환경 데이터 열이 없습니다: " + ", ".join(ENV_DEFAULTS))
+        length = len(readings[present[0]])
         
-        if humidity < 40:
-            recommendations.append("습도가 낮습니다. 가습기를 가동하세요.")
-        elif humidity > 80:
-            recommendations.append("습도가 높습니다. 제습이 필요합니다.")
+        values = {}
+        for key, default in ENV_DEFAULTS.items():
+            if key in present:
+                column = np.asarray(readings[key])
+                if column.dtype == object:
+                    column = np.where(np.equal(column, None), default, column)
+                values[key] = column.astype(np.float64)
+            else:
+                values[key] = np.full(length, default, dtype=np.float64)
         
-        if ph < 6.0:
-            recommendations.append("PH가 낮습니다. 석회질 비료를 추가하세요.")
-        elif ph > 7.5:
-            recommendations.append("PH가 높습니다. 황 성분 비료를 추가하세요.")
+        temp_score = self._evaluate_temperature_batch(values['innerTemperature'])
+        humidity_score = self._evaluate_humidity_batch(values['innerHumidity'])
+        ph_score = self._evaluate_ph_batch(values['ph'])
+        ec_score = self._evaluate_ec_batch(values['ec'])
         
-        if ec < 1.0:
-            recommendations.append("EC 농도가 낮습니다. 비료 공급을 늘리세요.")
-        elif ec > 3.0:
-            recommendations.append("EC 농도가 높습니다. 물로 희석하세요.")
+        # 권장사항 비트마스크 (비트 순서 = ENV_RECOMMENDATION_RULES 순서)
+        codes = np.zeros(length, dtype=np.uint16)
+        for bit, (code, key, direction, threshold, message) in enumerate(ENV_RECOMMENDATION_RULES):
+            triggered = values[key] < threshold if direction == 'low' else values[key] > threshold
+            codes |= triggered.astype(np.uint16) << bit
         
-        return recommendations
+        return {
+            'temperature_score': temp_score,
+            'humidity_score': humidity_score,
+            'ph_score': ph_score,
+            'ec_score': ec_score,
+            'overall_score': (temp_score + humidity_score + ph_score + ec_score) / 4,
+            'recommendation_codes': codes
+        }
+    
+    @staticmethod
+    def recommendation_messages(code: int) -> List[str]:
+        """권장사항 비트마스크를 문구 목록으로 변환 (단건 경로와 같은 순서)"""
+        return [
+            message for bit, (_, _, _, _, message) in enumerate(ENV_RECOMMENDATION_RULES)
+            if int(code) & (1 << bit)
+        ]
+    
+    # 일괄 평가는 단건 평가의 분기 순서를 그대로 따른다: 적정 범위 → 하한 미만 → 그 외.
+    # NaN은 모든 비교가 거짓이라 마지막 분기로 가고, max(0, NaN)이 0인 것처럼 np.fmax로 0점이 된다.
+    def _evaluate_temperature_batch(self, temp: np.ndarray) -> np.ndarray:
+        """온도 일괄 평가"""
+        min_temp, max_temp = self.temperature_optimal_range
+        return np.where((min_temp <= temp) & (temp <= max_temp), 100.0,
+                        np.where(temp < min_temp, np.fmax(0, 100 - (min_temp - temp) * 5),
+                                 np.fmax(0, 100 - (temp - max_temp) * 3)))
+    
+    def _evaluate_humidity_batch(self, humidity: np.ndarray) -> np.ndarray:
+        """습도 일괄 평가"""
+        min_hum, max_hum = self.humidity_optimal_range
+        return np.where((min_hum <= humidity) & (humidity <= max_hum), 100.0,
+                        np.where(humidity < min_hum, np.fmax(0, 100 - (min_hum - humidity) * 2),
+                                 np.fmax(0, 100 - (humidity - max_hum) * 2)))
+    
+    def _evaluate_ph_batch(self, ph: np.ndarray) -> np.ndarray:
+        """PH 일괄 평가"""
+        min_ph, max_ph = self.ph_optimal_range
+        deviation = np.minimum(np.abs(ph - min_ph), np.abs(ph - max_ph))
+        return np.where((min_ph <= ph) & (ph <= max_ph), 100.0, np.fmax(0, 100 - deviation * 20))
+    
+    def _evaluate_ec_batch(self, ec: np.ndarray) -> np.ndarray:
+        """EC 일괄 평가"""
+        min_ec, max_ec = self.ec_optimal_range
+        return np.where((min_ec <= ec) & (ec <= max_ec), 100.0,
+                        np.where(ec < min_ec, np.fmax(0, 100 - (min_ec - ec) * 30),
+                                 np.fmax(0, 100 - (ec - max_ec) * 20)))
     
     def _generate_final_analysis(self, image_analysis: Dict, env_analysis: Dict, 
                                model_id: str, analysis_items: List[str]) -> Dict[str, Any]:
@@ -305,3 +1029,20 @@ class PlantAnalysisAI:
             'confidence': float(min(image_analysis['image_quality'], 95)),
             'timestamp': '실시간 분석 완료'
         }
+
+
+_plant_ai = None
+_plant_ai_lock = threading.Lock()
+
+
+def get_plant_analysis_ai() -> PlantAnalysisAI:
+    """프로세스 공용 분석기 반환
+
+    동기 요청, 비동기 작업 스레드, 분석 엔진 인라인 분석이 같은 인스턴스를 써서
+    타임랩스 키프레임 상태와 평면 버퍼를 공유한다 (포크된 워커는 부모의 인스턴스를 복사해 사용).
+    """
+    global _plant_ai
+    with _plant_ai_lock:
+        if _plant_ai is None:
+            _plant_ai = PlantAnalysisAI()
+        return _plant_ai
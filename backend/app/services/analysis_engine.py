@@ -0,0 +1,360 @@
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+
+from ..config import Config
+from ..utils import timing
+
+logger = logging.getLogger(__name__)
+
+# 자식 프로세스 전역 상태 (프로세스마다 한 번만 초기화)
+_worker_ai = None
+
+# 풀 세대 폐기 사유
+RETIRED_TIMEOUT = 'timeout'  # 자식이 제한 시간 안에 끝나지 않음 (같은 세대의 다른 작업은 새 세대에 다시 제출)
+RETIRED_BROKEN = 'broken'  # 자식 프로세스 비정상 종료
+
+
+def _init_worker(started=None):
+    """자식 프로세스 초기화 - cv2/numpy 임포트 및 분석기 생성은 프로세스당 한 번
+
+    결과 캐시는 부모 프로세스가 제출 전에 조회하고 결과를 저장하므로 자식에서는 사용하지 않는다.
+    started: 자식 PID를 부모에 알리는 큐 (세대 폐기 시 멈춘 자식까지 종료하는 데 사용)
+    """
+    global _worker_ai
+    import cv2
+    from .ai import PlantAnalysisAI
+
+    # 병렬성은 프로세스 풀이 담당하므로 OpenCV 내부 스레드는 1개로 제한
+    cv2.setNumThreads(1)
+    _worker_ai = PlantAnalysisAI(use_cache=False)
+    if started is not None:
+        started.put(os.getpid())
+
+
+def _warmup() -> int:
+    """풀 예열용 작업"""
+    return os.getpid()
+
+
+class AnalysisTimeout(BaseException):
+    """이미지 분석 시간 초과 (분석기 내부의 except Exception에 잡히지 않도록 BaseException 상속)"""
+
+
+def _raise_timeout(signum, frame):
+    raise AnalysisTimeout()
+
+
+def _analyze_in_worker(image_bytes: bytes, environment_data: Dict, model_id: str,
+                       analysis_items: List[str], timeout: Optional[float],
+                       collect_timings: bool = False) -> Dict[str, Any]:
+    """자식 프로세스에서 이미지 한 장 분석 (시간 제한 적용)
+
+    collect_timings가 켜져 있으면 단계별 소요 시간을 결과의 '_timings'에 담아 부모에 전달한다.
+    """
+    use_alarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    with (timing.capture() if collect_timings else nullcontext()) as collected:
+        try:
+            result = _worker_ai.analyze_plant_bytes(image_bytes, environment_data, model_id, analysis_items)
+        except AnalysisTimeout:
+            result = {'error': f"이미지 분석 시간 초과 ({timeout}초)"}
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    if collect_timings:
+        result['_timings'] = collected
+    return result
+
+
+class _PoolGeneration:
+    """프로세스 풀 한 세대
+
+    멈추거나 손상된 풀은 세대 단위로 폐기하고 다음 제출 때 새 세대를 만든다.
+    자식은 초기화 때 PID를 started 큐로 알리므로 executor 내부 상태 없이 멈춘 자식을 종료할 수 있다.
+    """
+
+    def __init__(self, max_workers: int, context):
+        self.started = context.SimpleQueue()
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.started,)
+        )
+        self.retired = None
+
+    def terminate(self):
+        """대기 중인 작업을 취소하고 자식 프로세스 종료"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        pids = set()
+        while not self.started.empty():
+            pids.add(self.started.get())
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+
+class _PoolTask:
+    """풀에 제출한 이미지 한 장 (세대가 폐기되면 같은 이미지를 새 세대에 다시 제출)"""
+    __slots__ = ('image', 'image_hash', 'generation', 'future', 'submitted', 'resubmitted')
+
+    def __init__(self, image: bytes, image_hash: Optional[str]):
+        self.image = image
+        self.image_hash = image_hash
+        self.generation = None
+        self.future = None
+        self.submitted = None
+        self.resubmitted = False
+
+
+class AnalysisEngine:
+    """다중 이미지 분석용 프로세스 풀 엔진
+
+    미리 예열된 고정 크기 프로세스 풀에서 한 요청의 이미지들을 병렬 분석하고,
+    입력 순서대로 결과를 반환한다. 실패하거나 시간을 초과한 이미지는
+    {'error': 메시지} 항목으로 반환되어 나머지 배치를 막지 않는다.
+
+    풀은 요청 스레드와 비동기 작업 스레드가 함께 쓴다. 이미지 하나가 시간을 초과하면 그 세대의 풀을
+    폐기하고, 같은 세대에서 실행 중이던 다른 이미지(다른 호출자 포함)는 새 세대에 다시 제출하므로
+    시간 초과는 해당 이미지에만 영향을 준다. 풀 크기가 1 이하면 병렬 이득 없이 IPC 비용만 들기 때문에
+    현재 프로세스에서 순차 분석한다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None,
+                 start_method: Optional[str] = None):
+        self.max_workers = Config.ANALYSIS_WORKERS if max_workers is None else max_workers
+        self.timeout = Config.ANALYSIS_TIMEOUT if timeout is None else timeout
+        self.start_method = start_method or Config.ANALYSIS_START_METHOD
+        self._generation = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._local_ai = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 1
+
+    def start(self):
+        """프로세스 풀 생성 및 예열 (이미 실행 중이거나 풀 비활성화 시 무시)"""
+        if self.enabled:
+            self._current()
+
+    def _current(self) -> _PoolGeneration:
+        """현재 세대 풀 (없으면 새로 만들고 모든 자식 프로세스가 초기화될 때까지 대기)"""
+        with self._lock:
+            if self._generation is not None and self._pid == os.getpid():
+                return self._generation
+            generation = self._generation = _PoolGeneration(
+                self.max_workers, multiprocessing.get_context(self.start_method)
+            )
+            self._pid = os.getpid()
+
+        try:
+            warmups = [generation.executor.submit(_warmup) for _ in range(self.max_workers)]
+            pids = {f.result() for f in warmups}
+            logger.info(f"✅ 분석 엔진 예열 완료 (프로세스 {len(pids)}개)")
+        except (BrokenProcessPool, CancelledError, RuntimeError):
+            # 예열 중 폐기된 세대 (제출하는 쪽에서 새 세대를 다시 만듦)
+            pass
+        return generation
+
+    def shutdown(self):
+        """프로세스 풀 종료"""
+        with self._lock:
+            generation, self._generation = self._generation, None
+        if generation is not None and self._pid == os.getpid():
+            generation.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _retire(self, generation: _PoolGeneration, reason: str):
+        """멈추거나 손상된 세대의 풀 폐기 (이미 폐기된 세대면 무시, 새 세대는 다음 제출 때 생성)"""
+        with self._lock:
+            if generation.retired is not None:
+                return
+            generation.retired = reason
+            if self._generation is generation:
+                self._generation = None
+        generation.terminate()
+        logger.warning(f"⚠️ 분석 엔진 프로세스 풀 재시작 ({reason})")
+
+    def get_local_ai(self):
+        """현재 프로세스 분석기 (인라인 분석 및 결과 캐시 조회/저장용, 라우트와 같은 프로세스 공용 인스턴스)"""
+        if self._local_ai is None:
+            from .ai import get_plant_analysis_ai
+            self._local_ai = get_plant_analysis_ai()
+        return self._local_ai
+
+    def _cache_lookup(self, image, environment_data: Dict, model_id: str,
+                      analysis_items: List[str]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """풀에 제출하기 전 부모 프로세스 캐시 조회 - (이미지 해시, 캐시된 결과)"""
+        ai = self.get_local_ai()
+        if ai.cache is None:
+            return None, None
+        image_hash = ai.cache.digest(image)
+        return image_hash, ai.cached_analysis(image_hash, environment_data, model_id, analysis_items)
+
+    def _cache_store(self, image_hash: Optional[str], environment_data: Dict, model_id: str,
+                     analysis_items: List[str], result: Dict[str, Any]):
+        """자식 프로세스 분석 결과를 부모 프로세스 캐시에 저장"""
+        if image_hash is not None:
+            self.get_local_ai().store_analysis(image_hash, environment_data, model_id, analysis_items, result)
+
+    def _analyze_inline(self, images: List, environment_data: Dict, model_id: str,
+                        analysis_items: List[str]) -> List[Dict[str, Any]]:
+        """현재 프로세스에서 순차 분석 (단일 이미지 또는 풀 비활성화 시)"""
+        ai = self.get_local_ai()
+        results = []
+        for image in images:
+            try:
+                results.append(ai.analyze_plant_bytes(image, environment_data, model_id, analysis_items))
+            except Exception as e:
+                results.append({'error': str(e)})
+        return results
+
+    def _submit(self, task: _PoolTask, args: Tuple) -> bool:
+        """현재 세대 풀에 이미지 제출 (폐기된 세대면 새 세대에 한 번 더 시도), 실패하면 False"""
+        for _ in range(2):
+            generation = self._current()
+            try:
+                task.future = generation.executor.submit(_analyze_in_worker, task.image, *args)
+            except (BrokenProcessPool, RuntimeError):
+                self._retire(generation, RETIRED_BROKEN)
+                continue
+            task.generation = generation
+            task.submitted = time.monotonic()
+            return True
+        task.future = None
+        return False
+
+    def _wait(self, task: _PoolTask, waves: int, args: Tuple) -> Optional[Dict[str, Any]]:
+        """제출한 이미지 결과 대기 (풀에 다시 제출할 수 없으면 None - 호출자가 현재 프로세스에서 분석)
+
+        waves: 마감 시각에 반영할 대기열 차례 수 (풀 크기 단위로 한 차례씩 실행됨)
+        """
+        while True:
+            remaining = None
+            if self.timeout:
+                remaining = max(0.0, task.submitted + self.timeout * waves + 1.0 - time.monotonic())
+            try:
+                result = task.future.result(timeout=remaining)
+            except FutureTimeoutError:
+                task.future.cancel()
+                self._retire(task.generation, RETIRED_TIMEOUT)
+                return {'error': f"이미지 분석 시간 초과 ({self.timeout}초)"}
+            except (BrokenProcessPool, CancelledError):
+                # 다른 이미지의 시간 초과로 폐기된 세대면 항상, 자식 비정상 종료면 한 번만 다시 제출
+                retry = task.generation.retired == RETIRED_TIMEOUT or not task.resubmitted
+                self._retire(task.generation, RETIRED_BROKEN)
+                if not retry:
+                    return {'error': "분석 프로세스가 비정상 종료되었습니다"}
+                task.resubmitted = True
+                if not self._submit(task, args):
+                    return None
+                continue
+            except Exception as e:
+                return {'error': str(e)}
+
+            stage_timings = result.pop('_timings', None)
+            if stage_timings:
+                timing.record_many(stage_timings)
+            return result
+
+    def _finish(self, task: _PoolTask, waves: int, args: Tuple) -> Dict[str, Any]:
+        """풀 결과를 받아 캐시에 저장 (풀을 쓸 수 없으면 현재 프로세스에서 분석)"""
+        environment_data, model_id, analysis_items = args[:3]
+        result = self._wait(task, waves, args) if task.future is not None else None
+        if result is None:
+            result = self._analyze_inline([task.image], environment_data, model_id, analysis_items)[0]
+        self._cache_store(task.image_hash, environment_data, model_id, analysis_items, result)
+        return result
+
+    def analyze_batch(self, images: List, environment_data: Dict, model_id: str,
+                      analysis_items: List[str]) -> List[Dict[str, Any]]:
+        """이미지 바이트 목록을 병렬 분석하여 입력 순서대로 결과 반환"""
+        if not self.enabled or len(images) <= 1:
+            return self._analyze_inline(images, environment_data, model_id, analysis_items)
+
+        # 캐시 조회는 부모 프로세스에서 (캐시된 이미지는 풀에 제출하지 않음)
+        lookups = [self._cache_lookup(image, environment_data, model_id, analysis_items) for image in images]
+        missing = [index for index, (_, cached) in enumerate(lookups) if cached is None]
+        results = [cached for _, cached in lookups]
+        if len(missing) <= 1:
+            for index in missing:
+                results[index] = self._analyze_inline([images[index]], environment_data, model_id, analysis_items)[0]
+            return results
+
+        args = (environment_data, model_id, analysis_items, self.timeout, timing.is_enabled())
+        tasks = []
+        for index in missing:
+            task = _PoolTask(bytes(images[index]), lookups[index][0])
+            self._submit(task, args)
+            tasks.append(task)
+
+        for position, (index, task) in enumerate(zip(missing, tasks)):
+            results[index] = self._finish(task, position // self.max_workers + 1, args)
+        return results
+
+    def analyze_stream(self, images: Iterable[Tuple[Any, bytes]], environment_data: Dict, model_id: str,
+                       analysis_items: List[str]) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """(키, 이미지 바이트)를 읽는 대로 풀에 제출하고 (키, 결과)를 입력 순서대로 반환
+
+        압축 파일 멤버처럼 하나씩 읽히는 입력용. 입력을 모두 읽기 전에 분석이 시작되며,
+        동시에 제출되는 이미지는 풀 크기의 2배로 제한해 입력 전체를 메모리에 올리지 않는다.
+        """
+        if not self.enabled:
+            for key, image in images:
+                yield key, self._analyze_inline([image], environment_data, model_id, analysis_items)[0]
+            return
+
+        args = (environment_data, model_id, analysis_items, self.timeout, timing.is_enabled())
+        max_pending = self.max_workers * 2
+        waves = max_pending // self.max_workers + 1
+        pending = deque()
+
+        def collect():
+            key, task, cached = pending.popleft()
+            if cached is not None:
+                return key, cached
+            return key, self._finish(task, waves, args)
+
+        try:
+            for key, image in images:
+                image_hash, cached = self._cache_lookup(image, environment_data, model_id, analysis_items)
+                task = None
+                if cached is None:
+                    task = _PoolTask(bytes(image), image_hash)
+                    self._submit(task, args)
+                pending.append((key, task, cached))
+                while len(pending) >= max_pending:
+                    yield collect()
+            while pending:
+                yield collect()
+        finally:
+            for _, task, _ in pending:
+                if task is not None and task.future is not None:
+                    task.future.cancel()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_analysis_engine() -> AnalysisEngine:
+    """프로세스별 공용 분석 엔진 반환 (포크된 워커에서는 새로 생성)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None or (_engine._pid is not None and _engine._pid != os.getpid()):
+            _engine = AnalysisEngine()
+        return _engine
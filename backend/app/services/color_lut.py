@@ -0,0 +1,45 @@
+import functools
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+# 색상 분류 코드 (녹색은 255라 cv2.compare 한 번으로 0/255 녹색 마스크가 됨)
+COLOR_CLASS_NONE = 0
+COLOR_CLASS_YELLOW = 1
+COLOR_CLASS_BROWN = 2
+COLOR_CLASS_GREEN = 255
+
+# HSV 범위 ((lower), (upper)) - 녹색, 황변, 갈변 순
+HsvRanges = Tuple[Tuple[Tuple[int, int, int], Tuple[int, int, int]], ...]
+
+
+@functools.lru_cache(maxsize=8)
+def get_color_lut(ranges: HsvRanges) -> np.ndarray:
+    """BGR565 양자화 색상 → 분류 코드 룩업 테이블 (기준 범위 조합마다 프로세스당 한 번 생성)
+
+    BGR565 코드(B 5비트, G 6비트, R 5비트) 65536개 각각의 대표색(양자화 구간 중앙값)을
+    HSV로 변환해 기준 범위로 분류한다. 분석 시에는 픽셀을 BGR565로 묶은 값으로 바로 조회하므로
+    HSV 변환과 범위 검사가 생략된다. 범위 경계 근처 픽셀은 양자화 때문에 HSV 경로와 다를 수 있다.
+    """
+    green, yellow, brown = ranges
+    codes = np.arange(1 << 16, dtype=np.uint16)
+    packed = codes.view(np.uint8).reshape(256, 256, 2)
+    bgr = cv2.cvtColor(packed, cv2.COLOR_BGR5652BGR)
+    bgr = cv2.add(bgr, np.full(bgr.shape, (4, 2, 4), dtype=np.uint8))
+    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+
+    lut = np.full((256, 256), COLOR_CLASS_NONE, dtype=np.uint8)
+    for code, (lower, upper) in ((COLOR_CLASS_BROWN, brown), (COLOR_CLASS_YELLOW, yellow),
+                                 (COLOR_CLASS_GREEN, green)):
+        lut[cv2.inRange(hsv, np.array(lower), np.array(upper)) > 0] = code
+    lut = lut.ravel()
+    lut.flags.writeable = False
+    return lut
+
+
+def classify_colors(image: np.ndarray, lut: np.ndarray, packed: np.ndarray, classes: np.ndarray) -> np.ndarray:
+    """BGR 이미지 픽셀을 룩업 테이블로 분류 (packed, classes는 재사용 버퍼)"""
+    cv2.cvtColor(image, cv2.COLOR_BGR2BGR565, dst=packed)
+    np.take(lut, packed.view(np.uint16)[..., 0], out=classes)
+    return classes
@@ -6,6 +6,10 @@ import sqlite3
 import json
 import os
 import pickle
+import threading
+import time
+import warnings
+from collections import OrderedDict, namedtuple
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from sklearn.cluster import KMeans
@@ -13,6 +17,8 @@ from sklearn.preprocessing import StandardScaler
 from cryptography.fernet import Fernet
 import hashlib
 
+from ..config import Config
+
 class GlobalPlantModel(nn.Module):
     """글로벌 기본 모델 - 모든 농가 데이터로 학습된 기반 모델"""
     
@@ -88,6 +94,157 @@ class FarmClusterModel(nn.Module):
     def forward(self, features):
         return self.adjustment_layer(features)
 
+class HybridEnsemble(nn.Module):
+    """하이브리드 결합 모듈 - 글로벌 특성을 한 번 계산해 모든 보조 모델에 전달하고 가중 합산까지 수행
+    
+    heads는 글로벌 특성을 입력받는 모델(개인화 레이어, 클러스터 모델), weights는 글로벌 출력부터
+    순서대로의 결합 가중치. TorchScript(torch.jit.script) 또는 torch.compile로 변환할 수 있다.
+    """
+    
+    def __init__(self, global_model: nn.Module, heads: List[nn.Module], weights: List[float]):
+        super().__init__()
+        self.global_model = global_model
+        self.heads = nn.ModuleList(heads)
+        self.register_buffer('weights', torch.tensor(weights))
+    
+    def forward(self, x):
+        features, output = self.global_model(x)
+        output = output * self.weights[0]
+        for index, head in enumerate(self.heads):
+            output = output + head(features) * self.weights[index + 1]
+        return output
+
+
+def compile_ensemble(ensemble: HybridEnsemble, backend: str = 'script') -> nn.Module:
+    """결합 모듈 변환 (script: TorchScript, compile: torch.compile, eager: 변환 안 함)"""
+    ensemble.eval()
+    try:
+        if backend == 'script':
+            with warnings.catch_warnings():
+                # 최신 torch의 torch.jit 사용 중단 예고 경고 무시
+                warnings.simplefilter('ignore', FutureWarning)
+                return torch.jit.script(ensemble)
+        if backend == 'compile':
+            return torch.compile(ensemble, dynamic=True)
+    except Exception as e:
+        print(f"⚠️ 결합 모듈 변환 실패, eager 모드 사용: {e}")
+    return ensemble
+
+
+# 공용 모델 스냅샷 (교체 시 새 튜플로 바꾸므로 예측 도중에는 같은 모델을 계속 사용)
+SharedModelSet = namedtuple('SharedModelSet', ['version', 'signature', 'global_model', 'cluster_models'])
+
+CLUSTER_TYPES = ("smart_greenhouse", "traditional_greenhouse", "open_field")
+
+
+class SharedGlobalModels:
+    """프로세스 공용 글로벌 모델 + 클러스터 모델 (모든 농가 인스턴스가 참조)
+    
+    농가마다 다른 것은 개인화 레이어뿐이므로 글로벌/클러스터 모델은 워커당 한 벌만 평가 모드로 유지한다.
+    global_model.pt의 (수정 시각, 크기)가 바뀌면 새 모델을 만들어 스냅샷 참조를 통째로 교체한다.
+    진행 중인 예측은 이전 스냅샷을 그대로 쓰고, 다른 스레드가 다시 로드하는 동안 들어온 요청도
+    기다리지 않고 이전 스냅샷을 사용한다. 공용 모델은 읽기 전용이다 (학습 금지).
+    개인화 전 농가가 쓰는 글로벌 전용 결합 모듈도 모델 버전별로 한 번만 변환해 공유한다.
+    """
+    
+    def __init__(self, global_model_path: str):
+        self.global_model_path = global_model_path
+        self._current = None
+        self._lock = threading.Lock()
+        self._global_ensembles = {}  # 모델 버전 → 글로벌 전용 결합 모듈
+        self._ensemble_lock = threading.Lock()
+        self._stats = {'loads': 0, 'load_failures': 0, 'global_ensemble_builds': 0}
+    
+    def current(self) -> SharedModelSet:
+        """최신 모델 스냅샷 반환 (파일이 바뀌었으면 다시 로드)"""
+        snapshot = self._current
+        signature = self._file_signature()
+        if snapshot is not None and snapshot.signature == signature:
+            return snapshot
+        
+        if snapshot is None:
+            self._lock.acquire()
+        elif not self._lock.acquire(blocking=False):
+            # 다른 스레드가 로드 중 - 기다리지 않고 이전 모델 사용
+            return snapshot
+        try:
+            snapshot = self._current
+            if snapshot is None or snapshot.signature != signature:
+                snapshot = self._current = self._load(snapshot, signature)
+            return snapshot
+        finally:
+            self._lock.release()
+    
+    def _load(self, previous: Optional[SharedModelSet], signature) -> SharedModelSet:
+        global_model = GlobalPlantModel()
+        if signature is not None:
+            try:
+                global_model.load_state_dict(torch.load(self.global_model_path))
+                self._stats['loads'] += 1
+                print("✅ 글로벌 모델 로드 완료")
+            except Exception:
+                # 쓰는 중이거나 손상된 파일 - 이전 모델 유지 (파일이 다시 바뀌면 재시도)
+                self._stats['load_failures'] += 1
+                print("⚠️ 글로벌 모델 로드 실패, " + ("이전 모델 유지" if previous else "기본 모델 사용"))
+                if previous is not None:
+                    return previous._replace(signature=signature)
+        
+        # 클러스터 모델은 저장 파일이 없으므로 처음 만든 세트를 계속 공유
+        cluster_models = previous.cluster_models if previous else {
+            cluster_type: FarmClusterModel(cluster_type) for cluster_type in CLUSTER_TYPES
+        }
+        for model in (global_model, *cluster_models.values()):
+            model.eval()
+            model.requires_grad_(False)
+        
+        version = previous.version + 1 if previous else 1
+        return SharedModelSet(version, signature, global_model, cluster_models)
+    
+    def global_ensemble(self, models: SharedModelSet) -> nn.Module:
+        """비개인화 예측용 글로벌 전용 결합 모듈 (모델 버전별로 워커당 한 번 변환)"""
+        ensemble = self._global_ensembles.get(models.version)
+        if ensemble is not None:
+            return ensemble
+        
+        with self._ensemble_lock:
+            ensemble = self._global_ensembles.get(models.version)
+            if ensemble is None:
+                ensemble = compile_ensemble(HybridEnsemble(models.global_model, [], [1.0]),
+                                            Config.FEDERATED_ENSEMBLE_BACKEND)
+                self._stats['global_ensemble_builds'] += 1
+                # 진행 중인 예측이 쓰는 직전 버전까지만 유지
+                ensembles = {**self._global_ensembles, models.version: ensemble}
+                self._global_ensembles = {version: ensembles[version] for version in sorted(ensembles)[-2:]}
+            return ensemble
+    
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.global_model_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._current
+        return {
+            **self._stats,
+            'version': snapshot.version if snapshot else 0,
+            'global_model_file': snapshot is not None and snapshot.signature is not None
+        }
+
+
+_shared_models = {}
+_shared_models_lock = threading.Lock()
+
+
+def get_shared_models(global_model_path: str) -> SharedGlobalModels:
+    """경로별 프로세스 공용 글로벌/클러스터 모델 반환"""
+    with _shared_models_lock:
+        if global_model_path not in _shared_models:
+            _shared_models[global_model_path] = SharedGlobalModels(global_model_path)
+        return _shared_models[global_model_path]
+
+
 class FederatedFarmAI:
     """연합학습 기반 하이브리드 농가 AI 시스템"""
     
@@ -101,17 +258,20 @@ class FederatedFarmAI:
         self.global_model_path = f"{self.models_dir}/global_model.pt"
         self.farm_model_path = f"{self.farm_models_dir}/{self.farm_hash}_personal.pt"
         self.farm_db_path = f"{self.farm_models_dir}/{self.farm_hash}_data.db"
+        self.key_path = f"{self.farm_models_dir}/{self.farm_hash}_key.key"
         
         # 디렉토리 생성
         os.makedirs(self.models_dir, exist_ok=True)
         os.makedirs(self.farm_models_dir, exist_ok=True)
         
-        # 모델 초기화
-        self.global_model = GlobalPlantModel()
-        self.personal_layer = PersonalizedLayer()
-        self.cluster_models = self._init_cluster_models()
+        # 모델 초기화 (글로벌/클러스터 모델은 모든 농가가 공유, 개인화 레이어는 학습 중에만 train 모드)
+        self.shared_models = get_shared_models(self.global_model_path)
+        self.personal_layer = PersonalizedLayer().eval()
         self.scaler = StandardScaler()
         
+        # 변환된 개인화 결합 모듈 캐시 ((글로벌 모델 버전, 클러스터) → 모듈), 글로벌 전용 모듈은 공용 모델이 캐시
+        self._ensembles = {}
+        
         # 농가 정보
         self.farm_cluster = None
         self.training_data_count = 0
@@ -124,25 +284,47 @@ class FederatedFarmAI:
         
         # 기존 모델 로드
         self._load_models()
+        
+        # 캐시된 인스턴스를 같은 농가 요청끼리 직렬화하는 잠금 + 로드 시점 파일 시그니처
+        self.lock = threading.RLock()
+        self.loaded_signature = self.file_signature()
     
-    def _init_cluster_models(self) -> Dict[str, FarmClusterModel]:
-        """클러스터별 모델 초기화"""
-        return {
-            "smart_greenhouse": FarmClusterModel("smart_greenhouse"),
-            "traditional_greenhouse": FarmClusterModel("traditional_greenhouse"),
-            "open_field": FarmClusterModel("open_field")
-        }
+    @property
+    def global_model(self) -> GlobalPlantModel:
+        """공용 글로벌 모델 (읽기 전용)"""
+        return self.shared_models.current().global_model
+    
+    @property
+    def cluster_models(self) -> Dict[str, FarmClusterModel]:
+        """공용 클러스터 모델 (읽기 전용)"""
+        return self.shared_models.current().cluster_models
+    
+    def file_signature(self) -> tuple:
+        """농가 모델/키/DB 파일의 (수정 시각, 크기) - 다른 워커가 파일을 바꿨는지 확인용
+        
+        글로벌 모델 변경은 공용 모델(SharedGlobalModels)이 직접 다시 로드한다.
+        """
+        signature = []
+        for path in (self.farm_model_path, self.key_path, self.farm_db_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def _mark_files_current(self):
+        """이 인스턴스가 직접 쓴 파일 변경은 다시 로드 대상에서 제외"""
+        self.loaded_signature = self.file_signature()
     
     def _get_or_create_encryption_key(self) -> Fernet:
         """농가별 암호화 키 생성/로드"""
-        key_path = f"{self.farm_models_dir}/{self.farm_hash}_key.key"
-        
-        if os.path.exists(key_path):
-            with open(key_path, 'rb') as f:
+        if os.path.exists(self.key_path):
+            with open(self.key_path, 'rb') as f:
                 key = f.read()
         else:
             key = Fernet.generate_key()
-            with open(key_path, 'wb') as f:
+            with open(self.key_path, 'wb') as f:
                 f.write(key)
         
         return Fernet(key)
@@ -251,103 +433,136 @@ class FederatedFarmAI:
         
         conn.commit()
         conn.close()
+        self._mark_files_current()
     
     def hybrid_predict(self, input_data: Dict, use_existing_ai: bool = True) -> Dict[str, Any]:
         """하이브리드 예측 - 기존 AI + 연합학습 AI 결합"""
+        return self.hybrid_predict_batch([input_data], use_existing_ai)[0]
+    
+    def hybrid_predict_batch(self, inputs: List[Dict], use_existing_ai: bool = True) -> List[Dict[str, Any]]:
+        """여러 입력 일괄 하이브리드 예측 (N×20 텐서 하나로 모델별 순전파 한 번씩)
+        
+        결과는 입력 순서대로 hybrid_predict를 하나씩 호출한 것과 같다 (기존 AI 시뮬레이션 난수도
+        같은 순서로 소비). 모델 출력 값만 행렬 곱 누적 순서 차이로 float32 반올림 오차만큼 다를 수 있다
+        (상대/절대 오차 1e-4 이내, tests/test_federated_batch.py에서 확인).
+        클러스터가 다른 입력은 클러스터별로 나누어 순전파한다 (prediction_cluster 참고).
+        """
+        if not inputs:
+            return []
         
         # 입력 데이터 전처리
-        processed_input = self._preprocess_input(input_data)
-        input_tensor = torch.FloatTensor(processed_input).unsqueeze(0)
+        input_tensor = torch.FloatTensor([self._preprocess_input(input_data) for input_data in inputs])
         
-        predictions = {}
+        # 예측 도중 글로벌 모델이 교체되어도 같은 모델 세트 사용
+        models = self.shared_models.current()
         
         # 기존 AI 시스템 예측 (시뮬레이션)
-        if use_existing_ai:
-            # 기존 AI 결과 시뮬레이션
-            existing_result = {
-                'overallScore': 75 + np.random.randint(-10, 15),
-                'confidence': 80 + np.random.randint(-5, 15),
-                'recommendations': [
-                    "물 공급량을 10% 증가시키세요.",
-                    "햇빛 노출을 늘려주세요.",
-                    "온도를 2도 낮춰주세요."
-                ]
-            }
-            
-            predictions['existing_ai'] = {
-                'health_score': existing_result.get('overallScore', 75),
-                'confidence': existing_result.get('confidence', 80),
-                'recommendations': existing_result.get('recommendations', []),
-                'weight': 0.3  # 기존 AI 가중치 30%
-            }
-        
-        # 연합학습 하이브리드 예측
-        if self.training_data_count >= 10:  # 충분한 데이터가 있을 때만
-            # 1단계: 글로벌 모델 예측
+        existing_predictions = [self._simulate_existing_ai() if use_existing_ai else None for _ in inputs]
+        
+        # 연합학습 하이브리드 예측 (글로벌 → 개인화 → 클러스터 결합을 변환된 모듈 한 번 호출로 수행)
+        personalized = self.training_data_count >= 10  # 충분한 데이터가 있을 때만
+        clusters = [self.prediction_cluster(input_data) for input_data in inputs]
+        outputs = [None] * len(inputs)
+        for cluster in dict.fromkeys(clusters):
+            indices = [index for index, value in enumerate(clusters) if value == cluster]
+            ensemble, confidence = self._get_ensemble(models, personalized, cluster)
             with torch.no_grad():
-                global_features, global_output = self.global_model(input_tensor)
-            
-            # 2단계: 개인화 레이어 적용
-            with torch.no_grad():
-                personal_output = self.personal_layer(global_features)
-            
-            # 3단계: 클러스터 모델 보정
-            cluster_output = None
-            if self.farm_cluster and self.farm_cluster in self.cluster_models:
-                with torch.no_grad():
-                    cluster_output = self.cluster_models[self.farm_cluster](global_features)
-            
-            # 하이브리드 결합
-            if cluster_output is not None:
-                # 3단계 앙상블
-                hybrid_output = (
-                    global_output * 0.4 +      # 글로벌 40%
-                    personal_output * 0.4 +    # 개인화 40%
-                    cluster_output * 0.2       # 클러스터 20%
-                )
-                confidence = 90
+                rows = ensemble(input_tensor[indices] if len(indices) < len(inputs) else input_tensor).tolist()
+            for index, row in zip(indices, rows):
+                outputs[index] = (row, confidence)
+        
+        results = []
+        for existing, cluster, (row, confidence) in zip(existing_predictions, clusters, outputs):
+            federated = self._federated_prediction(row)
+            if personalized:
+                federated.update({
+                    'confidence': confidence,
+                    'is_personalized': True,
+                    'training_samples': self.training_data_count,
+                    'cluster_type': cluster,
+                    'weight': 0.7  # 연합학습 AI 가중치 70%
+                })
             else:
-                # 2단계 앙상블
-                hybrid_output = (
-                    global_output * 0.6 +      # 글로벌 60%
-                    personal_output * 0.4      # 개인화 40%
-                )
-                confidence = 85
+                federated.update({
+                    'confidence': 70,
+                    'is_personalized': False,
+                    'training_samples': self.training_data_count,
+                    'message': f'개인화를 위해 {10 - self.training_data_count}개 더 필요',
+                    'weight': 0.7
+                })
             
-            predictions['federated_ai'] = {
-                'health_score': float(hybrid_output[0][0].item()),
-                'predicted_size': float(hybrid_output[0][1].item()),
-                'predicted_height': float(hybrid_output[0][2].item()),
-                'risk_level': float(hybrid_output[0][3].item()),
-                'growth_rate': float(hybrid_output[0][4].item()),
-                'confidence': confidence,
-                'is_personalized': True,
-                'training_samples': self.training_data_count,
-                'cluster_type': self.farm_cluster,
-                'weight': 0.7  # 연합학습 AI 가중치 70%
-            }
-        else:
-            # 데이터 부족시 글로벌 모델만 사용
-            with torch.no_grad():
-                global_features, global_output = self.global_model(input_tensor)
+            predictions = {'federated_ai': federated}
+            if existing is not None:
+                predictions['existing_ai'] = existing
             
-            predictions['federated_ai'] = {
-                'health_score': float(global_output[0][0].item()),
-                'predicted_size': float(global_output[0][1].item()),
-                'predicted_height': float(global_output[0][2].item()),
-                'risk_level': float(global_output[0][3].item()),
-                'growth_rate': float(global_output[0][4].item()),
-                'confidence': 70,
-                'is_personalized': False,
-                'training_samples': self.training_data_count,
-                'message': f'개인화를 위해 {10 - self.training_data_count}개 더 필요',
-                'weight': 0.7
-            }
+            # 최종 결합 예측
+            results.append(self._combine_predictions(predictions))
         
-        # 최종 결합 예측
-        final_prediction = self._combine_predictions(predictions)
+        return results
+    
+    def prediction_cluster(self, input_data: Dict) -> Optional[str]:
+        """예측에 사용할 클러스터 - 요청에 지정된 클러스터(input_data['cluster_type'])가 우선
+        
+        지정되지 않으면 농가에 저장된 클러스터(마지막 classify_farm 결과, farm_metadata에서 로드)를 사용
+        """
+        return input_data.get('cluster_type') or self.farm_cluster
+    
+    def _get_ensemble(self, models: SharedModelSet, personalized: bool, cluster: Optional[str]):
+        """결합 모듈과 신뢰도 반환 (개인화 모듈은 농가/클러스터별로 처음 사용할 때 변환해 캐시)"""
+        if not personalized:
+            # 데이터 부족시 글로벌 모델만 사용 (모든 농가가 공유하는 모듈)
+            return self.shared_models.global_ensemble(models), 70
+        
+        cluster = cluster if cluster in models.cluster_models else None
+        key = (models.version, cluster)
+        cached = self._ensembles.get(key)
+        if cached is not None:
+            return cached
+        
+        if cluster is not None:
+            # 3단계 앙상블: 글로벌 40%, 개인화 40%, 클러스터 20%
+            heads, weights, confidence = [self.personal_layer, models.cluster_models[cluster]], [0.4, 0.4, 0.2], 90
+        else:
+            # 2단계 앙상블: 글로벌 60%, 개인화 40%
+            heads, weights, confidence = [self.personal_layer], [0.6, 0.4], 85
+        
+        ensemble = compile_ensemble(HybridEnsemble(models.global_model, heads, weights),
+                                    Config.FEDERATED_ENSEMBLE_BACKEND)
+        # 이전 글로벌 모델 버전으로 만든 모듈은 버림
+        self._ensembles = {k: v for k, v in self._ensembles.items() if k[0] == models.version}
+        self._ensembles[key] = (ensemble, confidence)
+        return ensemble, confidence
+    
+    @staticmethod
+    def _simulate_existing_ai() -> Dict[str, Any]:
+        """기존 AI 결과 시뮬레이션"""
+        existing_result = {
+            'overallScore': 75 + np.random.randint(-10, 15),
+            'confidence': 80 + np.random.randint(-5, 15),
+            'recommendations': [
+                "물 공급량을 10% 증가시키세요.",
+                "햇빛 노출을 늘려주세요.",
+                "온도를 2도 낮춰주세요."
+            ]
+        }
         
-        return final_prediction
+        return {
+            'health_score': existing_result.get('overallScore', 75),
+            'confidence': existing_result.get('confidence', 80),
+            'recommendations': existing_result.get('recommendations', []),
+            'weight': 0.3  # 기존 AI 가중치 30%
+        }
+    
+    @staticmethod
+    def _federated_prediction(output: List[float]) -> Dict[str, float]:
+        """모델 출력 5개 값 → 예측 항목"""
+        return {
+            'health_score': output[0],
+            'predicted_size': output[1],
+            'predicted_height': output[2],
+            'risk_level': output[3],
+            'growth_rate': output[4]
+        }
     
     def _combine_predictions(self, predictions: Dict) -> Dict[str, Any]:
         """기존 AI와 연합학습 AI 예측 결합"""
@@ -425,6 +640,8 @@ class FederatedFarmAI:
         # 자동 재훈련 조건 확인
         if self.training_data_count % 20 == 0:  # 20개마다
             self._retrain_personal_model()
+        
+        self._mark_files_current()
     
     def _preprocess_input(self, input_data: Dict) -> List[float]:
         """입력 데이터 전처리"""
@@ -554,7 +771,8 @@ class FederatedFarmAI:
         with torch.no_grad():
             global_features, _ = self.global_model(X)
         
-        # 개인화 레이어 훈련
+        # 개인화 레이어 훈련 (끝나면 예측용 eval 모드로 복귀)
+        self.personal_layer.train()
         for epoch in range(50):
             optimizer.zero_grad()
             personal_output = self.personal_layer(global_features)
@@ -564,17 +782,11 @@ class FederatedFarmAI:
             
             if epoch % 10 == 0:
                 print(f"Epoch {epoch}, Loss: {loss.item():.4f}")
+        self.personal_layer.eval()
+        self._ensembles.clear()
     
     def _load_models(self):
         """저장된 모델들 로드"""
-        # 글로벌 모델 로드
-        if os.path.exists(self.global_model_path):
-            try:
-                self.global_model.load_state_dict(torch.load(self.global_model_path))
-                print("✅ 글로벌 모델 로드 완료")
-            except:
-                print("⚠️ 글로벌 모델 로드 실패, 기본 모델 사용")
-        
         # 개인화 모델 로드
         if os.path.exists(self.farm_model_path):
             try:
@@ -590,6 +802,11 @@ class FederatedFarmAI:
                 cursor = conn.cursor()
                 cursor.execute('SELECT COUNT(*) FROM training_data')
                 self.training_data_count = cursor.fetchone()[0]
+                # 저장된 클러스터 (인스턴스를 다시 로드해도 분류 결과 유지)
+                cursor.execute('SELECT cluster_type FROM farm_metadata WHERE farm_id = ?', (self.farm_id,))
+                row = cursor.fetchone()
+                if row:
+                    self.farm_cluster = row[0]
                 conn.close()
             except:
                 self.training_data_count = 0
@@ -598,6 +815,7 @@ class FederatedFarmAI:
         """모델들 저장"""
         # 개인화 모델 저장
         torch.save(self.personal_layer.state_dict(), self.farm_model_path)
+        self._mark_files_current()
         print(f"💾 농가 {self.farm_hash} 개인화 모델 저장 완료")
     
     def get_farm_analytics(self) -> Dict[str, Any]:
@@ -679,8 +897,10 @@ class FederationCoordinator:
             # 글로벌 모델 업데이트
             self.global_model.load_state_dict(aggregated_params)
             
-            # 모델 저장
-            torch.save(self.global_model.state_dict(), self.global_model_path)
+            # 모델 저장 (임시 파일에 쓴 뒤 교체 - 다른 워커가 쓰는 중인 파일을 읽지 않도록)
+            temp_path = f"{self.global_model_path}.{os.getpid()}.tmp"
+            torch.save(self.global_model.state_dict(), temp_path)
+            os.replace(temp_path, self.global_model_path)
             
             print("✅ 글로벌 모델 업데이트 완료")
             return True
@@ -714,4 +934,89 @@ class FederationCoordinator:
             'global_accuracy': latest_version[4] if latest_version else 0.0,
             'active_clusters': len(clusters),
             'federation_status': "active" if latest_version else "initializing"
-        } 
\ No newline at end of file
+        } 
+
+
+class FarmAIRegistry:
+    """농가별 FederatedFarmAI 인스턴스 LRU 캐시 (워커 프로세스 공용)
+    
+    - 요청마다 키 파일/DB 스키마/체크포인트를 다시 읽지 않도록 로드한 농가 인스턴스를 재사용
+    - max_size를 넘으면 가장 오래 사용하지 않은 농가부터 제거하고, idle_seconds 동안 사용하지 않은 농가도 제거
+    - 다른 워커가 농가의 모델/키/DB 파일이나 글로벌 모델을 바꾸면 다음 조회에서 다시 로드
+    반환된 인스턴스는 instance.lock을 잡은 상태로 사용해야 한다 (같은 농가 요청 직렬화).
+    """
+    
+    def __init__(self, max_size: int = 256, idle_seconds: float = 1800):
+        self.max_size = max(1, max_size)
+        self.idle_seconds = idle_seconds
+        self._entries = OrderedDict()  # farm_id -> (인스턴스, 마지막 사용 시각)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'reloads': 0, 'evictions': 0}
+    
+    def get(self, farm_id: str) -> FederatedFarmAI:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(farm_id)
+        
+        cached = entry[0] if entry is not None else None
+        if cached is not None:
+            with cached.lock:
+                fresh = cached.loaded_signature == cached.file_signature()
+            if fresh:
+                with self._lock:
+                    self._stats['hits'] += 1
+                    if self._entries.get(farm_id, (None,))[0] is cached:
+                        self._entries[farm_id] = (cached, now)
+                        self._entries.move_to_end(farm_id)
+                return cached
+        
+        # 새로 로드 (느린 작업이라 잠금 밖에서 수행)
+        instance = FederatedFarmAI(farm_id)
+        with self._lock:
+            current = self._entries.get(farm_id)
+            if current is not None and current[0] is not cached:
+                # 다른 스레드가 먼저 로드한 인스턴스 사용
+                instance = current[0]
+            else:
+                self._stats['reloads' if cached is not None else 'misses'] += 1
+            self._entries[farm_id] = (instance, now)
+            self._entries.move_to_end(farm_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return instance
+    
+    def _evict_idle(self, now: float):
+        """오래 사용하지 않은 농가 제거 (사용 순서대로 정렬되어 있어 앞에서부터 확인)"""
+        while self._entries:
+            farm_id, (_, last_used) = next(iter(self._entries.items()))
+            if now - last_used < self.idle_seconds:
+                break
+            del self._entries[farm_id]
+            self._stats['evictions'] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, 'size': len(self._entries), 'max_size': self.max_size}
+
+
+_farm_registry = None
+_farm_registry_lock = threading.Lock()
+
+
+def get_farm_registry() -> FarmAIRegistry:
+    """프로세스 공용 농가 AI 인스턴스 캐시 반환"""
+    global _farm_registry
+    with _farm_registry_lock:
+        if _farm_registry is None:
+            _farm_registry = FarmAIRegistry(
+                max_size=Config.FEDERATED_FARM_CACHE_SIZE,
+                idle_seconds=Config.FEDERATED_FARM_IDLE_SECONDS
+            )
+        return _farm_registry
+
+
+def get_farm_ai(farm_id: str) -> FederatedFarmAI:
+    """캐시된 농가 AI 인스턴스 반환 (없거나 파일이 바뀌었으면 새로 로드)"""
+    return get_farm_registry().get(farm_id)
@@ -0,0 +1,313 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from functools import wraps
+from typing import Dict, Any, Callable, Tuple
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+# 요청 헤더
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+# 키 상태
+KEY_PENDING = 'pending'
+KEY_DONE = 'done'
+
+# 재전송 시 함께 돌려줄 응답 헤더
+STORED_HEADERS = ('Location',)
+
+
+class IdempotencyConflict(Exception):
+    """같은 멱등 키로 다른 내용의 요청이 들어온 경우"""
+
+
+class IdempotencyTimeout(Exception):
+    """같은 키의 선행 요청이 대기 시간 안에 끝나지 않은 경우"""
+
+
+class IdempotencyStore:
+    """멱등 키 응답 저장소 + 진행 중 요청 합치기(single-flight)
+
+    - 프로세스 안: 같은 키의 동시 요청은 첫 요청(리더)만 계산하고 나머지 스레드는 Event로 대기
+    - 프로세스 간: 모든 gunicorn 워커가 공유하는 SQLite 테이블에 키를 점유(pending)하고,
+      다른 워커의 같은 키 요청은 완료될 때까지 폴링. 점유 기한이 지나면(워커 비정상 종료) 이어받음
+    - 완료된 응답(5xx 제외)은 보관 기간 동안 저장되어 재시도 요청에 그대로 재전송
+    - 같은 키라도 요청 내용(지문)이 다르면 IdempotencyConflict
+    """
+
+    def __init__(self, db_path: str, ttl_hours: float = 24, lock_seconds: float = 300,
+                 poll_interval: float = 0.2):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_hours * 3600
+        self.lock_seconds = lock_seconds
+        self.poll_interval = poll_interval
+
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+        self._stats = {'computed': 0, 'replayed': 0, 'coalesced': 0, 'conflicts': 0}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+
+    # DB
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status TEXT NOT NULL,
+                owner TEXT,
+                response TEXT,
+                locked_until REAL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_idempotency_created ON idempotency_keys (created_at)')
+        conn.close()
+
+    # 실행
+    def execute(self, key: str, fingerprint: str,
+                compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """키의 저장된 응답을 반환하거나, 없으면 한 번만 계산해 저장 후 반환 (응답, 재전송 여부)
+
+        compute는 JSON으로 직렬화 가능한 응답 dict(status, body, mimetype, headers)를 반환해야 한다.
+        """
+        deadline = time.monotonic() + self.lock_seconds
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = threading.Event()
+
+            if not leader:
+                # 같은 프로세스의 선행 요청이 끝나면 저장된 응답을 확인 (실패했으면 다시 리더 경쟁)
+                with self._lock:
+                    self._stats['coalesced'] += 1
+                if not flight.wait(max(0.0, deadline - time.monotonic())):
+                    raise IdempotencyTimeout()
+                continue
+
+            try:
+                return self._lead(key, fingerprint, compute, deadline)
+            finally:
+                with self._lock:
+                    self._flights.pop(key, None)
+                flight.set()
+
+    def _lead(self, key: str, fingerprint: str, compute: Callable[[], Dict[str, Any]],
+              deadline: float) -> Tuple[Dict[str, Any], bool]:
+        """프로세스 간 점유 후 계산 (다른 워커가 점유 중이면 완료될 때까지 폴링)"""
+        owner = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        while True:
+            stored = self._claim(key, fingerprint, owner)
+            if stored is None:
+                break
+            if stored is not KEY_PENDING:
+                with self._lock:
+                    self._stats['replayed'] += 1
+                return stored, True
+            if time.monotonic() > deadline:
+                raise IdempotencyTimeout()
+            time.sleep(self.poll_interval)
+
+        try:
+            response = compute()
+        except BaseException:
+            self._release(key, owner)
+            raise
+
+        # 서버 오류는 저장하지 않음 (재시도 시 다시 계산)
+        if response['status'] >= 500:
+            self._release(key, owner)
+        else:
+            self._complete(key, owner, response)
+        with self._lock:
+            self._stats['computed'] += 1
+        return response, False
+
+    def _claim(self, key: str, fingerprint: str, owner: str):
+        """키 점유 시도 - 점유하면 None, 완료된 응답이 있으면 응답, 다른 요청이 진행 중이면 KEY_PENDING"""
+        self._cleanup()
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT * FROM idempotency_keys WHERE key = ?', (key,)).fetchone()
+            if row is not None and row['created_at'] < now - self.ttl_seconds:
+                row = None
+
+            if row is not None and row['fingerprint'] != fingerprint:
+                conn.execute('ROLLBACK')
+                with self._lock:
+                    self._stats['conflicts'] += 1
+                raise IdempotencyConflict()
+            if row is not None and row['status'] == KEY_DONE:
+                conn.execute('ROLLBACK')
+                return json.loads(row['response'])
+            if row is not None and row['locked_until'] > now:
+                conn.execute('ROLLBACK')
+                return KEY_PENDING
+
+            if row is not None:
+                logger.warning(f"⚠️ 점유 기한이 지난 멱등 키 이어받음 (이전 점유: {row['owner']})")
+            conn.execute(
+                'INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, status, owner, locked_until, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, fingerprint, KEY_PENDING, owner, now + self.lock_seconds, now)
+            )
+            conn.execute('COMMIT')
+            return None
+        except sqlite3.Error:
+            # BEGIN IMMEDIATE 자체가 실패(database is locked)하면 열린 트랜잭션이 없음
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _complete(self, key: str, owner: str, response: Dict[str, Any]):
+        conn = self._connect()
+        try:
+            conn.execute(
+                'UPDATE idempotency_keys SET status = ?, response = ?, locked_until = NULL '
+                'WHERE key = ? AND owner = ?',
+                (KEY_DONE, json.dumps(response, ensure_ascii=False), key, owner)
+            )
+        finally:
+            conn.close()
+
+    def _release(self, key: str, owner: str):
+        """계산 실패 시 점유 해제 (대기 중인 요청이 다시 계산)"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM idempotency_keys WHERE key = ? AND owner = ? AND status = ?',
+                         (key, owner, KEY_PENDING))
+        finally:
+            conn.close()
+
+    def _cleanup(self):
+        """보관 기간이 지난 키 삭제 (최대 10분에 한 번)"""
+        now = time.time()
+        if now - self._last_cleanup < 600:
+            return
+        self._last_cleanup = now
+
+        conn = self._connect()
+        try:
+            deleted = conn.execute('DELETE FROM idempotency_keys WHERE created_at < ?',
+                                   (now - self.ttl_seconds,)).rowcount
+        finally:
+            conn.close()
+        if deleted:
+            logger.info(f"🧹 만료된 멱등 키 {deleted}개 삭제")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._flights)
+        return stats
+
+
+def request_fingerprint(request) -> str:
+    """요청 내용 지문 (경로, 폼 필드, 업로드 파일 내용) - 같은 키의 다른 요청 구분용"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(request.path.encode())
+    for name, value in sorted(request.form.items(multi=True)):
+        digest.update(f"\0{name}={value}".encode())
+    for name, file in sorted(request.files.items(multi=True), key=lambda item: (item[0], item[1].filename or '')):
+        digest.update(f"\0{name}:{file.filename}".encode())
+        stream = file.stream
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+            digest.update(chunk)
+        stream.seek(0)
+    return digest.hexdigest()
+
+
+def idempotent_endpoint(view):
+    """Idempotency-Key 헤더가 있는 요청의 응답을 저장하고 재시도/동시 요청에 같은 응답 반환
+
+    헤더가 없으면 그대로 실행한다. 재전송된 응답에는 Idempotent-Replayed: true 헤더가 붙는다.
+    """
+    from flask import request, jsonify, make_response, current_app
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({
+                "status": "error",
+                "message": "Idempotency-Key는 255자 이하여야 합니다."
+            }), 400
+
+        def compute():
+            response = make_response(view(*args, **kwargs))
+            return {
+                'status': response.status_code,
+                'body': response.get_data(as_text=True),
+                'mimetype': response.mimetype,
+                'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+            }
+
+        try:
+            stored, replayed = get_idempotency_store().execute(
+                f"{request.path}:{key}", request_fingerprint(request), compute
+            )
+        except IdempotencyConflict:
+            return jsonify({
+                "status": "error",
+                "message": "같은 Idempotency-Key로 다른 요청이 이미 처리되었습니다."
+            }), 422
+        except IdempotencyTimeout:
+            return jsonify({
+                "status": "error",
+                "message": "같은 Idempotency-Key의 요청이 아직 처리 중입니다. 잠시 후 다시 시도하세요."
+            }), 409
+
+        response = current_app.response_class(stored['body'], status=stored['status'],
+                                              mimetype=stored['mimetype'], headers=stored['headers'])
+        if replayed:
+            response.headers[REPLAYED_HEADER] = 'true'
+        return response
+
+    return wrapper
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """프로세스 공용 멱등 키 저장소 반환 (DB는 모든 워커가 공유)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = IdempotencyStore(
+                db_path=Config.ANALYSIS_IDEMPOTENCY_DB,
+                ttl_hours=Config.ANALYSIS_IDEMPOTENCY_TTL_HOURS,
+                lock_seconds=Config.ANALYSIS_IDEMPOTENCY_LOCK_SECONDS,
+                poll_interval=Config.ANALYSIS_IDEMPOTENCY_POLL_INTERVAL
+            )
+        return _store
@@ -0,0 +1,161 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Any, List
+
+from ..config import Config
+from ..utils.timing import StageHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingPrediction:
+    """큐에서 배치 처리를 기다리는 예측 요청"""
+    __slots__ = ('farm_ai', 'input_data', 'use_existing_ai', 'enqueued', 'done', 'result', 'error')
+
+    def __init__(self, farm_ai, input_data: Dict, use_existing_ai: bool):
+        self.farm_ai = farm_ai
+        self.input_data = input_data
+        self.use_existing_ai = use_existing_ai
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FederatedInferenceBatcher:
+    """연합학습 예측 마이크로 배칭 서비스 (워커 프로세스 내 백그라운드 스레드)
+
+    동시에 들어온 예측 요청을 첫 요청 기준 window_ms 동안 또는 max_batch_size개가 찰 때까지 모은 뒤
+    (농가 인스턴스, 클러스터, 기존 AI 사용 여부)별로 묶어 hybrid_predict_batch 한 번으로 처리하고
+    각 호출자에게 결과를 돌려준다. 한 워커가 요청을 동시에 처리하는 스레드형 워커(gthread)에서 효과가 있다.
+    """
+
+    def __init__(self, window_ms: float = 2.0, max_batch_size: int = 32):
+        self.window = max(0.0, window_ms) / 1000
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+        self._stats_lock = threading.Lock()
+        self._queue_wait = StageHistogram()
+        self._batch_sizes = Counter()
+
+    def predict(self, farm_ai, input_data: Dict, use_existing_ai: bool = True) -> Dict[str, Any]:
+        """예측 요청을 큐에 넣고 배치 처리 결과를 기다림 (farm_ai.lock을 잡은 채 호출하면 안 됨)"""
+        pending = _PendingPrediction(farm_ai, input_data, use_existing_ai)
+        with self._cond:
+            self._ensure_worker()
+            self._pending.append(pending)
+            self._cond.notify()
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_worker(self):
+        """배치 스레드 시작 (fork된 워커 프로세스에서는 새로 시작)"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='federated-batcher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+
+                # 첫 요청 기준 대기 시간이 지나거나 최대 배치 크기가 찰 때까지 모음
+                deadline = self._pending[0].enqueued + self.window
+                while len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch_size))]
+
+            try:
+                self._process(batch)
+            except BaseException as e:
+                # 예상하지 못한 오류도 대기 중인 호출자에게 전달 (스레드는 계속 동작)
+                logger.exception("⚠️ 연합학습 배치 예측 처리 실패")
+                for pending in batch:
+                    if not pending.done.is_set():
+                        pending.error = e
+                        pending.done.set()
+
+    def _process(self, batch: List[_PendingPrediction]):
+        started = time.perf_counter()
+        groups = {}
+        for pending in batch:
+            key = (id(pending.farm_ai), pending.use_existing_ai)
+            groups.setdefault(key, []).append(pending)
+
+        with self._stats_lock:
+            for pending in batch:
+                self._queue_wait.observe((started - pending.enqueued) * 1000)
+            for group in groups.values():
+                self._batch_sizes[len(group)] += 1
+
+        for group in groups.values():
+            farm_ai = group[0].farm_ai
+            try:
+                with farm_ai.lock:
+                    results = farm_ai.hybrid_predict_batch([pending.input_data for pending in group],
+                                                           group[0].use_existing_ai)
+            except Exception as e:
+                for pending in group:
+                    pending.error = e
+                    pending.done.set()
+                continue
+
+            for pending, result in zip(group, results):
+                pending.result = result
+                pending.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            predictions = sum(size * count for size, count in self._batch_sizes.items())
+            return {
+                'window_ms': self.window * 1000,
+                'max_batch_size': self.max_batch_size,
+                'pending': len(self._pending),
+                'batches': batches,
+                'predictions': predictions,
+                'mean_batch_size': round(predictions / batches, 3) if batches else None,
+                'batch_size': {str(size): count for size, count in sorted(self._batch_sizes.items())},
+                'queue_wait': self._queue_wait.to_dict()
+            }
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_inference_batcher() -> FederatedInferenceBatcher:
+    """프로세스 공용 연합학습 예측 배칭 서비스 반환"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = FederatedInferenceBatcher(
+                window_ms=Config.FEDERATED_BATCH_WINDOW_MS,
+                max_batch_size=Config.FEDERATED_BATCH_MAX_SIZE
+            )
+        return _batcher
+
+
+def hybrid_predict(farm_ai, input_data: Dict, use_existing_ai: bool = True) -> Dict[str, Any]:
+    """하이브리드 예측 (FEDERATED_BATCHING이 켜져 있으면 배칭 서비스 경유)"""
+    if Config.FEDERATED_BATCHING:
+        return get_inference_batcher().predict(farm_ai, input_data, use_existing_ai)
+    with farm_ai.lock:
+        return farm_ai.hybrid_predict(input_data, use_existing_ai)
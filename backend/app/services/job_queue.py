@@ -0,0 +1,391 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Any, Optional, Tuple
+
+from ..config import Config
+from .analysis_engine import get_analysis_engine
+
+logger = logging.getLogger(__name__)
+
+# 작업 상태
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+# 이미지 상태
+IMAGE_PENDING = 'pending'
+IMAGE_DONE = 'done'
+IMAGE_ERROR = 'error'
+
+
+class AnalysisJobQueue:
+    """SQLite 기반 비동기 분석 작업 큐
+
+    요청은 이미지와 함께 큐에 저장되고 바로 작업 ID가 반환된다. 각 gunicorn 워커의
+    백그라운드 스레드가 대기 중인 작업을 가져가 분석 엔진으로 처리하며,
+    이미지별 결과는 완료되는 대로 저장되어 작업이 끝나기 전에도 조회할 수 있다.
+    - 모든 워커 프로세스가 같은 DB를 공유하고, 작업 점유는 BEGIN IMMEDIATE로 직렬화
+    - 하트비트가 끊긴 작업(워커 비정상 종료)은 다시 대기 상태로 돌려 남은 이미지만 이어서 처리
+    - 분석이 끝난 이미지 원본은 즉시 삭제, 완료된 작업은 보관 기간 후 삭제
+    """
+
+    def __init__(self, db_path: str, worker_threads: int = 1, poll_interval: float = 1.0,
+                 stale_seconds: float = 300, retention_hours: float = 24):
+        self.db_path = db_path
+        self.worker_threads = worker_threads
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+        self.retention_seconds = retention_hours * 3600
+
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._last_cleanup = 0.0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_db()
+
+    # DB
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                error TEXT,
+                worker TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                heartbeat_at REAL,
+                finished_at REAL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_job_images (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                image BLOB,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                finished_at REAL,
+                PRIMARY KEY (job_id, idx)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON analysis_jobs (status, created_at)')
+        conn.close()
+
+    # 요청 측 API
+    def enqueue(self, images: List[Tuple[str, Any]], environment_data: Dict, model_id: str,
+                analysis_items: List[str], plant_type: str = 'unknown',
+                options: Optional[Dict[str, Any]] = None) -> str:
+        """이미지 (파일명, 바이트) 목록을 작업으로 저장하고 작업 ID 반환
+        
+        options: 분석 모드 (sequence_id - 타임랩스, tray_mode/tray_rows/tray_cols - 육묘 트레이)
+        """
+        job_id = uuid.uuid4().hex
+        params = json.dumps({
+            'environment_data': environment_data,
+            'model_id': model_id,
+            'analysis_items': analysis_items,
+            'plant_type': plant_type,
+            **(options or {})
+        }, ensure_ascii=False)
+
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN')
+            conn.execute(
+                'INSERT INTO analysis_jobs (id, status, params, total, created_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, JOB_QUEUED, params, len(images), time.time())
+            )
+            conn.executemany(
+                'INSERT INTO analysis_job_images (job_id, idx, filename, file_size, image, status) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(job_id, index, filename, len(data), data, IMAGE_PENDING)
+                 for index, (filename, data) in enumerate(images)]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        # 이 프로세스의 작업 스레드를 깨움 (다른 워커는 폴링으로 발견)
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태와 진행률 조회"""
+        conn = self._connect()
+        try:
+            job = conn.execute('SELECT * FROM analysis_jobs WHERE id = ?', (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(conn.execute(
+                'SELECT status, COUNT(*) FROM analysis_job_images WHERE job_id = ? GROUP BY status',
+                (job_id,)
+            ).fetchall())
+        finally:
+            conn.close()
+
+        completed = counts.get(IMAGE_DONE, 0)
+        failed = counts.get(IMAGE_ERROR, 0)
+        return {
+            'job_id': job['id'],
+            'status': job['status'],
+            'total': job['total'],
+            'completed': completed,
+            'failed': failed,
+            'pending': job['total'] - completed - failed,
+            'error': job['error'],
+            'params': json.loads(job['params']),
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at']
+        }
+
+    def get_results(self, job_id: str, since: int = 0) -> List[Dict[str, Any]]:
+        """완료된 이미지별 결과 조회 (since 이후 인덱스만, 입력 순서)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT idx, filename, file_size, status, result, error FROM analysis_job_images '
+                'WHERE job_id = ? AND idx >= ? AND status != ? ORDER BY idx',
+                (job_id, since, IMAGE_PENDING)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        return [{
+            'index': row['idx'],
+            'filename': row['filename'],
+            'file_size': row['file_size'],
+            'status': row['status'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error']
+        } for row in rows]
+
+    # 백그라운드 작업 스레드
+    def start(self):
+        """작업 스레드 시작 (프로세스당 한 번, 포크된 워커에서는 새로 시작)"""
+        with self._lock:
+            if self._pid == os.getpid() and any(thread.is_alive() for thread in self._threads):
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._worker_loop, name=f"analysis-job-{index}", daemon=True)
+                for index in range(self.worker_threads)
+            ]
+            for thread in self._threads:
+                thread.start()
+        logger.info(f"✅ 분석 작업 큐 시작 (스레드 {self.worker_threads}개)")
+
+    def shutdown(self, timeout: float = 5.0):
+        """작업 스레드 종료 (처리 중인 작업은 하트비트 만료 후 다른 워커가 이어서 처리)"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _worker_loop(self):
+        worker_name = f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+        while not self._stop.is_set():
+            try:
+                job_id = self._claim_job(worker_name)
+                if job_id:
+                    self._run_job(job_id)
+                    continue
+                self._cleanup()
+            except Exception as e:
+                logger.error(f"❌ 분석 작업 처리 오류: {e}")
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _claim_job(self, worker_name: str) -> Optional[str]:
+        """대기 중인 가장 오래된 작업 점유 (하트비트가 끊긴 작업은 먼저 대기 상태로 복구)"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            recovered = conn.execute(
+                'UPDATE analysis_jobs SET status = ? WHERE status = ? AND heartbeat_at < ?',
+                (JOB_QUEUED, JOB_RUNNING, now - self.stale_seconds)
+            ).rowcount
+            row = conn.execute(
+                'SELECT id FROM analysis_jobs WHERE status = ? ORDER BY created_at LIMIT 1',
+                (JOB_QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE analysis_jobs SET status = ?, worker = ?, heartbeat_at = ?, '
+                    'started_at = COALESCE(started_at, ?) WHERE id = ?',
+                    (JOB_RUNNING, worker_name, now, now, row['id'])
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        if recovered:
+            logger.warning(f"⚠️ 중단된 분석 작업 {recovered}개를 다시 대기열에 추가")
+        return row['id'] if row is not None else None
+
+    def _run_job(self, job_id: str):
+        """작업의 남은 이미지를 분석 엔진 풀 크기 단위로 처리하고 결과를 바로 저장"""
+        engine = get_analysis_engine()
+        chunk_size = max(1, engine.max_workers)
+        conn = self._connect()
+        try:
+            params = json.loads(conn.execute(
+                'SELECT params FROM analysis_jobs WHERE id = ?', (job_id,)
+            ).fetchone()['params'])
+            analyze = self._batch_analyzer(engine, params)
+
+            while not self._stop.is_set():
+                rows = conn.execute(
+                    'SELECT idx, image FROM analysis_job_images WHERE job_id = ? AND status = ? '
+                    'ORDER BY idx LIMIT ?',
+                    (job_id, IMAGE_PENDING, chunk_size)
+                ).fetchall()
+                if not rows:
+                    break
+
+                results = analyze([row['image'] for row in rows])
+
+                now = time.time()
+                conn.execute('BEGIN')
+                for row, result in zip(rows, results):
+                    # 실패 결과도 결과 코드(품질 게이트 거부 등)를 보존하도록 함께 저장
+                    conn.execute(
+                        'UPDATE analysis_job_images SET status = ?, result = ?, error = ?, image = NULL, '
+                        'finished_at = ? WHERE job_id = ? AND idx = ?',
+                        (IMAGE_ERROR if 'error' in result else IMAGE_DONE,
+                         json.dumps(result, ensure_ascii=False, default=str), result.get('error'),
+                         now, job_id, row['idx'])
+                    )
+                conn.execute('UPDATE analysis_jobs SET heartbeat_at = ? WHERE id = ?', (now, job_id))
+                conn.execute('COMMIT')
+
+            if self._stop.is_set():
+                return
+
+            # 모든 이미지가 실패한 경우만 작업 실패
+            done = conn.execute(
+                'SELECT COUNT(*) FROM analysis_job_images WHERE job_id = ? AND status = ?',
+                (job_id, IMAGE_DONE)
+            ).fetchone()[0]
+            status = JOB_COMPLETED if done else JOB_FAILED
+            conn.execute(
+                'UPDATE analysis_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, None if done else "모든 이미지 분석에 실패했습니다", time.time(), job_id)
+            )
+            logger.info(f"✅ 분석 작업 {job_id} 종료 ({status})")
+
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            conn.execute(
+                'UPDATE analysis_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                (JOB_FAILED, str(e), time.time(), job_id)
+            )
+            logger.error(f"❌ 분석 작업 {job_id} 실패: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _batch_analyzer(engine, params: Dict[str, Any]):
+        """작업 매개변수에 맞는 이미지 묶음 분석 함수
+        
+        타임랩스/트레이 모드는 동기 요청과 같은 프로세스 공용 분석기로 순서대로 분석
+        (타임랩스 키프레임 상태를 동기 요청과 공유), 나머지는 분석 엔진 풀에서 병렬 처리
+        """
+        args = (params['environment_data'], params['model_id'], params['analysis_items'])
+        sequence_id = params.get('sequence_id')
+        tray_mode = params.get('tray_mode')
+        if not sequence_id and not tray_mode:
+            return lambda images: engine.analyze_batch(images, *args)
+
+        ai = engine.get_local_ai()
+
+        def analyze_one(image):
+            try:
+                if sequence_id:
+                    return ai.analyze_plant_sequence(sequence_id, image, *args)
+                return ai.analyze_plant_tray(image, *args, params.get('tray_rows'), params.get('tray_cols'))
+            except Exception as e:
+                return {'error': str(e)}
+
+        return lambda images: [analyze_one(image) for image in images]
+
+    def _cleanup(self):
+        """보관 기간이 지난 완료/실패 작업 삭제 (최대 10분에 한 번)"""
+        now = time.time()
+        if now - self._last_cleanup < 600:
+            return
+        self._last_cleanup = now
+
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN')
+            expired = [row['id'] for row in conn.execute(
+                'SELECT id FROM analysis_jobs WHERE status IN (?, ?) AND finished_at < ?',
+                (JOB_COMPLETED, JOB_FAILED, now - self.retention_seconds)
+            ).fetchall()]
+            conn.executemany('DELETE FROM analysis_job_images WHERE job_id = ?', [(job_id,) for job_id in expired])
+            conn.executemany('DELETE FROM analysis_jobs WHERE id = ?', [(job_id,) for job_id in expired])
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        if expired:
+            logger.info(f"🧹 만료된 분석 작업 {len(expired)}개 삭제")
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> AnalysisJobQueue:
+    """프로세스 공용 분석 작업 큐 반환 (DB는 모든 워커가 공유)"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = AnalysisJobQueue(
+                db_path=Config.ANALYSIS_JOB_DB,
+                worker_threads=Config.ANALYSIS_JOB_THREADS,
+                poll_interval=Config.ANALYSIS_JOB_POLL_INTERVAL,
+                stale_seconds=Config.ANALYSIS_JOB_STALE_SECONDS,
+                retention_hours=Config.ANALYSIS_JOB_RETENTION_HOURS
+            )
+        return _queue
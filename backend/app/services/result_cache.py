@@ -0,0 +1,266 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """분석 결과 캐시 (콘텐츠 해시 기반)
+
+    1단계: 프로세스 내 LRU (직렬화된 JSON 크기 기준 제거)
+    2단계: 선택적 SQLite 디스크 캐시 (모든 gunicorn 워커가 공유, 오래 안 쓴 항목부터 제거)
+    값은 JSON 문자열로 보관하므로 조회할 때마다 새 dict가 반환된다.
+    """
+
+    def __init__(self, memory_max_bytes: int, disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = 0):
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_path = os.path.join(disk_dir, 'analysis_cache.db') if disk_dir else None
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0,
+            'errors': 0
+        }
+
+        if self.disk_path:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._init_disk()
+
+    # 키 생성
+    @staticmethod
+    def digest(image_bytes) -> str:
+        """이미지 바이트 해시 (버퍼 복사 없음)"""
+        return hashlib.blake2b(image_bytes, digest_size=20).hexdigest()
+
+    @staticmethod
+    def make_key(namespace: str, *parts: Any) -> str:
+        """네임스페이스와 구성 요소로 캐시 키 생성 (dict는 키 정렬 후 직렬화)"""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return f"{namespace}:{hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()}"
+
+    # 조회/저장
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return json.loads(value)
+
+        value = self._disk_get(key)
+        if value is not None:
+            self._memory_set(key, value)
+            with self._lock:
+                self._stats['disk_hits'] += 1
+            return json.loads(value)
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        try:
+            serialized = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            with self._lock:
+                self._stats['errors'] += 1
+            return
+
+        self._memory_set(key, serialized)
+        self._disk_set(key, serialized)
+        with self._lock:
+            self._stats['sets'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.disk_path:
+            self._disk_execute('DELETE FROM cache_entries')
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'memory_max_bytes': self.memory_max_bytes,
+                'disk_enabled': bool(self.disk_path)
+            })
+
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+
+        if self.disk_path:
+            row = self._disk_execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries', fetch=True)
+            if row:
+                stats['disk_entries'], stats['disk_bytes'] = row[0]
+            stats['disk_max_bytes'] = self.disk_max_bytes
+        return stats
+
+    # 메모리 계층
+    def _memory_set(self, key: str, serialized: str):
+        size = len(serialized)
+        if size > self.memory_max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = serialized
+            self._memory_bytes += size
+
+            while self._memory_bytes > self.memory_max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self._stats['memory_evictions'] += 1
+
+    # 디스크 계층
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.disk_path, timeout=5)
+
+    def _init_disk(self):
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)')
+        
+        # 전체 크기 누계 (트리거로 삽입/삭제/갱신 시 유지, 저장할 때마다 SUM 전체 스캔을 하지 않음)
+        cursor.execute('CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)')
+        cursor.execute('INSERT OR IGNORE INTO cache_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM cache_entries')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache_entries
+            BEGIN UPDATE cache_size SET total = total + NEW.size WHERE id = 0; END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache_entries
+            BEGIN UPDATE cache_size SET total = total - OLD.size WHERE id = 0; END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS cache_size_update AFTER UPDATE OF size ON cache_entries
+            BEGIN UPDATE cache_size SET total = total + NEW.size - OLD.size WHERE id = 0; END
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _disk_execute(self, sql: str, params: tuple = (), fetch: bool = False) -> Optional[List[tuple]]:
+        """디스크 캐시 쿼리 실행 - 캐시 오류가 분석을 막지 않도록 예외는 기록만 함"""
+        try:
+            conn = self._connect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql, params)
+                rows = cursor.fetchall() if fetch else None
+                conn.commit()
+                return rows
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 분석 캐시 디스크 오류: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+            return None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if not self.disk_path:
+            return None
+        rows = self._disk_execute('SELECT value FROM cache_entries WHERE key = ?', (key,), fetch=True)
+        if not rows:
+            return None
+        self._disk_execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        return rows[0][0]
+
+    def _disk_set(self, key: str, serialized: str):
+        if not self.disk_path:
+            return
+        # INSERT OR REPLACE는 삭제 트리거를 실행하지 않으므로 UPSERT로 크기 누계 유지
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT INTO cache_entries (key, value, size, accessed_at) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, '
+                    'accessed_at = excluded.accessed_at',
+                    (key, serialized, len(serialized), time.time())
+                )
+                total = conn.execute('SELECT total FROM cache_size WHERE id = 0').fetchone()[0]
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 분석 캐시 디스크 오류: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+            return
+        
+        if total > self.disk_max_bytes:
+            self._disk_evict()
+
+    def _disk_evict(self):
+        """디스크 캐시가 최대 크기를 넘으면 오래 안 쓴 항목부터 삭제 (accessed_at 인덱스 순서로 필요한 만큼만 읽음)"""
+        try:
+            conn = self._connect()
+            try:
+                total = conn.execute('SELECT total FROM cache_size WHERE id = 0').fetchone()[0]
+                excess = total - self.disk_max_bytes
+                evicted_keys = []
+                for key, size in conn.execute('SELECT key, size FROM cache_entries ORDER BY accessed_at'):
+                    if excess <= 0:
+                        break
+                    evicted_keys.append((key,))
+                    excess -= size
+                conn.executemany('DELETE FROM cache_entries WHERE key = ?', evicted_keys)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 분석 캐시 정리 실패: {e}")
+            return
+
+        with self._lock:
+            self._stats['disk_evictions'] += len(evicted_keys)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> Optional[AnalysisCache]:
+    """프로세스 공용 분석 캐시 반환 (비활성화 시 None)"""
+    global _cache
+    if not Config.ANALYSIS_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnalysisCache(
+                memory_max_bytes=Config.ANALYSIS_CACHE_MEMORY_MB * 1024 * 1024,
+                disk_dir=Config.ANALYSIS_CACHE_DIR or None,
+                disk_max_bytes=Config.ANALYSIS_CACHE_DISK_MB * 1024 * 1024
+            )
+        return _cache
@@ -0,0 +1,140 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+
+from ..config import Config
+from ..utils import timing
+
+Box = Tuple[int, int, int, int]
+
+
+class RoiImageAnalyzer:
+    """2단계(저해상도 → 원본 해상도) 관심 영역 분석
+
+    1단계: 썸네일의 녹색 마스크에서 식생 영역 외곽 박스를 찾는다.
+    2단계: 원본 해상도에서 그 영역만 잘라 색상/형태 분석을 수행한다.
+    화분, 벤치, 하늘 등 배경 픽셀은 처리하지 않으며, 형태 분석도 식생 영역 안의 엣지만 센다.
+    영역 좌표와 잎 외곽 박스는 원본 이미지 좌표(x, y, w, h)로 보고한다.
+    식생이 이미지 대부분을 덮으면 이득이 없으므로 전체 이미지 분석으로 대체한다.
+    """
+
+    def __init__(self, ai, thumbnail_size: Optional[int] = None, padding: Optional[int] = None,
+                 max_coverage: Optional[float] = None, min_area: Optional[int] = None):
+        self.ai = ai
+        self.thumbnail_size = thumbnail_size or Config.ANALYSIS_ROI_THUMBNAIL
+        self.padding = Config.ANALYSIS_ROI_PADDING if padding is None else padding
+        self.max_coverage = Config.ANALYSIS_ROI_MAX_COVERAGE if max_coverage is None else max_coverage
+        self.min_area = Config.ANALYSIS_ROI_MIN_AREA if min_area is None else min_area
+
+    def analyze(self, image: np.ndarray, area_scale: float = 1.0, shape_engine: str = 'contours',
+                gray: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
+        """관심 영역만 분석하여 imageAnalysis 형식 결과 반환 (영역이 너무 넓으면 None)
+
+        gray: 품질 게이트에서 이미 계산한 원본 해상도 그레이스케일 (없으면 여기서 계산)
+        """
+        height, width = image.shape[:2]
+        boxes, factor = self._locate(image)
+
+        coverage = sum(w * h for _, _, w, h in boxes) / (height * width)
+        if coverage > self.max_coverage:
+            return None
+
+        # 품질 점수와 영역별 엣지는 전체 이미지 분석과 같은 원본 해상도 그레이스케일에서 계산
+        if gray is None:
+            gray = self.ai._extract_gray(image)
+
+        green_pixels = 0
+        # 룩업 테이블 분류면 영역 안 식물의 황변/갈변 픽셀도 집계
+        yellow_pixels = brown_pixels = None if self.ai.color_lut is None else 0
+        leaf_count = 0
+        total_area = 0.0
+        leaf_boxes = []
+        for x, y, w, h in boxes:
+            crop = image[y:y + h, x:x + w]
+            with timing.stage('roi_planes'):
+                green_mask, classes = self.ai._classify_colors(crop)
+            green_pixels += cv2.countNonZero(green_mask)
+            lesions = self.ai._lesion_masks(green_mask, classes)
+            if lesions is not None:
+                yellow_pixels += cv2.countNonZero(lesions[0])
+                brown_pixels += cv2.countNonZero(lesions[1])
+
+            if shape_engine == 'components':
+                count, area, leaves = self.ai._count_components(green_mask, area_scale)
+            else:
+                count, area, leaves = self.ai._count_contours(gray[y:y + h, x:x + w], None, area_scale)
+            leaf_count += count
+            total_area += area
+            leaf_boxes.extend((x + lx, y + ly, lw, lh) for lx, ly, lw, lh in leaves)
+
+        pixels = height * width
+        if yellow_pixels is None:
+            color_analysis = self.ai._color_scores(green_pixels / pixels)
+        else:
+            color_analysis = self.ai._color_scores(
+                green_pixels / pixels, yellow_pixels / pixels, brown_pixels / pixels
+            )
+        shape_analysis = self.ai._shape_summary(leaf_count, total_area)
+
+        # 분석 해상도 → 원본 해상도 좌표 배율
+        scale = area_scale ** 0.5
+        return {
+            'color': color_analysis,
+            'shape': shape_analysis,
+            'health_score': self.ai._calculate_health_score(color_analysis, shape_analysis),
+            'image_quality': self.ai._assess_image_quality({'gray': gray}),
+            'roi': {
+                'image_size': [int(round(width * scale)), int(round(height * scale))],
+                'boxes': [self._scale_box(box, scale) for box in boxes],
+                'coverage': round(coverage, 4),
+                'leaf_boxes': [self._scale_box(box, scale) for box in leaf_boxes],
+                'thumbnail_factor': factor
+            }
+        }
+
+    def _locate(self, image: np.ndarray) -> Tuple[List[Box], int]:
+        """썸네일 녹색 마스크에서 식생 영역 박스(원본 좌표, 겹치는 박스는 병합) 찾기"""
+        height, width = image.shape[:2]
+        with timing.stage('roi_locate'):
+            # 간격 샘플링 썸네일 (영역 위치만 찾으므로 보간 불필요)
+            factor = max(1, -(-max(height, width) // self.thumbnail_size))
+            thumbnail = np.ascontiguousarray(image[::factor, ::factor])
+            mask, _ = self.ai._classify_colors(thumbnail)
+            mask = cv2.dilate(mask, np.ones((3, 3), np.uint8), iterations=2)
+
+            _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8, ltype=cv2.CV_32S)
+            boxes = []
+            for x, y, w, h, area in stats[1:]:
+                if area < self.min_area:
+                    continue
+                x0 = max(0, x * factor - self.padding)
+                y0 = max(0, y * factor - self.padding)
+                x1 = min(width, (x + w) * factor + self.padding)
+                y1 = min(height, (y + h) * factor + self.padding)
+                boxes.append((int(x0), int(y0), int(x1 - x0), int(y1 - y0)))
+        return self._merge_boxes(boxes), factor
+
+    @staticmethod
+    def _merge_boxes(boxes: List[Box]) -> List[Box]:
+        """겹치는 박스를 합쳐 같은 픽셀이 두 번 분석되지 않도록 함"""
+        merged = list(boxes)
+        changed = True
+        while changed:
+            changed = False
+            result = []
+            for box in merged:
+                x, y, w, h = box
+                for index, (ox, oy, ow, oh) in enumerate(result):
+                    if x < ox + ow and ox < x + w and y < oy + oh and oy < y + h:
+                        nx, ny = min(x, ox), min(y, oy)
+                        result[index] = (nx, ny, max(x + w, ox + ow) - nx, max(y + h, oy + oh) - ny)
+                        changed = True
+                        break
+                else:
+                    result.append(box)
+            merged = result
+        return sorted(merged, key=lambda box: (box[1], box[0]))
+
+    @staticmethod
+    def _scale_box(box: Box, scale: float) -> List[int]:
+        return [int(round(value * scale)) for value in box]
@@ -0,0 +1,268 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config import Config
+from ..utils import timing
+
+logger = logging.getLogger(__name__)
+
+# 변화 픽셀 판정 기준 (축소 그레이스케일 밝기 차이)
+CHANGED_PIXEL_DELTA = 25
+
+
+class SequenceTracker:
+    """고정 카메라 타임랩스용 키프레임 저장소 (카메라/식물 ID별)
+
+    시퀀스마다 마지막으로 전체 분석한 프레임(키프레임)의 축소 그레이스케일과
+    이미지 분석 결과를 보관한다. 새 프레임의 축소 영상이 키프레임과 거의 같으면
+    전체 디코딩과 분석을 생략하고 키프레임 결과를 이어서 사용(carried forward)한다.
+    - 비교 대상은 직전 프레임이 아니라 키프레임 (조금씩 누적되는 변화도 감지)
+    - 이어 쓴 프레임 수/경과 시간이 한도를 넘으면 변화가 없어도 다시 분석
+    - db_path가 있으면 모든 gunicorn 워커가 공유하는 SQLite 테이블에 보관 (연속 프레임이 다른
+      워커로 가도 같은 키프레임 사용, 최대 사용 시간이 지난 키프레임과 최대 시퀀스 수 초과분은
+      키프레임이 오래된 것부터 제거). 없으면 프로세스 내 LRU (워커마다 따로 보관)
+    """
+
+    def __init__(self, max_sequences: Optional[int] = None, thumbnail_size: Optional[int] = None,
+                 diff_threshold: Optional[float] = None, changed_fraction: Optional[float] = None,
+                 max_carry: Optional[int] = None, max_age: Optional[float] = None,
+                 db_path: Optional[str] = None):
+        self.max_sequences = max_sequences or Config.ANALYSIS_SEQUENCE_MAX_SEQUENCES
+        self.thumbnail_size = thumbnail_size or Config.ANALYSIS_SEQUENCE_THUMBNAIL
+        self.diff_threshold = Config.ANALYSIS_SEQUENCE_DIFF_THRESHOLD if diff_threshold is None else diff_threshold
+        self.changed_fraction = Config.ANALYSIS_SEQUENCE_CHANGED_FRACTION if changed_fraction is None else changed_fraction
+        self.max_carry = Config.ANALYSIS_SEQUENCE_MAX_CARRY if max_carry is None else max_carry
+        self.max_age = Config.ANALYSIS_SEQUENCE_MAX_AGE if max_age is None else max_age
+        self.db_path = (Config.ANALYSIS_SEQUENCE_DB if db_path is None else db_path) or None
+
+        self._keyframes = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'keyframes': 0, 'carried_forward': 0, 'evictions': 0, 'errors': 0}
+
+        if self.db_path:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._init_db()
+
+    def thumbnail(self, image_bytes) -> Optional[np.ndarray]:
+        """비교용 축소 그레이스케일 (JPEG은 1/4 축소 디코딩이라 전체 디코딩보다 훨씬 저렴)"""
+        with timing.stage('sequence_thumbnail'):
+            buffer = np.frombuffer(image_bytes, dtype=np.uint8)
+            gray = cv2.imdecode(buffer, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+            if gray is None:
+                return None
+            height, width = gray.shape
+            ratio = self.thumbnail_size / max(height, width)
+            if ratio < 1:
+                gray = cv2.resize(gray, (max(1, int(width * ratio)), max(1, int(height * ratio))),
+                                  interpolation=cv2.INTER_AREA)
+            return gray
+
+    def match(self, sequence_id: str, thumbnail: Optional[np.ndarray],
+              params: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """키프레임과 비교해 이어 쓸 이미지 분석 결과(없으면 None)와 비교 정보 반환
+
+        params: 이미지 분석 설정 (형태 분석 엔진 등) - 키프레임과 다르면 이어 쓰지 않음
+        """
+        info = {'sequence_id': sequence_id, 'carried_forward': False}
+        keyframe = self._load(sequence_id) if thumbnail is not None else None
+
+        if (keyframe is None or keyframe['params'] != params or
+                keyframe['thumbnail'].shape != thumbnail.shape):
+            return None, info
+
+        with timing.stage('sequence_diff'):
+            diff = cv2.absdiff(keyframe['thumbnail'], thumbnail)
+            mean_diff = float(cv2.mean(diff)[0])
+            changed = cv2.countNonZero(cv2.threshold(diff, CHANGED_PIXEL_DELTA, 255, cv2.THRESH_BINARY)[1])
+            changed_fraction = changed / diff.size
+
+        info.update({
+            'frame_difference': round(mean_diff, 3),
+            'changed_fraction': round(changed_fraction, 5),
+            'keyframe_at': keyframe['analyzed_at'],
+            'frames_since_keyframe': keyframe['carried'] + 1
+        })
+
+        expired = (keyframe['carried'] >= self.max_carry or
+                   time.time() - keyframe['analyzed_at'] > self.max_age)
+        if expired or mean_diff > self.diff_threshold or changed_fraction > self.changed_fraction:
+            return None, info
+
+        self._mark_carried(sequence_id, keyframe)
+        with self._lock:
+            self._stats['carried_forward'] += 1
+        info['carried_forward'] = True
+        return keyframe['image_analysis'], info
+
+    def update(self, sequence_id: str, thumbnail: Optional[np.ndarray], params: Dict[str, Any],
+               image_analysis: Dict[str, Any]):
+        """전체 분석한 프레임을 새 키프레임으로 저장"""
+        if thumbnail is None:
+            return
+        keyframe = {
+            'thumbnail': thumbnail,
+            'params': params,
+            'image_analysis': image_analysis,
+            'analyzed_at': time.time(),
+            'carried': 0
+        }
+        evicted = self._store(sequence_id, keyframe) if self.db_path else self._store_memory(sequence_id, keyframe)
+        if evicted is None:
+            return
+        with self._lock:
+            self._stats['keyframes'] += 1
+            self._stats['evictions'] += evicted
+
+    def reset(self, sequence_id: str):
+        if self.db_path:
+            self._db_execute('DELETE FROM sequence_keyframes WHERE sequence_id = ?', (sequence_id,))
+            return
+        with self._lock:
+            self._keyframes.pop(sequence_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['sequences'] = len(self._keyframes)
+        if self.db_path:
+            rows = self._db_execute('SELECT COUNT(*) FROM sequence_keyframes', fetch=True)
+            stats['sequences'] = rows[0][0] if rows else None
+        stats['shared'] = bool(self.db_path)
+        frames = stats['keyframes'] + stats['carried_forward']
+        stats['carry_rate'] = round(stats['carried_forward'] / frames, 4) if frames else 0.0
+        return stats
+
+    # 키프레임 보관 (프로세스 내 LRU 또는 공유 SQLite)
+    def _load(self, sequence_id: str) -> Optional[Dict[str, Any]]:
+        if not self.db_path:
+            with self._lock:
+                keyframe = self._keyframes.get(sequence_id)
+                if keyframe is not None:
+                    self._keyframes.move_to_end(sequence_id)
+            return keyframe
+
+        rows = self._db_execute(
+            'SELECT thumbnail, height, width, params, image_analysis, analyzed_at, carried '
+            'FROM sequence_keyframes WHERE sequence_id = ?', (sequence_id,), fetch=True
+        )
+        if not rows:
+            return None
+        thumbnail, height, width, params, image_analysis, analyzed_at, carried = rows[0]
+        return {
+            'thumbnail': np.frombuffer(thumbnail, dtype=np.uint8).reshape(height, width),
+            'params': json.loads(params),
+            'image_analysis': json.loads(image_analysis),
+            'analyzed_at': analyzed_at,
+            'carried': carried
+        }
+
+    def _mark_carried(self, sequence_id: str, keyframe: Dict[str, Any]):
+        """키프레임을 이어 쓴 프레임 수 증가 (공유 저장소는 그 사이 교체된 키프레임이면 무시)"""
+        if not self.db_path:
+            with self._lock:
+                keyframe['carried'] += 1
+            return
+        self._db_execute(
+            'UPDATE sequence_keyframes SET carried = carried + 1 WHERE sequence_id = ? AND analyzed_at = ?',
+            (sequence_id, keyframe['analyzed_at'])
+        )
+
+    def _store_memory(self, sequence_id: str, keyframe: Dict[str, Any]) -> int:
+        """프로세스 내 LRU에 저장하고 제거한 시퀀스 수 반환"""
+        evicted = 0
+        with self._lock:
+            self._keyframes[sequence_id] = keyframe
+            self._keyframes.move_to_end(sequence_id)
+            while len(self._keyframes) > self.max_sequences:
+                self._keyframes.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def _store(self, sequence_id: str, keyframe: Dict[str, Any]) -> Optional[int]:
+        """공유 SQLite에 저장하고 제거한 시퀀스 수 반환 (저장 실패 시 None)"""
+        try:
+            params = json.dumps(keyframe['params'], sort_keys=True)
+            image_analysis = json.dumps(keyframe['image_analysis'], ensure_ascii=False)
+        except (TypeError, ValueError):
+            with self._lock:
+                self._stats['errors'] += 1
+            return None
+
+        thumbnail = keyframe['thumbnail']
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO sequence_keyframes (sequence_id, thumbnail, height, width, params, '
+                    'image_analysis, analyzed_at, carried) VALUES (?, ?, ?, ?, ?, ?, ?, 0)',
+                    (sequence_id, thumbnail.tobytes(), thumbnail.shape[0], thumbnail.shape[1], params,
+                     image_analysis, keyframe['analyzed_at'])
+                )
+                # 최대 사용 시간이 지난 키프레임과 최대 시퀀스 수 초과분 제거 (analyzed_at 인덱스 사용)
+                evicted = conn.execute(
+                    'DELETE FROM sequence_keyframes WHERE analyzed_at < ?', (keyframe['analyzed_at'] - self.max_age,)
+                ).rowcount
+                evicted += conn.execute(
+                    'DELETE FROM sequence_keyframes WHERE sequence_id IN (SELECT sequence_id FROM sequence_keyframes '
+                    'ORDER BY analyzed_at DESC LIMIT -1 OFFSET ?)', (self.max_sequences,)
+                ).rowcount
+                conn.commit()
+                return evicted
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 타임랩스 키프레임 저장 실패: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+            return None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sequence_keyframes (
+                sequence_id TEXT PRIMARY KEY,
+                thumbnail BLOB NOT NULL,
+                height INTEGER NOT NULL,
+                width INTEGER NOT NULL,
+                params TEXT NOT NULL,
+                image_analysis TEXT NOT NULL,
+                analyzed_at REAL NOT NULL,
+                carried INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sequence_analyzed ON sequence_keyframes (analyzed_at)')
+        conn.commit()
+        conn.close()
+
+    def _db_execute(self, sql: str, params: tuple = (), fetch: bool = False) -> Optional[List[tuple]]:
+        """키프레임 DB 쿼리 실행 - 저장소 오류가 분석을 막지 않도록 예외는 기록만 함 (조회 실패는 키프레임 없음)"""
+        try:
+            conn = self._connect()
+            try:
+                cursor = conn.execute(sql, params)
+                rows = cursor.fetchall() if fetch else None
+                conn.commit()
+                return rows
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 타임랩스 키프레임 DB 오류: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+            return None
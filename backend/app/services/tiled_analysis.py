@@ -0,0 +1,311 @@
+import cv2
+import numpy as np
+import os
+from typing import Dict, List, Any, Optional, Tuple
+
+from ..config import Config
+
+
+def open_raster(source) -> np.ndarray:
+    """대용량 래스터를 메모리 매핑으로 열기 (픽셀은 타일을 읽을 때만 로드됨)
+
+    지원 형식: numpy 배열/np.memmap, .npy, 비압축 .tif/.tiff (tifffile 설치 시)
+    """
+    if isinstance(source, np.ndarray):
+        return source
+
+    extension = os.path.splitext(str(source))[1].lower()
+    if extension == '.npy':
+        return np.load(source, mmap_mode='r')
+    if extension in ('.tif', '.tiff'):
+        try:
+            import tifffile
+        except ImportError:
+            raise ValueError("TIFF 래스터를 열려면 tifffile 패키지가 필요합니다")
+        return tifffile.memmap(source, mode='r')
+
+    raise ValueError(f"지원하지 않는 래스터 형식입니다: {extension}")
+
+
+class TiledImageAnalyzer:
+    """대용량 정사영상/드론 이미지 타일 분석
+
+    래스터를 겹침(overlap) 영역을 둔 타일 단위로 읽어 PlantAnalysisAI와 같은 지표를
+    누적 계산한다. 최대 메모리 사용량은 이미지 크기가 아니라 타일(또는 타일 경계에 걸친
+    가장 큰 객체) 크기에 비례한다.
+    - 색상: 타일 중심 영역의 녹색 픽셀 수를 합산 (겹침 영역 중복 없음). 룩업 테이블 분류면 겹침 영역까지 포함한
+      식물 영역 안의 황변/갈변 픽셀도 중심 영역만 합산
+    - 품질: 그레이스케일 히스토그램과 품질 게이트 축소본 통계를 합산해 전체 지표 계산
+    - 형태: 분석기와 같은 엔진(컨투어/연결 요소)으로 객체를 찾고, 외곽 박스 좌상단이 속한 타일이
+      객체 전체를 볼 때만 집계. 겹침 영역보다 커서 잘린 객체는 객체 전체를 덮는 창을 다시 읽어 한 번만 집계
+    """
+
+    # 잘린 객체 판정 여유 (Canny의 Sobel/비최대 억제가 보는 주변 픽셀)
+    EDGE_MARGIN = {'contours': 3, 'components': 1}
+
+    def __init__(self, ai, tile_size: Optional[int] = None, overlap: Optional[int] = None):
+        self.ai = ai
+        self.tile_size = tile_size or Config.ANALYSIS_TILE_SIZE
+        self.overlap = Config.ANALYSIS_TILE_OVERLAP if overlap is None else overlap
+
+    def analyze(self, raster: np.ndarray, channel_order: str = 'rgb',
+                shape_engine: str = 'contours') -> Dict[str, Any]:
+        """래스터 전체를 타일 단위로 분석하여 imageAnalysis 형식 결과와 타일별 건강도 격자 반환
+
+        품질 게이트가 켜져 있으면 전체 지표가 기준 미달일 때 ImageQualityRejected
+        """
+        if raster.dtype != np.uint8:
+            raise ValueError("8비트 래스터만 지원합니다")
+
+        height, width = raster.shape[:2]
+        rows = (height + self.tile_size - 1) // self.tile_size
+        cols = (width + self.tile_size - 1) // self.tile_size
+        margin = self.EDGE_MARGIN[shape_engine]
+        quality_factor = self.ai._quality_factor(height, width)
+
+        lesions_enabled = self.ai.color_lut is not None
+        green_pixels = 0
+        gray_histogram = np.zeros(256, dtype=np.float64)
+        quality_sums = np.zeros(5, dtype=np.float64)
+        green_grid = [[0] * cols for _ in range(rows)]
+        yellow_grid = [[0] * cols for _ in range(rows)]
+        brown_grid = [[0] * cols for _ in range(rows)]
+        leaf_grid = [[0] * cols for _ in range(rows)]
+        area_grid = [[0.0] * cols for _ in range(rows)]
+        clipped = []
+
+        for row in range(rows):
+            for col in range(cols):
+                core = self._core(row, col, height, width)
+                window = self._window(core, height, width)
+                planes = self.ai._extract_planes(self._read(raster, window, channel_order))
+
+                # 타일 내부 좌표계의 중심 영역
+                wy0, _, wx0, _ = window
+                cy0, cy1, cx0, cx1 = core[0] - wy0, core[1] - wy0, core[2] - wx0, core[3] - wx0
+                gray_core = np.ascontiguousarray(planes['gray'][cy0:cy1, cx0:cx1])
+
+                tile_green = cv2.countNonZero(planes['green_mask'][cy0:cy1, cx0:cx1])
+                green_pixels += tile_green
+                green_grid[row][col] = tile_green
+                lesions = self.ai._lesion_masks(planes['green_mask'], planes.get('color_classes'))
+                if lesions is not None:
+                    yellow_grid[row][col] = cv2.countNonZero(lesions[0][cy0:cy1, cx0:cx1])
+                    brown_grid[row][col] = cv2.countNonZero(lesions[1][cy0:cy1, cx0:cx1])
+                gray_histogram += cv2.calcHist([gray_core], [0], None, [256], [0, 256]).ravel()
+                if self.ai.quality_gate:
+                    quality_sums += self._quality_sums(gray_core, quality_factor)
+
+                # 이 타일이 소유한 객체 집계, 창 경계에서 잘린 객체는 나중에 한 번에 재분석
+                for box, area in self._shape_objects(planes, shape_engine):
+                    x, y, w, h = box
+                    box = (x + wx0, y + wy0, w, h)
+                    if self._touches_cut(box, window, height, width, margin):
+                        clipped.append(box)
+                    elif self._owner(box) == (row, col):
+                        self._count(leaf_grid, area_grid, row, col, area)
+
+        if self.ai.quality_gate:
+            self.ai._raise_if_rejected(self._quality_metrics(quality_sums))
+
+        counted = set()
+        for region in self._merge_boxes(clipped, margin):
+            self._analyze_region(raster, region, channel_order, shape_engine, margin, leaf_grid, area_grid, counted)
+
+        # 타일별 건강도
+        health_grid = [[0.0] * cols for _ in range(rows)]
+        greenness_grid = [[0.0] * cols for _ in range(rows)]
+        for row in range(rows):
+            for col in range(cols):
+                y0, y1, x0, x1 = self._core(row, col, height, width)
+                tile_color = self._color_scores(
+                    green_grid[row][col], yellow_grid[row][col], brown_grid[row][col],
+                    (y1 - y0) * (x1 - x0), lesions_enabled
+                )
+                tile_shape = self.ai._shape_summary(leaf_grid[row][col], area_grid[row][col])
+                health_grid[row][col] = float(self.ai._calculate_health_score(tile_color, tile_shape))
+                greenness_grid[row][col] = tile_color['greenness']
+
+        # 전체 결과 병합
+        color_analysis = self._color_scores(
+            green_pixels, sum(map(sum, yellow_grid)), sum(map(sum, brown_grid)), height * width, lesions_enabled
+        )
+        shape_analysis = self.ai._shape_summary(
+            sum(map(sum, leaf_grid)), sum(map(sum, area_grid))
+        )
+
+        levels = np.arange(256, dtype=np.float64)
+        pixel_count = gray_histogram.sum()
+        brightness = float((gray_histogram * levels).sum() / pixel_count)
+        contrast = float(np.sqrt((gray_histogram * (levels - brightness) ** 2).sum() / pixel_count))
+
+        return {
+            'color': color_analysis,
+            'shape': shape_analysis,
+            'health_score': self.ai._calculate_health_score(color_analysis, shape_analysis),
+            'image_quality': self.ai._quality_score(brightness, contrast),
+            'tile_grid': {
+                'rows': rows,
+                'cols': cols,
+                'tile_size': self.tile_size,
+                'overlap': self.overlap,
+                'image_size': [width, height],
+                'health': health_grid,
+                'greenness': greenness_grid,
+                'leaf_count': leaf_grid
+            }
+        }
+
+    def _color_scores(self, green: int, yellow: int, brown: int, pixels: int, lesions_enabled: bool) -> Dict[str, Any]:
+        """픽셀 수로 색상 점수 계산 (황변/갈변 실측은 룩업 테이블 분류일 때만)"""
+        if not lesions_enabled:
+            return self.ai._color_scores(green / pixels)
+        return self.ai._color_scores(green / pixels, yellow / pixels, brown / pixels)
+
+    def _core(self, row: int, col: int, height: int, width: int) -> Tuple[int, int, int, int]:
+        """타일 중심 영역 (y0, y1, x0, x1)"""
+        return (
+            row * self.tile_size, min((row + 1) * self.tile_size, height),
+            col * self.tile_size, min((col + 1) * self.tile_size, width)
+        )
+
+    def _window(self, core: Tuple[int, int, int, int], height: int, width: int) -> Tuple[int, int, int, int]:
+        """중심 영역에 겹침 영역을 더한 읽기 창 (y0, y1, x0, x1)"""
+        y0, y1, x0, x1 = core
+        return (
+            max(0, y0 - self.overlap), min(height, y1 + self.overlap),
+            max(0, x0 - self.overlap), min(width, x1 + self.overlap)
+        )
+
+    def _read(self, raster: np.ndarray, window: Tuple[int, int, int, int], channel_order: str) -> np.ndarray:
+        y0, y1, x0, x1 = window
+        return self._to_bgr(raster[y0:y1, x0:x1], channel_order)
+
+    def _owner(self, box: Tuple[int, int, int, int]) -> Tuple[int, int]:
+        """객체를 집계할 타일 (외곽 박스 좌상단이 속한 타일)"""
+        return box[1] // self.tile_size, box[0] // self.tile_size
+
+    def _shape_objects(self, planes: Dict[str, np.ndarray], shape_engine: str) -> List[Tuple[tuple, float]]:
+        """분석기의 형태 엔진으로 찾은 객체별 (외곽 박스, 면적) - 창 좌표계"""
+        if shape_engine == 'components':
+            stats = self.ai._component_stats(planes['green_mask'], planes.get('labels'))
+            return [(tuple(int(v) for v in stat[:4]), float(stat[cv2.CC_STAT_AREA])) for stat in stats]
+
+        contours, areas = self.ai._find_contours(planes['gray'], planes['edges'])
+        return [(cv2.boundingRect(contour), area) for contour, area in zip(contours, areas)]
+
+    @staticmethod
+    def _touches_cut(box: Tuple[int, int, int, int], window: Tuple[int, int, int, int],
+                     height: int, width: int, margin: int) -> bool:
+        """객체가 창 경계(이미지 경계 제외)에 닿아 잘렸을 수 있는지"""
+        x, y, w, h = box
+        y0, y1, x0, x1 = window
+        return ((y0 > 0 and y < y0 + margin) or (x0 > 0 and x < x0 + margin)
+                or (y1 < height and y + h > y1 - margin) or (x1 < width and x + w > x1 - margin))
+
+    def _count(self, leaf_grid: List[List[int]], area_grid: List[List[float]], row: int, col: int, area: float):
+        """객체 하나를 타일 격자에 집계 (최소 잎 면적 100px - 원본 해상도)"""
+        area_grid[row][col] += area
+        if area > 100:
+            leaf_grid[row][col] += 1
+
+    def _analyze_region(self, raster: np.ndarray, region: Tuple[int, int, int, int], channel_order: str,
+                        shape_engine: str, margin: int, leaf_grid: List[List[int]], area_grid: List[List[float]],
+                        counted: set):
+        """타일 창에서 잘린 객체들을 덮는 창을 다시 읽어, 소유 타일 창에서 잘리는 객체만 집계
+
+        Canny 히스테리시스는 창 밖의 강한 엣지에 이어진 약한 엣지를 창 안에서 놓칠 수 있으므로,
+        창 경계에 닿는 객체가 없어질 때까지 창을 타일 크기만큼 넓혀 다시 읽는다.
+        """
+        height, width = raster.shape[:2]
+        ry0, ry1, rx0, rx1 = region
+        region = (max(0, ry0), min(height, ry1), max(0, rx0), min(width, rx1))
+
+        while True:
+            planes = self.ai._extract_planes(self._read(raster, region, channel_order))
+            ry0, ry1, rx0, rx1 = region
+            objects = [((x + rx0, y + ry0, w, h), area) for (x, y, w, h), area in self._shape_objects(planes, shape_engine)]
+
+            grown = region
+            for box, _ in objects:
+                if self._touches_cut(box, region, height, width, margin):
+                    grown = self._grow(grown, box, height, width, margin)
+            if grown == region:
+                break
+            region = grown
+
+        for box, area in objects:
+            row, col = self._owner(box)
+            owner_window = self._window(self._core(row, col, height, width), height, width)
+            # 소유 타일 창에 온전히 들어가는 객체는 타일 단계에서, 이미 센 객체는 앞 창에서 집계됨
+            if self._touches_cut(box, owner_window, height, width, margin) and (box, area) not in counted:
+                counted.add((box, area))
+                self._count(leaf_grid, area_grid, row, col, area)
+
+    def _grow(self, region: Tuple[int, int, int, int], box: Tuple[int, int, int, int],
+              height: int, width: int, margin: int) -> Tuple[int, int, int, int]:
+        """객체가 닿은 창 경계를 타일 크기만큼 넓힘"""
+        x, y, w, h = box
+        y0, y1, x0, x1 = region
+        if y0 > 0 and y < y0 + margin:
+            y0 = max(0, y0 - self.tile_size)
+        if x0 > 0 and x < x0 + margin:
+            x0 = max(0, x0 - self.tile_size)
+        if y1 < height and y + h > y1 - margin:
+            y1 = min(height, y1 + self.tile_size)
+        if x1 < width and x + w > x1 - margin:
+            x1 = min(width, x1 + self.tile_size)
+        return y0, y1, x0, x1
+
+    @staticmethod
+    def _merge_boxes(boxes: List[Tuple[int, int, int, int]], margin: int) -> List[Tuple[int, int, int, int]]:
+        """겹치거나 맞닿은 외곽 박스를 합쳐 재분석 창 (y0, y1, x0, x1) 목록으로 변환"""
+        regions = [[y - margin, y + h + margin, x - margin, x + w + margin] for x, y, w, h in boxes]
+        merged = True
+        while merged:
+            merged = False
+            result = []
+            for region in regions:
+                for other in result:
+                    if region[0] <= other[1] and other[0] <= region[1] and region[2] <= other[3] and other[2] <= region[3]:
+                        other[0], other[1] = min(other[0], region[0]), max(other[1], region[1])
+                        other[2], other[3] = min(other[2], region[2]), max(other[3], region[3])
+                        merged = True
+                        break
+                else:
+                    result.append(region)
+            regions = result
+        return [tuple(region) for region in regions]
+
+    def _quality_sums(self, gray: np.ndarray, factor: int) -> np.ndarray:
+        """품질 게이트 축소본의 (픽셀 수, 합, 제곱합, 라플라시안 합, 라플라시안 제곱합)"""
+        small = self.ai._quality_sample(gray, factor).astype(np.float64)
+        laplacian = cv2.Laplacian(small, cv2.CV_64F)
+        return np.array([small.size, small.sum(), (small * small).sum(), laplacian.sum(), (laplacian * laplacian).sum()])
+
+    @staticmethod
+    def _quality_metrics(sums: np.ndarray) -> Dict[str, float]:
+        """타일별 합계로 _check_quality와 같은 밝기/대비/선명도 지표 계산"""
+        count, total, square, laplacian_total, laplacian_square = sums
+        mean = total / count
+        laplacian_mean = laplacian_total / count
+        return {
+            'brightness': round(float(mean), 2),
+            'contrast': round(float(max(square / count - mean ** 2, 0.0)) ** 0.5, 2),
+            'sharpness': round(float(max(laplacian_square / count - laplacian_mean ** 2, 0.0)), 2)
+        }
+
+    @staticmethod
+    def _to_bgr(tile: np.ndarray, channel_order: str) -> np.ndarray:
+        """타일을 OpenCV BGR 형식의 연속 배열로 변환 (메모리 매핑에서 이 타일만 읽힘)"""
+        if tile.ndim == 2:
+            return cv2.cvtColor(np.ascontiguousarray(tile), cv2.COLOR_GRAY2BGR)
+
+        channels = tile.shape[2]
+        if channel_order == 'bgr':
+            conversion = cv2.COLOR_BGRA2BGR if channels == 4 else None
+        else:
+            conversion = cv2.COLOR_RGBA2BGR if channels == 4 else cv2.COLOR_RGB2BGR
+
+        tile = np.ascontiguousarray(tile)
+        return cv2.cvtColor(tile, conversion) if conversion is not None else tile
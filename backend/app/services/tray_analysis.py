@@ -0,0 +1,241 @@
+import cv2
+import numpy as np
+from typing import Dict, Any, Optional, Tuple
+
+from ..config import Config
+from ..utils import timing
+
+
+class TrayAnalyzer:
+    """육묘 트레이 다중 식물 분석 (한 장의 사진 → 셀별 결과)
+
+    이미지 전체의 파생 평면을 한 번만 계산한 뒤 셀 단위 지표를 벡터 연산으로 집계한다.
+    - grid: rows x cols 격자로 나누고 녹색 픽셀 수를 np.add.reduceat으로 셀별 합산
+    - components: 녹색 마스크를 팽창시켜 붙은 잎을 식물 단위로 묶고, 연결 요소마다 한 셀
+    잎 개수/면적은 잎(연결 요소 또는 컨투어) 중심이 속한 셀에 bincount로 배정한다.
+    룩업 테이블 분류면 식물 영역 안의 황변/갈변 픽셀도 같은 방식으로 셀별 합산한다.
+    """
+
+    def __init__(self, ai, min_plant_area: Optional[int] = None, empty_ratio: Optional[float] = None):
+        self.ai = ai
+        self.min_plant_area = Config.ANALYSIS_TRAY_MIN_PLANT_AREA if min_plant_area is None else min_plant_area
+        self.empty_ratio = Config.ANALYSIS_TRAY_EMPTY_RATIO if empty_ratio is None else empty_ratio
+
+    def analyze(self, image: np.ndarray, area_scale: float = 1.0, shape_engine: str = 'contours',
+                rows: Optional[int] = None, cols: Optional[int] = None, gray_ready: bool = False) -> Dict[str, Any]:
+        """트레이 이미지를 분석하여 전체 imageAnalysis와 셀별 결과(tray) 반환
+
+        gray_ready: 품질 게이트가 그레이스케일 평면을 이미 계산한 경우
+        """
+        planes = self.ai._extract_planes(image, gray_ready=gray_ready)
+        height, width = image.shape[:2]
+        lesions = self.ai._lesion_masks(planes['green_mask'], planes.get('color_classes'))
+
+        with timing.stage('tray_cells'):
+            if rows and cols:
+                cells = self._grid_cells(planes['green_mask'], rows, cols)
+            else:
+                cells = self._component_cells(planes['green_mask'], area_scale, lesions or ())
+
+        with timing.stage('tray_leaves'):
+            leaf_x, leaf_y, leaf_areas = self._leaves(planes, area_scale, shape_engine)
+            leaf_cells = self._assign(cells, leaf_x, leaf_y)
+            valid = leaf_cells >= 0
+            count = len(cells['bbox'])
+            is_leaf = leaf_areas > 100 / area_scale
+            leaf_count = np.bincount(leaf_cells[valid & is_leaf], minlength=count)
+            total_area = np.bincount(leaf_cells[valid], weights=leaf_areas[valid], minlength=count) * area_scale
+
+        # 셀별 점수 (일괄 계산)
+        cell_pixels = np.maximum(cells['pixels'], 1)
+        green_ratio = cells['green_pixels'] / cell_pixels
+        if lesions is None:
+            colors = self.ai._color_scores_batch(green_ratio)
+        else:
+            yellow_pixels, brown_pixels = (self._cell_pixels(cells, mask) for mask in lesions)
+            colors = self.ai._color_scores_batch(green_ratio, yellow_pixels / cell_pixels, brown_pixels / cell_pixels)
+        health = self.ai._health_score_batch(colors, leaf_count)
+        size_category = self.ai._size_category_batch(total_area)
+        empty = green_ratio < self.empty_ratio
+
+        # 트레이 전체 결과
+        pixels = height * width
+        if lesions is None:
+            color_analysis = self.ai._color_scores(float(cells['total_green']) / pixels)
+        else:
+            color_analysis = self.ai._color_scores(
+                float(cells['total_green']) / pixels,
+                cv2.countNonZero(lesions[0]) / pixels, cv2.countNonZero(lesions[1]) / pixels
+            )
+        shape_analysis = self.ai._shape_summary(int(np.count_nonzero(is_leaf)), float(leaf_areas.sum()) * area_scale)
+
+        scale = area_scale ** 0.5
+        cell_results = []
+        for index in range(count):
+            cell = {
+                'index': index,
+                'bbox': [int(round(value * scale)) for value in cells['bbox'][index]],
+                'empty': bool(empty[index]),
+                'green_ratio': float(green_ratio[index]),
+                'greenness': float(colors['greenness'][index]),
+                'yellowing': float(colors['yellowing'][index]),
+                'browning': float(colors['browning'][index]),
+                'leaf_count': int(leaf_count[index]),
+                'total_area': float(total_area[index]),
+                'size_category': str(size_category[index]),
+                'health_score': float(health[index])
+            }
+            if 'row' in cells:
+                cell['row'] = int(cells['row'][index])
+                cell['col'] = int(cells['col'][index])
+            cell_results.append(cell)
+
+        return {
+            'color': color_analysis,
+            'shape': shape_analysis,
+            'health_score': self.ai._calculate_health_score(color_analysis, shape_analysis),
+            'image_quality': self.ai._assess_image_quality(planes),
+            'tray': {
+                'mode': 'grid' if rows and cols else 'components',
+                'rows': rows,
+                'cols': cols,
+                'cell_count': count,
+                'cells': cell_results,
+                'aggregates': self._aggregates(health, colors['greenness'], leaf_count, size_category, empty)
+            }
+        }
+
+    def _grid_cells(self, green_mask: np.ndarray, rows: int, cols: int) -> Dict[str, np.ndarray]:
+        """rows x cols 격자 셀별 녹색 픽셀 수 (셀 크기가 나누어떨어지지 않아도 됨)"""
+        height, width = green_mask.shape
+        row_edges = np.linspace(0, height, rows + 1).astype(np.int64)
+        col_edges = np.linspace(0, width, cols + 1).astype(np.int64)
+        green_pixels = self._grid_sums(green_mask, row_edges, col_edges)
+
+        cell_heights = np.diff(row_edges)
+        cell_widths = np.diff(col_edges)
+        row_index, col_index = np.divmod(np.arange(rows * cols), cols)
+        bbox = np.stack([col_edges[col_index], row_edges[row_index],
+                         cell_widths[col_index], cell_heights[row_index]], axis=1)
+        return {
+            'bbox': bbox,
+            'pixels': bbox[:, 2] * bbox[:, 3],
+            'green_pixels': green_pixels,
+            'total_green': green_pixels.sum(),
+            'row': row_index,
+            'col': col_index,
+            'row_edges': row_edges,
+            'col_edges': col_edges
+        }
+
+    @staticmethod
+    def _grid_sums(mask: np.ndarray, row_edges: np.ndarray, col_edges: np.ndarray) -> np.ndarray:
+        """격자 셀별 마스크 픽셀 수"""
+        row_sums = np.add.reduceat(mask, row_edges[:-1], axis=0, dtype=np.int64)
+        return (np.add.reduceat(row_sums, col_edges[:-1], axis=1) // 255).ravel()
+
+    def _cell_pixels(self, cells: Dict[str, np.ndarray], mask: np.ndarray) -> np.ndarray:
+        """셀별 마스크 픽셀 수 (격자 또는 연결 요소 셀)"""
+        if 'row_edges' in cells:
+            return self._grid_sums(mask, cells['row_edges'], cells['col_edges'])
+        per_label = np.bincount(cells['labels'][mask > 0], minlength=len(cells['label_to_cell']))
+        return per_label[cells['keep']]
+
+    def _component_cells(self, green_mask: np.ndarray, area_scale: float,
+                         lesions: Tuple[np.ndarray, ...] = ()) -> Dict[str, np.ndarray]:
+        """녹색 마스크 팽창 후 연결 요소를 식물 셀로 사용 (읽기 순서로 정렬)
+
+        lesions: 식물 영역 안의 황변/갈변 마스크 - 잎 안의 큰 병반이 셀에서 빠지지 않도록 마스크에 합침
+        """
+        height, width = green_mask.shape
+        kernel_size = max(3, min(height, width) // 100) | 1
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
+        plants = green_mask
+        for mask in lesions:
+            plants = cv2.bitwise_or(plants, mask)
+        plants = cv2.dilate(plants, kernel)
+
+        _, labels, stats, _ = cv2.connectedComponentsWithStats(plants, connectivity=8, ltype=cv2.CV_32S)
+        green_per_label = np.bincount(labels[green_mask > 0], minlength=len(stats))
+
+        # 배경(0)과 너무 작은 영역 제외
+        keep = np.flatnonzero(green_per_label * area_scale >= self.min_plant_area)
+        keep = keep[keep > 0]
+        bbox = stats[keep, :4].astype(np.int64)
+
+        # 읽기 순서: 셀 높이 중앙값 단위의 행, 그 안에서 x 순
+        if len(keep):
+            row_height = max(1, int(np.median(bbox[:, 3])))
+            order = np.lexsort((bbox[:, 0], (bbox[:, 1] + bbox[:, 3] // 2) // row_height))
+            keep, bbox = keep[order], bbox[order]
+
+        label_to_cell = np.full(len(stats), -1, dtype=np.int64)
+        label_to_cell[keep] = np.arange(len(keep))
+        return {
+            'bbox': bbox,
+            'pixels': bbox[:, 2] * bbox[:, 3],
+            'green_pixels': green_per_label[keep],
+            'total_green': green_per_label[keep].sum(),
+            'labels': labels,
+            'label_to_cell': label_to_cell,
+            'keep': keep
+        }
+
+    def _leaves(self, planes: Dict[str, np.ndarray], area_scale: float, shape_engine: str):
+        """이미지 전체에서 잎(연결 요소 또는 컨투어)의 중심 좌표와 면적을 한 번에 계산"""
+        if shape_engine == 'components':
+            _, _, stats, centroids = cv2.connectedComponentsWithStats(
+                planes['green_mask'], connectivity=8, ltype=cv2.CV_32S
+            )
+            return centroids[1:, 0], centroids[1:, 1], stats[1:, cv2.CC_STAT_AREA].astype(np.float64)
+
+        edges = cv2.Canny(planes['gray'], 50, 150, edges=planes['edges'])
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            empty = np.empty(0, dtype=np.float64)
+            return empty, empty, empty
+        boxes = np.array([cv2.boundingRect(c) for c in contours], dtype=np.float64)
+        areas = np.array([cv2.contourArea(c) for c in contours], dtype=np.float64)
+        return boxes[:, 0] + boxes[:, 2] / 2, boxes[:, 1] + boxes[:, 3] / 2, areas
+
+    @staticmethod
+    def _assign(cells: Dict[str, np.ndarray], x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """잎 중심 좌표가 속한 셀 번호 (어느 셀에도 속하지 않으면 -1)"""
+        if 'row_edges' in cells:
+            rows = np.searchsorted(cells['row_edges'], y, side='right') - 1
+            cols = np.searchsorted(cells['col_edges'], x, side='right') - 1
+            rows = np.clip(rows, 0, len(cells['row_edges']) - 2)
+            cols = np.clip(cols, 0, len(cells['col_edges']) - 2)
+            return rows * (len(cells['col_edges']) - 1) + cols
+
+        labels = cells['labels']
+        yi = np.clip(y.astype(np.int64), 0, labels.shape[0] - 1)
+        xi = np.clip(x.astype(np.int64), 0, labels.shape[1] - 1)
+        return cells['label_to_cell'][labels[yi, xi]]
+
+    @staticmethod
+    def _aggregates(health: np.ndarray, greenness: np.ndarray, leaf_count: np.ndarray,
+                    size_category: np.ndarray, empty: np.ndarray) -> Dict[str, Any]:
+        """트레이 단위 집계 (빈 셀 제외)"""
+        occupied = ~empty
+        aggregates = {
+            'occupied_cells': int(np.count_nonzero(occupied)),
+            'empty_cells': int(np.count_nonzero(empty)),
+            'total_leaf_count': int(leaf_count[occupied].sum())
+        }
+        if not occupied.any():
+            return aggregates
+
+        occupied_health = health[occupied]
+        order = np.flatnonzero(occupied)[np.argsort(occupied_health, kind='stable')]
+        categories, counts = np.unique(size_category[occupied], return_counts=True)
+        aggregates.update({
+            'health_mean': float(occupied_health.mean()),
+            'health_min': float(occupied_health.min()),
+            'health_max': float(occupied_health.max()),
+            'health_std': float(occupied_health.std()),
+            'greenness_mean': float(greenness[occupied].mean()),
+            'size_categories': {str(category): int(n) for category, n in zip(categories, counts)},
+            'weakest_cells': order[:5].tolist()
+        })
+        return aggregates
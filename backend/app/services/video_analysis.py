@@ -0,0 +1,227 @@
+import logging
+import cv2
+import numpy as np
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from ..config import Config
+from ..utils import timing
+
+logger = logging.getLogger(__name__)
+
+
+def iter_video_frames(video_path: str, stride: int = 1, keyframes_only: bool = False,
+                      max_frames: Optional[int] = None) -> Iterator[Tuple[int, float, np.ndarray]]:
+    """영상에서 샘플링한 프레임을 하나씩 (프레임 번호, 시각(초), BGR 이미지)로 반환
+
+    메모리에는 현재 프레임 하나(PyAV는 압축 패킷 한 GOP)만 유지한다.
+    - keyframes_only: 키프레임만 디코딩 (PyAV skip_frame='NONKEY', av 패키지 필요)
+    - stride: N번째 프레임마다 샘플링. PyAV가 있으면 샘플 프레임이 없는 GOP는 디코딩하지 않고 건너뛴다
+      (GOP 안의 프레임은 서로 참조하므로 샘플이 있는 GOP는 전체를 디코딩). 없으면 OpenCV로 모든 프레임을 디코딩
+    """
+    if keyframes_only:
+        if not keyframe_decoding_available():
+            raise ValueError("키프레임 디코딩에는 av 패키지가 필요합니다")
+        yield from _iter_keyframes(video_path, max_frames)
+        return
+
+    if keyframe_decoding_available():
+        yield from _iter_stride_frames(video_path, stride, max_frames)
+        return
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError("영상을 열 수 없습니다")
+
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30
+        index = 0
+        sampled = 0
+        while max_frames is None or sampled < max_frames:
+            with timing.stage('video_decode'):
+                if index % stride:
+                    if not capture.grab():
+                        break
+                    index += 1
+                    continue
+                ok, frame = capture.read()
+            if not ok:
+                break
+            yield index, index / fps, frame
+            sampled += 1
+            index += 1
+    finally:
+        capture.release()
+
+
+def keyframe_decoding_available() -> bool:
+    """PyAV(키프레임 전용 디코딩, GOP 단위 건너뛰기) 사용 가능 여부"""
+    try:
+        import av  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _open_video(video_path: str):
+    import av
+
+    try:
+        container = av.open(video_path)
+    except av.error.FFmpegError:
+        raise ValueError("영상을 열 수 없습니다")
+    if not container.streams.video:
+        container.close()
+        raise ValueError("영상 스트림이 없습니다")
+    stream = container.streams.video[0]
+    stream.thread_type = 'AUTO'
+    return container, stream
+
+
+def _iter_keyframes(video_path: str, max_frames: Optional[int]) -> Iterator[Tuple[int, float, np.ndarray]]:
+    """PyAV로 키프레임만 디코딩"""
+    container, stream = _open_video(video_path)
+    with container:
+        stream.codec_context.skip_frame = 'NONKEY'
+        fps = float(stream.average_rate or 30)
+
+        sampled = 0
+        for frame in container.decode(stream):
+            if max_frames is not None and sampled >= max_frames:
+                break
+            with timing.stage('video_decode'):
+                image = frame.to_ndarray(format='bgr24')
+            timestamp = float(frame.time) if frame.time is not None else sampled / fps
+            yield int(round(timestamp * fps)), timestamp, image
+            sampled += 1
+
+
+def _iter_stride_frames(video_path: str, stride: int,
+                        max_frames: Optional[int]) -> Iterator[Tuple[int, float, np.ndarray]]:
+    """PyAV로 N번째 프레임마다 샘플링
+
+    패킷은 디코딩 없이 읽어(demux) 키프레임 단위(GOP)로 모으고, 샘플 프레임이 들어 있는 GOP만
+    디코딩한다. 샘플이 아닌 프레임은 BGR 변환을 생략한다.
+    """
+    container, stream = _open_video(video_path)
+    with container:
+        fps = float(stream.average_rate or 30)
+        time_base = float(stream.time_base)
+        start = stream.start_time or 0
+
+        def frame_index(pts):
+            return int(round((pts - start) * time_base * fps))
+
+        def wanted(group):
+            # pts가 없는 패킷이 있으면 안전하게 디코딩
+            return any(packet.pts is None or frame_index(packet.pts) % stride == 0 for packet in group)
+
+        def decode(group):
+            # GOP 끝에서 디코더를 비워(drain) 지연된 프레임까지 받고, 다음 GOP를 건너뛸 수 있도록 초기화
+            codec = stream.codec_context
+            for packet in group + [None]:
+                with timing.stage('video_decode'):
+                    frames = codec.decode(packet)
+                for frame in frames:
+                    if frame.pts is None or frame_index(frame.pts) % stride:
+                        continue
+                    index = frame_index(frame.pts)
+                    with timing.stage('video_decode'):
+                        image = frame.to_ndarray(format='bgr24')
+                    yield index, index / fps, image
+            codec.flush_buffers()
+
+        sampled = 0
+        group = []
+        for packet in container.demux(stream):
+            # 크기 0 패킷은 스트림 끝 신호 (디코더 비우기는 decode에서 처리)
+            if not packet.size:
+                continue
+            if packet.is_keyframe and group:
+                if wanted(group):
+                    for item in decode(group):
+                        yield item
+                        sampled += 1
+                        if max_frames is not None and sampled >= max_frames:
+                            return
+                group = []
+            group.append(packet)
+
+        if group and wanted(group):
+            for item in decode(group):
+                if max_frames is not None and sampled >= max_frames:
+                    return
+                yield item
+                sampled += 1
+
+class VideoAnalyzer:
+    """영상 파일 분석 (샘플링한 프레임을 PlantAnalysisAI 이미지 분석에 순차 전달)
+
+    프레임별 결과(건강도, 녹색도, 잎 개수, 품질)와 샘플 프레임 전체를 집계한
+    imageAnalysis 형식 결과를 반환한다. 품질 게이트에 걸린 프레임은 집계에서 제외한다.
+    """
+
+    def __init__(self, ai, stride: Optional[int] = None, keyframes_only: Optional[bool] = None,
+                 max_frames: Optional[int] = None):
+        self.ai = ai
+        self.stride = max(1, stride or Config.ANALYSIS_VIDEO_STRIDE)
+        self.keyframes_only = Config.ANALYSIS_VIDEO_KEYFRAMES if keyframes_only is None else keyframes_only
+        self.max_frames = max_frames or Config.ANALYSIS_VIDEO_MAX_FRAMES
+
+    def analyze(self, video_path: str, shape_engine: str = 'contours') -> Dict[str, Any]:
+        from .ai import ImageQualityRejected
+
+        frames = []
+        analyses = []
+        rejected = 0
+        for index, timestamp, frame in iter_video_frames(video_path, self.stride, self.keyframes_only,
+                                                         self.max_frames):
+            image, area_scale = self.ai._fit_resolution(frame, None)
+            try:
+                analysis = self.ai._analyze_image_array(image, area_scale, shape_engine)
+            except ImageQualityRejected as e:
+                rejected += 1
+                frames.append({'frame_index': index, 'timestamp': round(timestamp, 3), **e.to_result()})
+                continue
+
+            analyses.append(analysis)
+            frames.append({
+                'frame_index': index,
+                'timestamp': round(timestamp, 3),
+                'health_score': float(analysis['health_score']),
+                'greenness': analysis['color']['greenness'],
+                'leaf_count': analysis['shape']['leaf_count'],
+                'image_quality': float(analysis['image_quality'])
+            })
+
+        if not analyses:
+            raise ValueError("분석할 수 있는 영상 프레임이 없습니다")
+
+        # 샘플 프레임 집계 (녹색 비율/면적/품질은 평균, 잎 개수는 중앙값)
+        color_analysis = self.ai._color_scores(float(np.mean([a['color']['green_ratio'] for a in analyses])))
+        shape_analysis = self.ai._shape_summary(
+            int(round(np.median([a['shape']['leaf_count'] for a in analyses]))),
+            float(np.mean([a['shape']['total_area'] for a in analyses]))
+        )
+        health_scores = np.array([frame['health_score'] for frame in frames if 'health_score' in frame])
+
+        return {
+            'color': color_analysis,
+            'shape': shape_analysis,
+            'health_score': self.ai._calculate_health_score(color_analysis, shape_analysis),
+            'image_quality': float(np.mean([a['image_quality'] for a in analyses])),
+            'video': {
+                'decoder': self._decoder_label(),
+                'sampled_frames': len(frames),
+                'analyzed_frames': len(analyses),
+                'rejected_frames': rejected,
+                'frames': frames,
+                'health_min': float(health_scores.min()),
+                'health_max': float(health_scores.max()),
+                'health_mean': float(health_scores.mean())
+            }
+        }
+
+    def _decoder_label(self) -> str:
+        if self.keyframes_only:
+            return 'keyframes'
+        return f"stride:{self.stride}" + ('' if keyframe_decoding_available() else ':opencv')
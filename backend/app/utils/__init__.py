@@ -0,0 +1 @@
+# Utilities
\ No newline at end of file
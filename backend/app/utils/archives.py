@@ -0,0 +1,103 @@
+import posixpath
+import tarfile
+import zipfile
+import zlib
+from collections import namedtuple
+from typing import Callable, Iterator, Optional
+
+from ..config import Config
+
+# 압축 파일 멤버 (error가 있으면 data는 None)
+ArchiveMember = namedtuple('ArchiveMember', ['index', 'name', 'size', 'data', 'error'])
+
+
+class ArchiveReader:
+    """ZIP/TAR 업로드를 디스크에 풀지 않고 멤버 단위로 읽기
+
+    - ZIP: 중앙 디렉토리만 먼저 읽고 멤버를 하나씩 압축 해제 (업로드 스트림이 seek 가능해야 함)
+    - TAR(.tar, .tar.gz, .tgz, .tar.bz2, .tar.xz): 스트림 모드로 앞에서부터 순차 읽기
+    메모리에는 현재 멤버 하나만 유지한다. 디렉토리, 숨김 파일, accept를 통과하지 못한 멤버는
+    건너뛰고(skipped), 크기 한도를 넘는 멤버는 읽지 않고 오류 항목으로 반환한다.
+    """
+
+    def __init__(self, stream, accept: Callable[[str], bool], max_members: Optional[int] = None,
+                 max_member_bytes: Optional[int] = None):
+        self.stream = stream
+        self.accept = accept
+        self.max_members = max_members or Config.ANALYSIS_ARCHIVE_MAX_MEMBERS
+        self.max_member_bytes = max_member_bytes or Config.ANALYSIS_ARCHIVE_MAX_MEMBER_BYTES
+        self.skipped = 0
+        self.truncated = False
+
+        # 형식은 생성 시 판별 (잘못된 파일은 분석 시작 전에 ValueError)
+        stream.seek(0)
+        if zipfile.is_zipfile(stream):
+            stream.seek(0)
+            self.format = 'zip'
+            self._archive = zipfile.ZipFile(stream)
+            return
+
+        stream.seek(0)
+        try:
+            self._archive = tarfile.open(fileobj=stream, mode='r|*')
+        except tarfile.TarError:
+            raise ValueError("지원하지 않는 압축 형식입니다 (ZIP 또는 TAR만 지원)")
+        self.format = 'tar'
+
+    def __iter__(self) -> Iterator[ArchiveMember]:
+        return self._iter_zip() if self.format == 'zip' else self._iter_tar()
+
+    def _iter_zip(self) -> Iterator[ArchiveMember]:
+        with self._archive as archive:
+            index = 0
+            for info in archive.infolist():
+                if info.is_dir() or not self._wanted(info.filename):
+                    continue
+                if index >= self.max_members:
+                    self.truncated = True
+                    return
+                if info.file_size > self.max_member_bytes:
+                    yield self._too_large(index, info.filename, info.file_size)
+                else:
+                    try:
+                        with archive.open(info) as member:
+                            # 선언된 크기를 믿지 않고 한도까지만 읽음 (압축 폭탄 방지)
+                            data = member.read(self.max_member_bytes + 1)
+                    except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+                        yield ArchiveMember(index, info.filename, info.file_size, None, f"압축 해제 실패: {e}")
+                        index += 1
+                        continue
+                    if len(data) > self.max_member_bytes:
+                        yield self._too_large(index, info.filename, len(data))
+                    else:
+                        yield ArchiveMember(index, info.filename, len(data), data, None)
+                index += 1
+
+    def _iter_tar(self) -> Iterator[ArchiveMember]:
+        with self._archive as archive:
+            index = 0
+            for info in archive:
+                if not info.isfile() or not self._wanted(info.name):
+                    continue
+                if index >= self.max_members:
+                    self.truncated = True
+                    return
+                if info.size > self.max_member_bytes:
+                    yield self._too_large(index, info.name, info.size)
+                else:
+                    member = archive.extractfile(info)
+                    data = member.read()
+                    yield ArchiveMember(index, info.name, len(data), data, None)
+                index += 1
+
+    def _wanted(self, name: str) -> bool:
+        """분석 대상 멤버 여부 (macOS 메타데이터, 숨김 파일, 허용되지 않은 확장자 제외)"""
+        basename = posixpath.basename(name)
+        if name.startswith('__MACOSX/') or not basename or basename.startswith('.') or not self.accept(basename):
+            self.skipped += 1
+            return False
+        return True
+
+    def _too_large(self, index: int, name: str, size: int) -> ArchiveMember:
+        limit_mb = self.max_member_bytes / (1024 * 1024)
+        return ArchiveMember(index, name, size, None, f"파일 크기가 한도({limit_mb:.0f}MB)를 초과합니다")
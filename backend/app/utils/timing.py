@@ -0,0 +1,187 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, Optional
+
+from ..config import Config
+
+# 히스토그램 버킷 상한 (ms)
+BUCKET_BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+_NULL_STAGE = nullcontext()
+_local = threading.local()
+
+
+class StageHistogram:
+    """단계별 소요 시간 히스토그램 (고정 버킷)"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def observe(self, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.min_ms = elapsed_ms if self.min_ms is None else min(self.min_ms, elapsed_ms)
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for index, bound in enumerate(BUCKET_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """버킷 상한 기준 근사 백분위수"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target:
+                return BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'min_ms': round(self.min_ms, 3) if self.min_ms is not None else None,
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'buckets': {
+                (f"le_{bound}" if index < len(BUCKET_BOUNDS_MS) else 'inf'): bucket
+                for index, (bound, bucket) in enumerate(zip(BUCKET_BOUNDS_MS + [None], self.buckets))
+            }
+        }
+
+
+class StageTimings:
+    """프로세스 내 단계별 히스토그램 저장소"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, elapsed_ms: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = StageHistogram()
+            histogram.observe(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+timings = StageTimings()
+
+
+class _Stage:
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def is_enabled() -> bool:
+    """전역 계측(ANALYSIS_TIMING) 또는 현재 스레드의 요청 단위 수집이 켜져 있는지"""
+    return Config.ANALYSIS_TIMING or getattr(_local, 'capture', None) is not None
+
+
+def stage(name: str):
+    """단계 시간 측정 컨텍스트 (꺼져 있으면 아무 일도 하지 않는 공용 객체 반환)"""
+    if not Config.ANALYSIS_TIMING and getattr(_local, 'capture', None) is None:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def record(name: str, elapsed_ms: float):
+    """측정값을 히스토그램과 현재 요청 수집 결과에 기록"""
+    timings.record(name, elapsed_ms)
+    capture = getattr(_local, 'capture', None)
+    if capture is not None:
+        entry = capture.setdefault(name, {'count': 0, 'total_ms': 0.0})
+        entry['count'] += 1
+        entry['total_ms'] += elapsed_ms
+
+
+def record_many(stage_timings: Dict[str, Dict[str, float]]):
+    """다른 프로세스(분석 엔진 자식)에서 수집한 단계 시간 병합"""
+    for name, entry in stage_timings.items():
+        average_ms = entry['total_ms'] / entry['count'] if entry['count'] else 0.0
+        for _ in range(entry['count']):
+            record(name, average_ms)
+
+
+@contextmanager
+def capture():
+    """현재 스레드에서 측정되는 단계 시간을 요청 단위로 수집"""
+    previous = getattr(_local, 'capture', None)
+    collected = {}
+    _local.capture = collected
+    try:
+        yield collected
+    finally:
+        _local.capture = previous
+
+
+def summarize(collected: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """요청 단위 수집 결과를 응답용으로 정리"""
+    return {
+        name: {'count': entry['count'], 'total_ms': round(entry['total_ms'], 3)}
+        for name, entry in collected.items()
+    }
+
+
+def timed_endpoint(stage_name: str, parse_form: bool = True):
+    """Flask 라우트 계측 데코레이터
+
+    요청 전체 시간을 stage_name으로 기록하고, 요청에 debug=true(폼/쿼리)가 있으면
+    이 요청에서 측정된 단계별 시간을 응답 JSON의 debug.timings에 첨부한다.
+    parse_form=False면 쿼리 문자열만 확인한다 (본문을 직접 스트리밍으로 읽는 라우트용).
+    """
+    from functools import wraps
+    from flask import request, jsonify
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            values = request.values if parse_form else request.args
+            debug = values.get('debug', 'false').lower() == 'true'
+            if not debug:
+                with stage(stage_name):
+                    return view(*args, **kwargs)
+
+            with capture() as collected:
+                with stage(stage_name):
+                    response = view(*args, **kwargs)
+
+            body, status = response if isinstance(response, tuple) else (response, None)
+            payload = body.get_json(silent=True)
+            if not isinstance(payload, dict):
+                return response
+            payload['debug'] = {'timings': summarize(collected)}
+            return (jsonify(payload), status) if status else jsonify(payload)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,112 @@
+import os
+import uuid
+from collections import namedtuple
+from typing import Callable, Dict, Iterator, List
+from werkzeug.sansio.multipart import MultipartDecoder, NeedData, Field, File, Data, Epilogue
+from werkzeug.utils import secure_filename
+
+# 스트리밍으로 받은 파일 파트 (압축 파일 멤버와 같은 형식, error가 있으면 data는 None)
+UploadPart = namedtuple('UploadPart', ['index', 'name', 'size', 'data', 'error'])
+
+# 폼 필드(파일 제외) 최대 크기 - werkzeug 폼 파싱 기본값과 동일
+MAX_FORM_MEMORY_SIZE = 500 * 1024
+
+
+def upload_buffer(file) -> memoryview:
+    """업로드 파일의 내용을 memoryview로 반환 (메모리 버퍼는 복사 없이 공유)
+
+    werkzeug는 작은 업로드를 BytesIO에, 큰 업로드를 임시 파일에 보관한다.
+    BytesIO는 getbuffer()로 내부 버퍼를 그대로 노출하고, 임시 파일만 한 번 읽는다.
+    반환값은 `with` 블록으로 사용해 요청 종료 전에 해제해야 한다.
+    """
+    stream = file.stream
+    if hasattr(stream, 'getbuffer'):
+        return stream.getbuffer()
+    stream.seek(0)
+    return memoryview(stream.read())
+
+
+def save_upload(buffer, filename: str, upload_folder: str = None) -> str:
+    """업로드 버퍼를 업로드 폴더에 저장하고 경로 반환"""
+    upload_folder = upload_folder or os.getenv('UPLOAD_FOLDER', './uploads')
+    os.makedirs(upload_folder, exist_ok=True)
+
+    filepath = os.path.join(upload_folder, f"{uuid.uuid4()}_{secure_filename(filename)}")
+    with open(filepath, 'wb') as f:
+        f.write(buffer)
+    return filepath
+
+
+def save_upload_file(file, filename: str, upload_folder: str = None) -> str:
+    """업로드 파일을 메모리에 올리지 않고 디스크로 스트리밍 저장 후 경로 반환 (영상 등 대용량 파일용)"""
+    upload_folder = upload_folder or os.getenv('UPLOAD_FOLDER', './uploads')
+    os.makedirs(upload_folder, exist_ok=True)
+
+    filepath = os.path.join(upload_folder, f"{uuid.uuid4()}_{secure_filename(filename)}")
+    file.save(filepath)
+    return filepath
+
+
+class MultipartStreamReader:
+    """multipart/form-data 본문을 받는 대로 파싱 (werkzeug 폼 파싱의 전체 버퍼링/스풀 없이)
+
+    파일 파트는 끝까지 받는 즉시 하나씩 반환하므로, 뒤 파트가 업로드되는 동안 앞 파트를 분석할 수 있다.
+    폼 필드는 fields에 모인다. 첫 파일 파트 이후에 온 필드는 late_fields에만 기록한다
+    (이미 분석이 시작되어 반영할 수 없음). file_field가 아닌 파일 파트와 accept를 통과하지 못한 파일은 건너뛴다.
+    """
+
+    format = 'multipart'
+    truncated = False  # 파트 수는 MAX_CONTENT_LENGTH로만 제한
+
+    def __init__(self, stream, boundary: str, file_field: str, accept: Callable[[str], bool],
+                 chunk_size: int = 64 * 1024):
+        self.stream = stream
+        self.decoder = MultipartDecoder(boundary.encode(), max_form_memory_size=MAX_FORM_MEMORY_SIZE)
+        self.file_field = file_field
+        self.accept = accept
+        self.chunk_size = chunk_size
+        self.fields: Dict[str, str] = {}
+        self.late_fields: List[str] = []
+        self.skipped = 0
+
+    def __iter__(self) -> Iterator[UploadPart]:
+        index = 0
+        part = None
+        buffer = bytearray()
+        while True:
+            event = self.decoder.next_event()
+            if isinstance(event, NeedData):
+                chunk = self.stream.read(self.chunk_size)
+                # 빈 청크면 본문 끝 (끝나지 않은 파트가 있으면 decoder가 ValueError)
+                self.decoder.receive_data(chunk or None)
+                continue
+            if isinstance(event, Epilogue):
+                return
+
+            if isinstance(event, Field):
+                part = ('field', event.name)
+                buffer.clear()
+            elif isinstance(event, File):
+                wanted = event.name == self.file_field and self.accept(event.filename)
+                if event.name == self.file_field and not wanted:
+                    self.skipped += 1
+                part = ('file', secure_filename(event.filename)) if wanted else None
+                buffer.clear()
+            elif isinstance(event, Data):
+                if part is not None:
+                    buffer += event.data
+                if event.more_data or part is None:
+                    continue
+
+                kind, name = part
+                part = None
+                if kind == 'field':
+                    if index:
+                        self.late_fields.append(name)
+                    else:
+                        self.fields[name] = buffer.decode('utf-8', 'replace')
+                else:
+                    # 받은 버퍼를 그대로 넘기고 다음 파트는 새 버퍼에 받음 (복사 없음)
+                    data, buffer = buffer, bytearray()
+                    yield UploadPart(index, name, len(data), data, None)
+                    index += 1
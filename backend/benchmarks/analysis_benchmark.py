@@ -0,0 +1,268 @@
+"""
+식물 이미지 분석 파이프라인 벤치마크
+
+결정적(시드 고정) 합성 식물 이미지를 여러 해상도/포맷으로 생성해
+PlantAnalysisAI 전체 분석, 내부 단계별 처리, /api/v1/analyze 라우트의
+처리량(images/sec), p50/p95 지연시간, 최대 RSS를 측정하고 JSON으로 저장한다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.analysis_benchmark --output bench.json
+    python -m benchmarks.analysis_benchmark --quick --compare bench_before.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 벤치마크는 캐시 없이 매번 실제 분석을 수행해야 함
+os.environ.setdefault('ANALYSIS_CACHE_ENABLED', 'false')
+
+from app.config import Config  # noqa: E402
+from app.services.ai import PlantAnalysisAI  # noqa: E402
+
+RESOLUTIONS = {
+    'vga': (640, 480),
+    'fhd': (1920, 1080),
+    '12mp': (4000, 3000)
+}
+FORMATS = {
+    'jpg': ('.jpg', [cv2.IMWRITE_JPEG_QUALITY, 90]),
+    'png': ('.png', [cv2.IMWRITE_PNG_COMPRESSION, 3]),
+    'webp': ('.webp', [cv2.IMWRITE_WEBP_QUALITY, 90])
+}
+ENVIRONMENT_DATA = {'innerTemperature': 24, 'innerHumidity': 65, 'ph': 6.4, 'ec': 1.8}
+ANALYSIS_ITEMS = ['plantHealth', 'size', 'height', 'leafCount', 'condition', 'leafColor']
+
+
+def make_plant_image(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """결정적 합성 식물 이미지 (흙 배경 + 잎 타원 + 황변/갈변 잎 + 센서 잡음)"""
+    rng = np.random.default_rng(seed)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    gradient = np.linspace(0, 40, height, dtype=np.float32)[:, None]
+    image[:, :, 0] = (50 + gradient).astype(np.uint8)
+    image[:, :, 1] = (70 + gradient).astype(np.uint8)
+    image[:, :, 2] = (100 + gradient).astype(np.uint8)
+
+    scale = width / 640
+    for _ in range(40):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        axes = (int(rng.integers(15, 60) * scale), int(rng.integers(8, 30) * scale))
+        kind = rng.random()
+        if kind < 0.8:
+            color = (int(rng.integers(20, 70)), int(rng.integers(110, 210)), int(rng.integers(20, 80)))
+        elif kind < 0.9:
+            color = (40, 200, 210)  # 황변
+        else:
+            color = (30, 70, 120)  # 갈변
+        cv2.ellipse(image, center, axes, int(rng.integers(0, 180)), 0, 360, color, -1)
+
+    noise = rng.integers(0, 24, image.shape, dtype=np.uint8)
+    return cv2.add(image, noise)
+
+
+def encode_image(image: np.ndarray, fmt: str) -> bytes:
+    extension, params = FORMATS[fmt]
+    ok, encoded = cv2.imencode(extension, image, params)
+    if not ok:
+        raise RuntimeError(f"{fmt} 인코딩 실패")
+    return encoded.tobytes()
+
+
+def peak_rss_mb() -> float:
+    """프로세스 최대 RSS (MB, Linux는 KB 단위, macOS는 바이트 단위)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(name: str, func: Callable[[], Any], iterations: int, images_per_call: int = 1,
+            warmup: int = 1) -> Dict[str, Any]:
+    """함수 반복 실행 후 처리량/지연시간/최대 RSS 집계"""
+    for _ in range(warmup):
+        func()
+
+    rss_before = peak_rss_mb()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    latencies_array = np.array(latencies)
+    result = {
+        'name': name,
+        'iterations': iterations,
+        'images_per_sec': round(iterations * images_per_call / elapsed, 3),
+        'p50_ms': round(float(np.percentile(latencies_array, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencies_array, 95)), 3),
+        'mean_ms': round(float(latencies_array.mean()), 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'peak_rss_growth_mb': round(peak_rss_mb() - rss_before, 1)
+    }
+    print(f"  {name:<45} {result['images_per_sec']:>9.2f} img/s  "
+          f"p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+          f"rss {result['peak_rss_mb']:>7.1f} MB")
+    return result
+
+
+def bench_pipeline(ai: PlantAnalysisAI, data: bytes, label: str, iterations: int,
+                   workdir: str) -> List[Dict[str, Any]]:
+    """전체 분석(경로/바이트)과 내부 단계별 벤치마크"""
+    results = []
+    path = os.path.join(workdir, f"{label.replace('/', '_')}")
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    results.append(measure(f"{label} analyze_plant_image",
+                           lambda: ai.analyze_plant_image(path, ENVIRONMENT_DATA, 'basic-analysis-v1', ANALYSIS_ITEMS),
+                           iterations))
+    results.append(measure(f"{label} analyze_plant_bytes",
+                           lambda: ai.analyze_plant_bytes(data, ENVIRONMENT_DATA, 'basic-analysis-v1', ANALYSIS_ITEMS),
+                           iterations))
+    results.append(measure(f"{label} analyze_plant_bytes (components)",
+                           lambda: ai.analyze_plant_bytes(data, ENVIRONMENT_DATA, 'fast-plant-ai-v2', ANALYSIS_ITEMS),
+                           iterations))
+
+    # 내부 단계
+    image, area_scale = ai._decode_image(data)
+    planes = ai._extract_planes(image)
+    stages = [
+        ('decode', lambda: ai._decode_image(data)),
+        ('extract_planes', lambda: ai._extract_planes(image)),
+        ('analyze_colors', lambda: ai._analyze_colors(planes)),
+        ('analyze_shapes', lambda: ai._analyze_shapes(planes, area_scale)),
+        ('analyze_shapes_components', lambda: ai._analyze_shapes_components(planes, area_scale)),
+        ('assess_image_quality', lambda: ai._assess_image_quality(planes)),
+        ('analyze_environment', lambda: ai._analyze_environment(ENVIRONMENT_DATA))
+    ]
+    for stage_name, func in stages:
+        results.append(measure(f"{label} stage:{stage_name}", func, iterations))
+    return results
+
+
+def bench_route(images: List[bytes], iterations: int) -> List[Dict[str, Any]]:
+    """Flask 테스트 클라이언트로 /api/v1/analyze 라우트 벤치마크 (단일/다중 이미지)"""
+    from run import app
+    from app.services.analysis_engine import get_analysis_engine
+
+    get_analysis_engine().start()
+    client = app.test_client()
+
+    def post(batch: List[bytes]):
+        response = client.post('/api/v1/analyze', data={
+            'images': [(io.BytesIO(data), f"image_{index}.jpg") for index, data in enumerate(batch)],
+            'environmentData': json.dumps(ENVIRONMENT_DATA),
+            'analysisItems': json.dumps(ANALYSIS_ITEMS),
+            'modelId': 'basic-analysis-v1'
+        }, content_type='multipart/form-data')
+        if response.status_code != 200:
+            raise RuntimeError(f"라우트 응답 오류: {response.status_code} {response.get_data(as_text=True)[:200]}")
+
+    results = [
+        measure("route /api/v1/analyze x1", lambda: post(images[:1]), iterations),
+        measure(f"route /api/v1/analyze x{len(images)}", lambda: post(images), iterations,
+                images_per_call=len(images))
+    ]
+    get_analysis_engine().shutdown()
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], baseline_path: str):
+    """이전 실행 결과와 처리량/지연시간 비교 출력"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {result['name']: result for result in baseline.get('results', [])}
+
+    print(f"\n📊 비교: {baseline.get('git_revision')} → {current.get('git_revision')}")
+    for result in current['results']:
+        before = previous.get(result['name'])
+        if not before:
+            continue
+        speedup = result['images_per_sec'] / before['images_per_sec'] if before['images_per_sec'] else 0
+        print(f"  {result['name']:<45} {speedup:>6.2f}x  "
+              f"p50 {before['p50_ms']:>9.2f} → {result['p50_ms']:>9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="식물 이미지 분석 파이프라인 벤치마크")
+    parser.add_argument('--resolutions', default=','.join(RESOLUTIONS), help="쉼표 구분: " + ', '.join(RESOLUTIONS))
+    parser.add_argument('--formats', default=','.join(FORMATS), help="쉼표 구분: " + ', '.join(FORMATS))
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=8, help="다중 이미지 라우트 벤치마크 이미지 수")
+    parser.add_argument('--skip-route', action='store_true', help="라우트 벤치마크 생략")
+    parser.add_argument('--quick', action='store_true', help="vga/jpg, 3회 반복만 실행")
+    parser.add_argument('--output', default=None, help="결과 JSON 저장 경로")
+    parser.add_argument('--compare', default=None, help="비교할 이전 결과 JSON 경로")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.resolutions, args.formats, args.iterations = 'vga', 'jpg', 3
+
+    ai = PlantAnalysisAI(use_cache=False)
+    results = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for resolution in args.resolutions.split(','):
+            width, height = RESOLUTIONS[resolution]
+            image = make_plant_image(width, height)
+            for fmt in args.formats.split(','):
+                data = encode_image(image, fmt)
+                label = f"{resolution}/{fmt}"
+                print(f"\n🌱 {label} ({width}x{height}, {len(data) / 1024:.0f} KB)")
+                results.extend(bench_pipeline(ai, data, label, args.iterations, workdir))
+
+    if not args.skip_route:
+        print(f"\n🌐 /api/v1/analyze (분석 엔진 프로세스 {Config.ANALYSIS_WORKERS}개)")
+        width, height = RESOLUTIONS['fhd']
+        images = [encode_image(make_plant_image(width, height, seed), 'jpg') for seed in range(args.batch_size)]
+        results.extend(bench_route(images, max(1, args.iterations // 2)))
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python_version': platform.python_version(),
+        'opencv_version': cv2.__version__,
+        'numpy_version': np.__version__,
+        'cpu_count': os.cpu_count(),
+        'config': {
+            'analysis_workers': Config.ANALYSIS_WORKERS,
+            'analysis_max_pixels': Config.ANALYSIS_MAX_PIXELS
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
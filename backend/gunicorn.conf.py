@@ -10,6 +10,13 @@ backlog = 2048
 # 워커 프로세스
 workers = int(os.environ.get("WORKERS", multiprocessing.cpu_count() * 2 + 1))
 worker_class = "sync"
+threads = int(os.environ.get("THREADS", 1))  # 1보다 크면 gthread 워커 (연합학습 예측 배칭용)
+
+# 워커별 분석 엔진 풀 크기: 전체 풀 자식 프로세스가 CPU 코어 수를 넘지 않도록 워커 수로 나눔
+# (앱 로드 전에 설정되어 Config.ANALYSIS_WORKERS 기본값이 됨, 환경변수로 직접 지정하면 그 값 사용)
+# 기본 워커 수(2C+1)에서는 1이라 풀 없이 순차 분석하고 병렬성은 워커들이 동시 요청으로 나눠 가짐.
+# 다중 이미지 요청 하나를 코어에 나누려면 WORKERS를 줄임 (예: WORKERS=2 → 워커당 C/2 프로세스)
+os.environ.setdefault("ANALYSIS_WORKERS", str(max(1, multiprocessing.cpu_count() // workers)))
 worker_connections = 1000
 timeout = int(os.environ.get("TIMEOUT", 300))
 keepalive = int(os.environ.get("KEEPALIVE", 2))
@@ -49,4 +56,21 @@ tmp_upload_dir = None
 # 성능 최적화
 max_requests = 1000
 max_requests_jitter = 50
-preload_app = True 
\ No newline at end of file
+preload_app = True 
+
+# 워커별 분석 엔진 풀 예열 (cv2/numpy 임포트를 요청 전에 끝냄, 풀 크기 1 이하면 생성하지 않음)
+# 및 비동기 분석 작업 스레드 시작 (재시작 전에 대기 중이던 작업도 이어서 처리)
+def post_fork(server, worker):
+    from app.config import Config
+    from app.services.analysis_engine import get_analysis_engine
+    from app.services.job_queue import get_job_queue
+    if Config.ANALYSIS_PREWARM:
+        get_analysis_engine().start()
+    get_job_queue().start()
+
+
+def worker_exit(server, worker):
+    from app.services.analysis_engine import get_analysis_engine
+    from app.services.job_queue import get_job_queue
+    get_job_queue().shutdown()
+    get_analysis_engine().shutdown()
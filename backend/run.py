@@ -155,6 +155,13 @@ def get_models():
                 "category": "무료",
                 "accuracy": "94%",
                 "description": "OpenCV와 머신러닝을 활용한 고정밀 식물 분석 모델입니다."
+            },
+            {
+                "id": "fast-plant-ai-v2",
+                "name": "고속 식물 분석 AI v2.0 (서버)",
+                "category": "무료",
+                "accuracy": "90%",
+                "description": "녹색 영역 연결 요소 기반으로 잎을 세는 고속 분석 모델입니다. 대량 이미지 분석에 적합합니다."
             }
         ]
         
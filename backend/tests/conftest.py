@@ -0,0 +1,5 @@
+import os
+import sys
+
+# backend 디렉터리를 import 경로에 추가 (app 패키지)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
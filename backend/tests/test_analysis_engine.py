@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from app.services.ai import PlantAnalysisAI
+from app.services.analysis_engine import AnalysisEngine
+
+pytestmark = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                                reason="자식 프로세스에 가짜 분석기를 물려주려면 fork가 필요")
+
+TIMEOUT = 0.5
+
+
+def fake_analyze(self, image_bytes, environment_data, model_id, analysis_items):
+    """b'hang'은 SIGALRM을 무시하고 멈춤 (자식 시간 제한으로 끊기지 않는 C 코드 흉내), 나머지는 잠깐 뒤 반환"""
+    name = bytes(image_bytes).decode()
+    if name == 'hang':
+        signal.signal(signal.SIGALRM, signal.SIG_IGN)
+        time.sleep(60)
+    time.sleep(0.3 if name.startswith('slow') else 0.01)
+    return {'image': name, 'pid': os.getpid()}
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(PlantAnalysisAI, 'analyze_plant_bytes', fake_analyze)
+    engine = AnalysisEngine(max_workers=2, timeout=TIMEOUT, start_method='fork')
+    engine._local_ai = PlantAnalysisAI(use_cache=False)
+    yield engine
+    engine.shutdown()
+
+
+def test_pool_disabled_below_two_workers(monkeypatch):
+    monkeypatch.setattr(PlantAnalysisAI, 'analyze_plant_bytes', fake_analyze)
+    engine = AnalysisEngine(max_workers=1, timeout=TIMEOUT, start_method='fork')
+    engine._local_ai = PlantAnalysisAI(use_cache=False)
+
+    results = engine.analyze_batch([b'a', b'b'], {}, 'basic-analysis-v1', [])
+
+    assert not engine.enabled
+    assert engine._generation is None
+    assert [result['pid'] for result in results] == [os.getpid()] * 2
+
+
+def test_batch_results_keep_input_order(engine):
+    images = [f'img{i}'.encode() for i in range(6)]
+    results = engine.analyze_batch(images, {}, 'basic-analysis-v1', [])
+
+    assert [result['image'] for result in results] == [f'img{i}' for i in range(6)]
+    assert all(result['pid'] != os.getpid() for result in results)
+
+
+def test_timeout_restarts_pool_without_failing_other_callers(engine):
+    engine.start()
+    first_generation = engine._generation
+    other_results = {}
+
+    def other_caller():
+        images = [f'slow{i}'.encode() for i in range(6)]
+        other_results['results'] = engine.analyze_batch(images, {}, 'basic-analysis-v1', [])
+
+    thread = threading.Thread(target=other_caller)
+    thread.start()
+    results = engine.analyze_batch([b'hang', b'ok'], {}, 'basic-analysis-v1', [])
+    thread.join()
+
+    # 멈춘 이미지만 시간 초과, 같은 풀을 쓰던 다른 호출자의 이미지는 새 세대에서 다시 분석됨
+    assert '시간 초과' in results[0]['error']
+    assert results[1]['image'] == 'ok'
+    assert [result.get('image') for result in other_results['results']] == [f'slow{i}' for i in range(6)]
+    assert first_generation.retired == 'timeout'
+
+    # 폐기 후 새 세대로 계속 분석
+    assert [result['image'] for result in engine.analyze_batch([b'x', b'y'], {}, 'basic-analysis-v1', [])] == ['x', 'y']
+    assert engine._generation is not first_generation
+
+
+def test_stream_survives_pool_restart(engine):
+    images = [(index, name) for index, name in enumerate([b'ok0', b'hang', b'ok2', b'ok3', b'ok4'])]
+    results = dict(engine.analyze_stream(iter(images), {}, 'basic-analysis-v1', []))
+
+    assert '시간 초과' in results[1]['error']
+    assert [results[index]['image'] for index in (0, 2, 3, 4)] == ['ok0', 'ok2', 'ok3', 'ok4']
@@ -0,0 +1,51 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.services.ai import PlantAnalysisAI
+
+
+def make_plant_on_soil(lesion_radius):
+    """갈색 토양 위 녹색 식물(타원) 안에 갈변 병반(원)이 있는 이미지와 병반 마스크 (BGR)"""
+    rng = np.random.default_rng(0)
+    image = np.full((1200, 1600, 3), (40, 75, 115), np.uint8)
+    image = cv2.add(image, rng.integers(0, 15, image.shape, dtype=np.uint8))
+    cv2.ellipse(image, (800, 600), (300, 200), 15, 0, 360, (40, 160, 60), -1)
+
+    lesion = np.zeros(image.shape[:2], np.uint8)
+    cv2.circle(lesion, (850, 560), lesion_radius, 255, -1)
+    image[lesion > 0] = (30, 70, 120)
+    return image, lesion
+
+
+@pytest.mark.parametrize('lesion_radius', [0, 40, 80])
+def test_browning_counts_lesion_not_soil(lesion_radius):
+    image, lesion = make_plant_on_soil(lesion_radius)
+    ai = PlantAnalysisAI(max_pixels=0, use_cache=False, quality_gate=False, color_classifier='lut')
+
+    color = ai._analyze_colors(ai._extract_planes(image))
+
+    pixels = image.shape[0] * image.shape[1]
+    lesion_area = cv2.countNonZero(lesion)
+    assert color['brown_ratio'] * pixels == pytest.approx(lesion_area, abs=50)
+
+    plant_area = color['green_ratio'] * pixels + lesion_area
+    assert color['browning'] == pytest.approx(lesion_area / plant_area * 100, abs=0.1)
+
+
+def test_lut_classifier_used_by_region_analyzers():
+    from app.services.roi_analysis import RoiImageAnalyzer
+    from app.services.tiled_analysis import TiledImageAnalyzer
+    from app.services.tray_analysis import TrayAnalyzer
+
+    image, lesion = make_plant_on_soil(40)
+    ai = PlantAnalysisAI(max_pixels=0, use_cache=False, quality_gate=False, color_classifier='lut')
+    full = ai._analyze_colors(ai._extract_planes(image))
+
+    for color in (
+        TiledImageAnalyzer(ai, tile_size=256, overlap=32).analyze(image, 'bgr')['color'],
+        RoiImageAnalyzer(ai).analyze(image)['color'],
+        TrayAnalyzer(ai).analyze(image)['color']
+    ):
+        assert color['brown_ratio'] == pytest.approx(full['brown_ratio'])
+        assert color['browning'] == pytest.approx(full['browning'])
@@ -0,0 +1,68 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.services.ai import PlantAnalysisAI, ENV_DEFAULTS
+
+SCORE_KEYS = ('temperature_score', 'humidity_score', 'ph_score', 'ec_score', 'overall_score')
+
+
+@pytest.fixture(scope='module')
+def ai():
+    return PlantAnalysisAI(use_cache=False)
+
+
+def sensor_rows():
+    """범위 경계, 누락 키, NaN, 무한대를 섞은 센서 행"""
+    rng = np.random.default_rng(7)
+    specials = {
+        'innerTemperature': [18, 32, 17.999, 32.001, math.nan, math.inf, -math.inf],
+        'innerHumidity': [40, 80, 39.5, 80.5, math.nan],
+        'ph': [6.0, 7.5, 5.99, 7.51, math.nan],
+        'ec': [1.0, 3.0, 0.99, 3.01, math.nan]
+    }
+    ranges = {'innerTemperature': (0, 50), 'innerHumidity': (0, 100), 'ph': (3, 10), 'ec': (0, 6)}
+    rows = []
+    for _ in range(2000):
+        row = {}
+        for key, (low, high) in ranges.items():
+            choice = rng.random()
+            if choice < 0.15:
+                continue  # 키 누락 → 기본값
+            if choice < 0.35:
+                row[key] = specials[key][rng.integers(len(specials[key]))]
+            else:
+                row[key] = float(rng.uniform(low, high))
+        rows.append(row)
+    return rows
+
+
+def assert_same_score(batch, single):
+    if math.isnan(single):
+        assert math.isnan(batch)
+    else:
+        assert batch == single
+
+
+def test_batch_matches_scalar_path_with_missing_and_nan(ai):
+    rows = sensor_rows()
+    readings = {key: [row.get(key) for row in rows] for key in ENV_DEFAULTS}
+
+    scores = ai.score_environment_batch(readings)
+
+    for index, row in enumerate(rows):
+        single = ai._analyze_environment(row)
+        for key in SCORE_KEYS:
+            assert_same_score(float(scores[key][index]), float(single[key]))
+        assert ai.recommendation_messages(scores['recommendation_codes'][index]) == single['recommendations']
+
+
+def test_missing_columns_use_defaults(ai):
+    scores = ai.score_environment_batch({'ph': [5.0, math.nan]})
+    single = [ai._analyze_environment({'ph': 5.0}), ai._analyze_environment({'ph': math.nan})]
+
+    for index, expected in enumerate(single):
+        for key in SCORE_KEYS:
+            assert float(scores[key][index]) == expected[key]
+    assert float(scores['ph_score'][1]) == 0.0
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip('torch')
+
+# 일괄 예측은 행렬 곱 누적 순서가 달라 float32 반올림 오차만큼 단건 예측과 다를 수 있음
+BATCH_TOLERANCE = 1e-4
+
+
+def assert_close(batch, single):
+    if isinstance(batch, dict):
+        assert batch.keys() == single.keys()
+        for key in batch:
+            assert_close(batch[key], single[key])
+    elif isinstance(batch, float):
+        assert batch == pytest.approx(single, rel=BATCH_TOLERANCE, abs=BATCH_TOLERANCE)
+    else:
+        assert batch == single
+
+
+@pytest.fixture
+def farm_ai(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from app.services.federated_learning import FederatedFarmAI
+    return FederatedFarmAI('test_farm')
+
+
+@pytest.mark.parametrize('training_count, cluster', [(3, None), (12, None), (12, 'open_field')])
+def test_batch_matches_single_within_tolerance(farm_ai, training_count, cluster):
+    farm_ai.training_data_count = training_count
+    farm_ai.farm_cluster = cluster
+    rng = np.random.default_rng(0)
+    inputs = [
+        {'environment_data': {'innerTemperature': float(t), 'ph': float(ph)},
+         'image_features': {'health_score': float(h)}}
+        for t, ph, h in zip(rng.uniform(15, 35, 32), rng.uniform(5, 8, 32), rng.uniform(40, 100, 32))
+    ]
+    # 클러스터를 요청마다 지정한 입력도 섞음
+    inputs[::3] = [dict(input_data, cluster_type='smart_greenhouse') for input_data in inputs[::3]]
+
+    np.random.seed(1)
+    batch = farm_ai.hybrid_predict_batch(inputs, True)
+    np.random.seed(1)
+    single = [farm_ai.hybrid_predict(input_data, True) for input_data in inputs]
+
+    for batch_result, single_result in zip(batch, single):
+        assert_close(batch_result, single_result)
+
+
+def test_global_only_ensemble_shared_across_farms(farm_ai):
+    from app.services.federated_learning import FederatedFarmAI
+    other = FederatedFarmAI('other_farm')
+    input_data = {'environment_data': {'innerTemperature': 24.0}, 'image_features': {}}
+    builds = farm_ai.shared_models.get_stats()['global_ensemble_builds']
+
+    assert farm_ai.hybrid_predict(input_data, False) == other.hybrid_predict(input_data, False)
+    assert farm_ai.shared_models.get_stats()['global_ensemble_builds'] - builds <= 1
@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.services.idempotency import IdempotencyStore, IdempotencyConflict
+
+THREADS = 8
+
+
+def make_store(db_path, **kwargs):
+    return IdempotencyStore(db_path, lock_seconds=10, poll_interval=0.02, **kwargs)
+
+
+class SlowCompute:
+    """호출 횟수를 세는 느린 계산 (동시 요청이 겹치도록 잠시 대기)"""
+
+    def __init__(self, status=200, delay=0.2):
+        self.status = status
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.delay)
+        return {'status': self.status, 'body': f'response {call}', 'mimetype': 'application/json', 'headers': {}}
+
+
+def run_concurrently(stores, key, compute, fingerprint='same'):
+    """스레드마다 저장소를 번갈아 골라 같은 키로 동시에 실행"""
+    barrier = threading.Barrier(THREADS)
+    outcomes = [None] * THREADS
+
+    def request(index):
+        barrier.wait()
+        outcomes[index] = stores[index % len(stores)].execute(key, fingerprint, compute)
+
+    threads = [threading.Thread(target=request, args=(index,)) for index in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'idempotency.db')
+
+
+def test_concurrent_requests_in_one_worker_compute_once(db_path):
+    store = make_store(db_path)
+    compute = SlowCompute()
+
+    outcomes = run_concurrently([store], 'analyze:key-1', compute)
+
+    assert compute.calls == 1
+    assert {response['body'] for response, _ in outcomes} == {'response 1'}
+    assert sorted(replayed for _, replayed in outcomes) == [False] + [True] * (THREADS - 1)
+    assert store.get_stats()['coalesced'] >= 1
+
+
+def test_concurrent_requests_across_workers_compute_once(db_path):
+    # 워커 프로세스마다 저장소 인스턴스가 따로 있고 SQLite 파일만 공유
+    workers = [make_store(db_path), make_store(db_path)]
+    compute = SlowCompute()
+
+    outcomes = run_concurrently(workers, 'analyze:key-2', compute)
+
+    assert compute.calls == 1
+    assert {response['body'] for response, _ in outcomes} == {'response 1'}
+
+    # 이후 재시도는 저장된 응답 재전송
+    response, replayed = make_store(db_path).execute('analyze:key-2', 'same', compute)
+    assert (response['body'], replayed, compute.calls) == ('response 1', True, 1)
+
+
+def test_server_errors_are_not_stored(db_path):
+    store = make_store(db_path)
+    failing = SlowCompute(status=500, delay=0)
+
+    store.execute('analyze:key-3', 'same', failing)
+    response, replayed = store.execute('analyze:key-3', 'same', failing)
+
+    assert failing.calls == 2
+    assert not replayed
+
+
+def test_same_key_with_different_request_conflicts(db_path):
+    store = make_store(db_path)
+    store.execute('analyze:key-4', 'first', SlowCompute(delay=0))
+
+    with pytest.raises(IdempotencyConflict):
+        store.execute('analyze:key-4', 'second', SlowCompute(delay=0))
+
+
+def test_locked_database_error_is_not_masked(db_path):
+    store = make_store(db_path)
+    store._connect = lambda: sqlite3.connect(db_path, timeout=0, isolation_level=None)
+    blocker = sqlite3.connect(db_path, isolation_level=None)
+    blocker.execute('BEGIN IMMEDIATE')
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            store._claim('analyze:key-5', 'same', 'owner')
+    finally:
+        blocker.execute('ROLLBACK')
+        blocker.close()
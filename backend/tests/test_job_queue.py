@@ -0,0 +1,118 @@
+import sqlite3
+import time
+
+import pytest
+
+from app.services import job_queue as job_queue_module
+from app.services.job_queue import AnalysisJobQueue, JOB_COMPLETED, JOB_RUNNING, IMAGE_DONE
+
+
+class FakeEngine:
+    """분석 엔진 대역 - 받은 이미지를 기록하고, crash_after번째 묶음 뒤에 워커 중단을 흉내냄"""
+    max_workers = 2
+
+    def __init__(self, queue=None, crash_after=None):
+        self.queue = queue
+        self.crash_after = crash_after
+        self.batches = []
+
+    def analyze_batch(self, images, environment_data, model_id, analysis_items):
+        self.batches.append([bytes(image).decode() for image in images])
+        if self.crash_after is not None and len(self.batches) >= self.crash_after:
+            self.queue._stop.set()
+        return [{'image': bytes(image).decode(), 'imageAnalysis': {}} for image in images]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+
+def make_queue(db_path, **kwargs):
+    queue = AnalysisJobQueue(db_path, stale_seconds=60, **kwargs)
+    queue.start = lambda: None  # 테스트에서 작업 스레드 대신 직접 처리
+    return queue
+
+
+def enqueue(queue, count=5):
+    images = [(f'img{i}.jpg', f'img{i}'.encode()) for i in range(count)]
+    return queue.enqueue(images, {}, 'basic-analysis-v1', [])
+
+
+def expire_heartbeat(db_path, job_id):
+    conn = sqlite3.connect(db_path)
+    conn.execute('UPDATE analysis_jobs SET heartbeat_at = ? WHERE id = ?', (time.time() - 3600, job_id))
+    conn.commit()
+    conn.close()
+
+
+def test_stale_job_resumes_only_pending_images_on_another_worker(db_path, monkeypatch):
+    crashed = make_queue(db_path)
+    job_id = enqueue(crashed)
+
+    # 첫 워커: 한 묶음(2장)을 저장한 뒤 중단 (하트비트 갱신 멈춤)
+    crashed_engine = FakeEngine(crashed, crash_after=1)
+    monkeypatch.setattr(job_queue_module, 'get_analysis_engine', lambda: crashed_engine)
+    assert crashed._claim_job('worker-a') == job_id
+    crashed._run_job(job_id)
+
+    job = crashed.get_job(job_id)
+    assert job['status'] == JOB_RUNNING
+    assert (job['completed'], job['pending']) == (2, 3)
+
+    # 하트비트가 살아 있는 동안은 다른 워커가 가져가지 않음
+    survivor = make_queue(db_path)
+    assert survivor._claim_job('worker-b') is None
+
+    # 하트비트 만료 후 다른 워커가 이어받아 남은 이미지만 분석
+    expire_heartbeat(db_path, job_id)
+    survivor_engine = FakeEngine()
+    monkeypatch.setattr(job_queue_module, 'get_analysis_engine', lambda: survivor_engine)
+    assert survivor._claim_job('worker-b') == job_id
+    survivor._run_job(job_id)
+
+    assert crashed_engine.batches == [['img0', 'img1']]
+    assert survivor_engine.batches == [['img2', 'img3'], ['img4']]
+
+    job = survivor.get_job(job_id)
+    assert job['status'] == JOB_COMPLETED
+    assert (job['completed'], job['pending']) == (5, 0)
+    results = survivor.get_results(job_id)
+    assert [entry['index'] for entry in results] == list(range(5))
+    assert [entry['result']['image'] for entry in results] == [f'img{i}' for i in range(5)]
+    assert all(entry['status'] == IMAGE_DONE for entry in results)
+
+    # 분석이 끝난 이미지 원본은 삭제됨
+    conn = sqlite3.connect(db_path)
+    remaining_blobs = conn.execute(
+        'SELECT COUNT(*) FROM analysis_job_images WHERE job_id = ? AND image IS NOT NULL', (job_id,)
+    ).fetchone()[0]
+    conn.close()
+    assert remaining_blobs == 0
+
+
+def test_claim_is_exclusive_across_workers(db_path):
+    first, second = make_queue(db_path), make_queue(db_path)
+    job_ids = {enqueue(first, 1) for _ in range(2)}
+
+    claimed = [first._claim_job('worker-a'), second._claim_job('worker-b'), first._claim_job('worker-a')]
+
+    assert set(claimed[:2]) == job_ids
+    assert claimed[2] is None
+
+
+def test_background_thread_finishes_enqueued_job(db_path, monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(job_queue_module, 'get_analysis_engine', lambda: engine)
+    queue = AnalysisJobQueue(db_path, poll_interval=0.05)
+    try:
+        job_id = enqueue(queue, 3)
+        deadline = time.monotonic() + 10
+        while queue.get_job(job_id)['status'] != JOB_COMPLETED and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        queue.shutdown()
+
+    job = queue.get_job(job_id)
+    assert job['status'] == JOB_COMPLETED
+    assert [entry['status'] for entry in queue.get_results(job_id)] == [IMAGE_DONE] * 3
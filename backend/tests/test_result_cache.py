@@ -0,0 +1,55 @@
+import sqlite3
+
+from app.services.result_cache import AnalysisCache
+
+
+def disk_totals(cache):
+    conn = sqlite3.connect(cache.disk_path)
+    try:
+        total = conn.execute('SELECT total FROM cache_size').fetchone()[0]
+        actual, count = conn.execute('SELECT COALESCE(SUM(size), 0), COUNT(*) FROM cache_entries').fetchone()
+        return total, actual, count
+    finally:
+        conn.close()
+
+
+def test_disk_size_total_tracks_inserts_replacements_and_evictions(tmp_path):
+    cache = AnalysisCache(memory_max_bytes=1 << 20, disk_dir=str(tmp_path), disk_max_bytes=1000)
+
+    for i in range(30):
+        cache.set(f'key{i % 12}', {'value': 'x' * (100 + i)})
+        total, actual, _ = disk_totals(cache)
+        assert total == actual
+        assert total <= 1000
+
+    stats = cache.get_stats()
+    assert stats['disk_evictions'] > 0
+    assert stats['disk_bytes'] == disk_totals(cache)[0]
+
+    cache.clear()
+    assert disk_totals(cache) == (0, 0, 0)
+
+
+def test_disk_eviction_removes_least_recently_used(tmp_path):
+    cache = AnalysisCache(memory_max_bytes=0, disk_dir=str(tmp_path), disk_max_bytes=450)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, {'value': 'x' * 120})
+    assert cache.get('a') is not None  # a를 최근 사용으로 갱신
+
+    cache.set('d', {'value': 'x' * 120})
+
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in ('a', 'c', 'd'))
+
+
+def test_existing_disk_cache_gets_size_total(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'analysis_cache.db'))
+    conn.execute('CREATE TABLE cache_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                 'size INTEGER NOT NULL, accessed_at REAL NOT NULL)')
+    conn.execute("INSERT INTO cache_entries VALUES ('old', '{}', 321, 0)")
+    conn.commit()
+    conn.close()
+
+    cache = AnalysisCache(memory_max_bytes=1 << 20, disk_dir=str(tmp_path), disk_max_bytes=1 << 20)
+
+    assert disk_totals(cache) == (321, 321, 1)
@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.services.ai import PlantAnalysisAI
+from app.services.sequence_analysis import SequenceTracker
+
+
+def encode_frame(shift=0):
+    image = np.full((480, 640, 3), 90, dtype=np.uint8)
+    cv2.rectangle(image, (200 + shift, 150), (420 + shift, 330), (40, 160, 50), -1)
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+@pytest.fixture
+def shared_db(tmp_path):
+    return str(tmp_path / 'sequences.db')
+
+
+def worker_ai(db_path):
+    """gunicorn 워커 하나의 분석기 (공유 키프레임 DB 사용)"""
+    ai = PlantAnalysisAI(use_cache=False)
+    ai.sequences = SequenceTracker(db_path=db_path)
+    return ai
+
+
+def test_keyframe_shared_across_workers(shared_db):
+    first, second = worker_ai(shared_db), worker_ai(shared_db)
+
+    keyframe = first.analyze_plant_sequence('cam-1', encode_frame(), {}, 'basic-analysis-v1', [])
+    carried = second.analyze_plant_sequence('cam-1', encode_frame(), {}, 'basic-analysis-v1', [])
+
+    assert not keyframe['sequence']['carried_forward']
+    assert carried['sequence']['carried_forward']
+    assert carried['sequence']['frames_since_keyframe'] == 1
+    assert carried['imageAnalysis'] == keyframe['imageAnalysis']
+
+    # 다른 워커에서 이어 쓴 횟수도 공유됨
+    again = first.analyze_plant_sequence('cam-1', encode_frame(), {}, 'basic-analysis-v1', [])
+    assert again['sequence']['frames_since_keyframe'] == 2
+
+
+def test_changed_frame_replaces_shared_keyframe(shared_db):
+    first, second = worker_ai(shared_db), worker_ai(shared_db)
+    first.analyze_plant_sequence('cam-1', encode_frame(), {}, 'basic-analysis-v1', [])
+
+    moved = second.analyze_plant_sequence('cam-1', encode_frame(shift=120), {}, 'basic-analysis-v1', [])
+    carried = first.analyze_plant_sequence('cam-1', encode_frame(shift=120), {}, 'basic-analysis-v1', [])
+
+    assert not moved['sequence']['carried_forward']
+    assert carried['sequence']['carried_forward']
+
+
+@pytest.mark.parametrize('db_path', ['', 'shared'])
+def test_max_sequences_evicts_oldest_keyframes(tmp_path, db_path):
+    tracker = SequenceTracker(max_sequences=2, db_path=str(tmp_path / 'seq.db') if db_path else '')
+    thumbnail = np.zeros((90, 120), dtype=np.uint8)
+    for sequence_id in ('a', 'b', 'c'):
+        tracker.update(sequence_id, thumbnail, {}, {'health_score': 1})
+
+    stats = tracker.get_stats()
+    assert stats['sequences'] == 2
+    assert stats['evictions'] == 1
+    assert tracker.match('a', thumbnail, {})[0] is None
+    assert tracker.match('c', thumbnail, {})[0] == {'health_score': 1}
@@ -0,0 +1,49 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.services.ai import PlantAnalysisAI, ImageQualityRejected
+from app.services.tiled_analysis import TiledImageAnalyzer
+
+
+def make_field(height, width, seed):
+    """겹침 영역보다 큰 잎(타원)이 타일 경계에 걸치는 합성 작물 이미지 (BGR)"""
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width, 3), (60, 90, 140), np.uint8)
+    for _ in range(30):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        axes = (int(rng.integers(20, 220)), int(rng.integers(10, 90)))
+        color = (40, int(rng.integers(120, 200)), 50)
+        cv2.ellipse(image, center, axes, int(rng.integers(0, 180)), 0, 360, color, -1)
+    image = cv2.add(image, rng.integers(0, 20, image.shape, dtype=np.uint8))
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+
+@pytest.mark.parametrize('shape_engine', ['contours', 'components'])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_tiled_matches_untiled(shape_engine, seed):
+    image = make_field(1200, 1600, seed)
+    ai = PlantAnalysisAI(max_pixels=0, use_cache=False, quality_gate=False, roi_mode=False)
+
+    full = ai._analyze_image_array(image, shape_engine=shape_engine)
+    tiled = TiledImageAnalyzer(ai, tile_size=256, overlap=32).analyze(image, 'bgr', shape_engine)
+
+    assert tiled['shape']['leaf_count'] == full['shape']['leaf_count']
+    assert tiled['shape']['total_area'] == pytest.approx(full['shape']['total_area'], rel=0.01)
+    assert tiled['shape']['size_category'] == full['shape']['size_category']
+    assert tiled['color']['greenness'] == pytest.approx(full['color']['greenness'])
+    assert tiled['health_score'] == pytest.approx(full['health_score'], abs=0.5)
+
+
+def test_tiled_quality_gate_matches_untiled():
+    image = make_field(1200, 1600, 0)
+    ai = PlantAnalysisAI(max_pixels=0, use_cache=False, quality_gate=True, roi_mode=False)
+
+    with pytest.raises(ImageQualityRejected) as full:
+        ai._check_quality(ai._extract_gray(image))
+    with pytest.raises(ImageQualityRejected) as tiled:
+        TiledImageAnalyzer(ai, tile_size=256, overlap=32).analyze(image, 'bgr')
+
+    assert tiled.value.reasons == full.value.reasons
+    for metric in ('brightness', 'contrast', 'sharpness'):
+        assert tiled.value.metrics[metric] == pytest.approx(full.value.metrics[metric], rel=0.1)
@@ -0,0 +1,35 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.services.ai import PlantAnalysisAI, QUALITY_REJECTED_CODE
+
+
+def tray_image(background=200):
+    image = np.full((300, 400, 3), background, dtype=np.uint8)
+    for col in range(3):
+        cv2.circle(image, (70 + 130 * col, 150), 55, (30, 140, 40), -1)
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+@pytest.mark.parametrize('rows, cols', [(1, 3), (None, None)])
+def test_quality_gate_rejects_tray_before_cell_analysis(rows, cols):
+    ai = PlantAnalysisAI(use_cache=False, quality_gate=True)
+    dark = cv2.imencode('.png', np.full((300, 400, 3), 5, dtype=np.uint8))[1].tobytes()
+
+    result = ai.analyze_plant_tray(dark, {}, 'basic-analysis-v1', [], rows, cols)
+
+    assert result['error_code'] == QUALITY_REJECTED_CODE
+    assert 'too_dark' in result['quality_gate']['reasons']
+
+
+@pytest.mark.parametrize('rows, cols', [(1, 3), (None, None)])
+def test_quality_gate_passes_tray_unchanged(rows, cols):
+    gated = PlantAnalysisAI(use_cache=False, quality_gate=True)
+    ungated = PlantAnalysisAI(use_cache=False)
+
+    result = gated.analyze_plant_tray(tray_image(), {}, 'basic-analysis-v1', [], rows, cols)
+    expected = ungated.analyze_plant_tray(tray_image(), {}, 'basic-analysis-v1', [], rows, cols)
+
+    assert result['imageAnalysis'] == expected['imageAnalysis']
+    assert result['imageAnalysis']['tray']['cell_count'] == 3